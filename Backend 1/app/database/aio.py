@@ -0,0 +1,134 @@
+"""
+Async MySQL access for the ASGI serving mode (app/asgi.py)
+
+Same DB_CONFIG, metrics and slow query log as connection.py, but through an
+aiomysql pool owned by the running event loop, so independent reads of one
+request can be awaited together:
+
+    student = await fetch_one(StudentModel.PROFILE_SQL, (user_id,))
+    courses, attendance = await asyncio.gather(
+        execute_query(CourseModel.STUDENT_ENROLLMENTS_SQL, (student_id,)),
+        execute_query(StudentModel.ATTENDANCE_SUMMARY_SQL, (student_id,)),
+    )
+
+Each concurrent statement uses its own pooled connection. Writes stay on the
+sync models (transaction()); anything without an async query can be awaited
+with run_sync().
+"""
+import os
+import time
+import asyncio
+
+from app import metrics
+from app.database import slow_queries
+from app.database.connection import DB_CONFIG, _tracking
+
+try:
+    import aiomysql
+except ImportError:  # only needed for the ASGI serving mode
+    aiomysql = None
+
+AIO_POOL_SIZE = int(os.getenv('AIO_POOL_SIZE', 20))
+AIO_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 300))
+
+_pool = None
+_pool_loop = None
+_pool_lock = None
+
+
+async def get_pool():
+    """The pool of the running loop (created on first use)"""
+    global _pool, _pool_loop, _pool_lock
+    if aiomysql is None:
+        raise RuntimeError("aiomysql is not installed (pip install -r requirements.txt)")
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        stale, stale_loop = _pool, _pool_loop
+        _pool, _pool_loop, _pool_lock = None, loop, asyncio.Lock()
+        if stale is not None:
+            await _retire(stale, stale_loop)
+    async with _pool_lock:
+        if _pool is None:
+            start = time.perf_counter()
+            _pool = await aiomysql.create_pool(
+                host=DB_CONFIG['host'],
+                port=DB_CONFIG['port'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                db=DB_CONFIG['database'],
+                charset=DB_CONFIG['charset'],
+                cursorclass=aiomysql.DictCursor,
+                autocommit=True,
+                minsize=1,
+                maxsize=AIO_POOL_SIZE,
+                pool_recycle=AIO_POOL_RECYCLE,
+            )
+            metrics.DB_CONNECT_LATENCY.observe(time.perf_counter() - start)
+    return _pool
+
+
+async def _close(pool):
+    pool.close()
+    await pool.wait_closed()
+
+
+async def _retire(pool, loop):
+    """Close the pool of a previous event loop; its connections only work on that loop"""
+    if loop.is_running():
+        # serving in another thread: close it there, after the queries in flight
+        asyncio.run_coroutine_threadsafe(_close(pool), loop)
+    elif not loop.is_closed():
+        await asyncio.to_thread(loop.run_until_complete, _close(pool))
+    else:
+        # a closed loop cannot say goodbye to the server; the sockets are
+        # closed when the dropped transports are collected
+        pool.close()
+
+
+async def close_pool():
+    """Close the pool of this loop (ASGI lifespan shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+async def execute_query(query, params=None, fetch=True):
+    """Async counterpart of connection.execute_query (autocommit, one statement)"""
+    pool = await get_pool()
+    for queries in _tracking.get():
+        queries.connections += 1
+    metrics.DB_CONNECTIONS_IN_USE.inc()
+    try:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                start = time.perf_counter()
+                try:
+                    await cursor.execute(query, params or ())
+                    rows = await cursor.fetchall() if fetch else None
+                except Exception as e:
+                    metrics.DB_QUERIES.inc(outcome='error')
+                    print(f"Query error: {e}\nQuery: {query}\nParams: {params}")
+                    raise
+                finally:
+                    for queries in _tracking.get():
+                        queries.append((query, time.perf_counter() - start))
+                elapsed = time.perf_counter() - start
+                metrics.DB_QUERY_LATENCY.observe(elapsed)
+                metrics.DB_QUERIES.inc(outcome='ok')
+                # no EXPLAIN here: it would need a sync connection
+                slow_queries.record(query, params, elapsed, None, cursor.rowcount)
+                return list(rows) if fetch else None
+    finally:
+        metrics.DB_CONNECTIONS_IN_USE.dec()
+
+
+async def fetch_one(query, params=None):
+    rows = await execute_query(query, params)
+    return rows[0] if rows else None
+
+
+async def run_sync(fn, *args):
+    """Await a sync model method in a worker thread (uses the sync pool)"""
+    return await asyncio.to_thread(fn, *args)
@@ -0,0 +1,126 @@
+"""
+Attendance shortage early warning (attendance_risk, migration 009)
+
+compute() runs one INSERT ... SELECT over every active enrollment joined to
+its attendance rollup (app/database/attendance_rollups.py) and stores per
+enrollment:
+
+    allowed_absences  FLOOR(present - ATTENDANCE_MIN_RATIO * total), the
+                      dashboard's attendance_left before it is clamped at 0
+    status            'short'   below the minimum ratio already
+                      'warning' fewer than ATTENDANCE_RISK_MARGIN absences
+                                left (after ATTENDANCE_RISK_MIN_CLASSES classes)
+                      'ok'
+
+Rows of enrollments that are no longer active are removed in the same
+transaction. Run it from cron (tools/compute_attendance_risk.py); the admin
+report and the per-student lookup only read the stored rows.
+"""
+import os
+import time
+import datetime
+
+from app.database.connection import execute_query, transaction
+from app.database import versions
+
+ATTENDANCE_MIN_RATIO = float(os.getenv('ATTENDANCE_MIN_RATIO', 0.75))
+ATTENDANCE_RISK_MARGIN = int(os.getenv('ATTENDANCE_RISK_MARGIN', 1))
+ATTENDANCE_RISK_MIN_CLASSES = int(os.getenv('ATTENDANCE_RISK_MIN_CLASSES', 4))
+
+STATUSES = ('short', 'warning', 'ok')
+REPORT_PAGE_MAX = 1000
+
+COMPUTE_SQL = """
+    INSERT INTO attendance_risk (enrollment_id, student_id, section_id, department_id, total, present,
+                                 allowed_absences, status, computed_at)
+    SELECT t.enrollment_id, t.student_id, t.section_id, t.department_id, t.total, t.present,
+        FLOOR(t.present - %(ratio)s * t.total),
+        CASE
+            WHEN t.present < %(ratio)s * t.total THEN 'short'
+            WHEN t.total >= %(min_classes)s AND FLOOR(t.present - %(ratio)s * t.total) < %(margin)s THEN 'warning'
+            ELSE 'ok'
+        END,
+        %(computed_at)s
+    FROM (
+        SELECT e.enrollment_id, e.student_id, e.section_id, c.department_id,
+               IFNULL(r.total, 0) AS total, IFNULL(r.present, 0) AS present
+        FROM enrollments e
+        JOIN course_sections cs ON e.section_id = cs.section_id
+        JOIN courses c ON cs.course_id = c.course_id
+        LEFT JOIN attendance_rollup r ON r.student_id = e.student_id AND r.section_id = e.section_id
+        WHERE e.status = 'enrolled' AND cs.is_active = TRUE
+    ) t
+    ON DUPLICATE KEY UPDATE
+        student_id = VALUES(student_id), section_id = VALUES(section_id), department_id = VALUES(department_id),
+        total = VALUES(total), present = VALUES(present), allowed_absences = VALUES(allowed_absences),
+        status = VALUES(status), computed_at = VALUES(computed_at)
+"""
+
+REPORT_SQL = """
+    SELECT ar.enrollment_id, ar.student_id, s.student_code, s.first_name, s.last_name,
+           c.course_code, c.course_name, cs.section_code, d.dept_name,
+           ar.total, ar.present, ar.allowed_absences, ar.status, ar.computed_at
+    FROM attendance_risk ar
+    JOIN students s ON ar.student_id = s.student_id
+    JOIN course_sections cs ON ar.section_id = cs.section_id
+    JOIN courses c ON cs.course_id = c.course_id
+    LEFT JOIN departments d ON ar.department_id = d.dept_id
+    WHERE ar.status IN ({statuses}) {department}
+    ORDER BY ar.allowed_absences, s.student_code
+    LIMIT %s OFFSET %s
+"""
+
+STUDENT_SQL = """
+    SELECT ar.enrollment_id, ar.section_id, c.course_code, c.course_name, cs.section_code,
+           ar.total, ar.present, ar.allowed_absences, ar.status, ar.computed_at
+    FROM attendance_risk ar
+    JOIN course_sections cs ON ar.section_id = cs.section_id
+    JOIN courses c ON cs.course_id = c.course_id
+    WHERE ar.student_id = %s
+    ORDER BY ar.allowed_absences
+"""
+
+
+def allowed_absences(total, present):
+    """Absences left before dropping under the minimum ratio (negative: short already)"""
+    return int((float(present or 0) - ATTENDANCE_MIN_RATIO * float(total or 0)) // 1)
+
+
+def compute(log=print):
+    """Recompute every active enrollment; returns {'enrollments', 'short', 'warning', 'removed', 'seconds'}"""
+    start = time.perf_counter()
+    computed_at = datetime.datetime.now()
+    params = {'ratio': ATTENDANCE_MIN_RATIO, 'margin': ATTENDANCE_RISK_MARGIN,
+              'min_classes': ATTENDANCE_RISK_MIN_CLASSES, 'computed_at': computed_at}
+    with transaction() as (conn, cursor):
+        cursor.execute(COMPUTE_SQL, params)
+        cursor.execute("DELETE FROM attendance_risk WHERE computed_at <> %s", (computed_at,))
+        removed = cursor.rowcount
+        cursor.execute("SELECT status, COUNT(*) AS n FROM attendance_risk GROUP BY status")
+        counts = {row['status']: row['n'] for row in cursor.fetchall()}
+    versions.bump('attendance_risk')
+    summary = {
+        'enrollments': sum(counts.values()),
+        'short': counts.get('short', 0),
+        'warning': counts.get('warning', 0),
+        'removed': removed,
+        'seconds': time.perf_counter() - start,
+    }
+    log(f"{summary['enrollments']:,} enrollments: {summary['short']:,} short, {summary['warning']:,} at risk "
+        f"({summary['seconds']:.1f}s)")
+    return summary
+
+
+def report(department_id=None, statuses=('short', 'warning'), limit=100, offset=0):
+    """Stored at-risk enrollments, fewest allowed absences first (limit clamped to 1..REPORT_PAGE_MAX)"""
+    limit = max(1, min(int(limit), REPORT_PAGE_MAX))
+    offset = max(0, int(offset))
+    statuses = [s for s in statuses if s in STATUSES] or ['short', 'warning']
+    department = "AND ar.department_id = %s" if department_id else ""
+    params = list(statuses) + ([department_id] if department_id else []) + [limit, offset]
+    query = REPORT_SQL.format(statuses=', '.join(['%s'] * len(statuses)), department=department)
+    return execute_query(query, tuple(params))
+
+
+def for_student(student_id):
+    return execute_query(STUDENT_SQL, (student_id,))
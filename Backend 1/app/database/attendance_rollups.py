@@ -0,0 +1,243 @@
+"""
+Attendance rollups (migration 008): running counts the summaries read by key
+
+    attendance_rollup          (student_id, section_id) -> total, present
+    faculty_attendance_rollup  faculty_id -> total_days, present_days, absent_days
+
+Writers lock the attendance they are about to overwrite, compare the
+previous status with the new one and add the difference on the same
+cursor, inside their transaction:
+
+    new mark            total + 1, present + 1 when present
+    present -> absent   present - 1 (total unchanged)
+    same status again   nothing
+
+so a dashboard summary is one primary-key range read per student however
+many class days have passed. Student marks go through
+attendance_store.mark_many(); faculty marks through
+AdminModel.mark_multiple_faculty_attendance(). rebuild() recomputes both
+tables from the attendance itself (tools/rebuild_attendance_rollups.py).
+"""
+from app.database.connection import execute_query, transaction, chunks, row_placeholders
+
+CHUNK_SIZE = 1000
+
+STUDENT_DELTA_SQL = """
+    INSERT INTO attendance_rollup (student_id, section_id, total, present)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total), present = present + VALUES(present)
+"""
+STUDENT_DELTA_ROW = "(%s, %s, %s, %s)"
+
+# lower-cased session -> the spelling stored in faculty_attendance
+FACULTY_SESSIONS = {'morning': 'Morning', 'evening': 'Evening'}
+FACULTY_STATUSES = ('present', 'absent')
+
+FACULTY_DELTA_SQL = """
+    INSERT INTO faculty_attendance_rollup (faculty_id, total_days, present_days, absent_days)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE total_days = total_days + VALUES(total_days),
+        present_days = present_days + VALUES(present_days),
+        absent_days = absent_days + VALUES(absent_days)
+"""
+FACULTY_DELTA_ROW = "(%s, %s, %s, %s)"
+
+FACULTY_PREVIOUS_SQL = """
+    SELECT faculty_id, attendance_date, session, status FROM faculty_attendance
+    WHERE (faculty_id, attendance_date, session) IN ({keys})
+    FOR UPDATE
+"""
+
+FACULTY_UPSERT_SQL = """
+    INSERT INTO faculty_attendance (faculty_id, attendance_date, session, status, marked_by)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE status = VALUES(status), marked_by = VALUES(marked_by), marked_at = CURRENT_TIMESTAMP
+"""
+FACULTY_UPSERT_ROW = "(%s, %s, %s, %s, %s)"
+
+# summaries: same columns as the COUNT/SUM queries they replace
+STUDENT_SUMMARY_SQL = """
+    SELECT
+        c.course_code,
+        c.course_name,
+        SUM(r.total) as total_classes,
+        SUM(r.present) as present,
+        SUM(r.total - r.present) as absent,
+        ROUND((SUM(r.present) / SUM(r.total)) * 100, 2) as attendance_percentage
+    FROM attendance_rollup r
+    JOIN course_sections cs ON r.section_id = cs.section_id
+    JOIN courses c ON cs.course_id = c.course_id
+    WHERE r.student_id = %s AND r.total > 0
+    GROUP BY c.course_id, c.course_code, c.course_name
+"""
+
+SECTION_SUMMARY_SQL = """
+    SELECT s.student_id, s.student_code, s.first_name, s.last_name,
+        IFNULL(r.total, 0) as total_classes, IFNULL(r.present, 0) as present_count
+    FROM enrollments e
+    JOIN students s ON e.student_id = s.student_id
+    LEFT JOIN attendance_rollup r ON r.student_id = e.student_id AND r.section_id = e.section_id
+    WHERE e.section_id = %s AND e.status = 'enrolled'
+"""
+
+FACULTY_SUMMARY_SQL = """
+    SELECT
+        f.faculty_id,
+        f.faculty_code,
+        CONCAT(f.first_name, ' ', f.last_name) as faculty_name,
+        d.dept_name,
+        IFNULL(r.total_days, 0) as total_days,
+        IFNULL(r.present_days, 0) as present_days,
+        IFNULL(r.absent_days, 0) as absent_days,
+        ROUND((r.present_days / r.total_days) * 100, 2) as attendance_percentage
+    FROM faculty f
+    JOIN departments d ON f.department_id = d.dept_id
+    LEFT JOIN faculty_attendance_rollup r ON r.faculty_id = f.faculty_id
+    WHERE f.status = 'active'
+    ORDER BY f.first_name, f.last_name
+"""
+
+
+# ---- students ------------------------------------------------------------------
+
+def student_deltas(previous, final):
+    """
+    {(student_id, section_id): (total, present)} from the statuses before and
+    after a write, both keyed (student_id, section_id, date)
+    """
+    deltas = {}
+    for (student_id, section_id, date), status in final.items():
+        before = previous.get((student_id, section_id, date))
+        total = 0 if before else 1
+        present = (status == 'present') - (before == 'present')
+        if total or present:
+            old_total, old_present = deltas.get((student_id, section_id), (0, 0))
+            deltas[(student_id, section_id)] = (old_total + total, old_present + present)
+    return deltas
+
+
+def apply_students(cursor, deltas, chunk_size=CHUNK_SIZE):
+    items = sorted(deltas.items())
+    for chunk in chunks(items, chunk_size):
+        params = []
+        for (student_id, section_id), (total, present) in chunk:
+            params += [student_id, section_id, total, present]
+        cursor.execute(STUDENT_DELTA_SQL.format(rows=row_placeholders(STUDENT_DELTA_ROW, len(chunk))), params)
+
+
+# ---- faculty -------------------------------------------------------------------
+
+def _faculty_value(value, allowed, name):
+    """Lower-cased session/status; the faculty_attendance columns compare case-insensitively"""
+    normalized = str(value or '').strip().lower()
+    if normalized not in allowed:
+        raise ValueError(f"invalid faculty attendance {name} {value!r}")
+    return normalized
+
+
+def mark_faculty(cursor, records, marked_by, chunk_size=CHUNK_SIZE):
+    """
+    Upsert faculty attendance (dicts with faculty_id, date, session, status) and
+    move the faculty rollups on the caller's cursor; later records for the same
+    faculty, date and session win. Sessions and statuses are matched case-
+    insensitively like the table does; unknown ones raise ValueError before
+    anything is written.
+    """
+    final = {}
+    for record in records:
+        session = _faculty_value(record['session'], FACULTY_SESSIONS, 'session')
+        status = _faculty_value(record['status'], FACULTY_STATUSES, 'status')
+        final[(int(record['faculty_id']), str(record['date'])[:10], session)] = status
+    keys = sorted(final)
+    previous = {}
+    for chunk in chunks(keys, chunk_size):
+        params = [value for faculty_id, date, session in chunk for value in (faculty_id, date, FACULTY_SESSIONS[session])]
+        cursor.execute(FACULTY_PREVIOUS_SQL.format(keys=row_placeholders('(%s, %s, %s)', len(chunk))), params)
+        for row in cursor.fetchall():
+            key = (row['faculty_id'], str(row['attendance_date'])[:10], str(row['session']).strip().lower())
+            previous[key] = str(row['status']).strip().lower()
+
+    for chunk in chunks(keys, chunk_size):
+        params = []
+        for faculty_id, date, session in chunk:
+            params += [faculty_id, date, FACULTY_SESSIONS[session], final[(faculty_id, date, session)], marked_by]
+        cursor.execute(FACULTY_UPSERT_SQL.format(rows=row_placeholders(FACULTY_UPSERT_ROW, len(chunk))), params)
+
+    deltas = {}
+    for key in keys:
+        status, before = final[key], previous.get(key)
+        change = (0 if before else 1,
+                  (status == 'present') - (before == 'present'),
+                  (status == 'absent') - (before == 'absent'))
+        if any(change):
+            deltas[key[0]] = tuple(a + b for a, b in zip(deltas.get(key[0], (0, 0, 0)), change))
+    items = sorted(deltas.items())
+    for chunk in chunks(items, chunk_size):
+        params = []
+        for faculty_id, (total, present, absent) in chunk:
+            params += [faculty_id, total, present, absent]
+        cursor.execute(FACULTY_DELTA_SQL.format(rows=row_placeholders(FACULTY_DELTA_ROW, len(chunk))), params)
+    return len(keys)
+
+
+# ---- rebuild -------------------------------------------------------------------
+
+STUDENT_SOURCES = {
+    'rows': "SELECT student_id, section_id, COUNT(*) AS total, SUM(status = 'present') AS present FROM attendance GROUP BY student_id, section_id",
+    'bits': "SELECT student_id, section_id, SUM(BIT_COUNT(marked)) AS total, SUM(BIT_COUNT(present)) AS present FROM attendance_bits GROUP BY student_id, section_id",
+}
+
+FACULTY_SOURCE = """
+    SELECT faculty_id, COUNT(*) AS total_days, SUM(status = 'present') AS present_days, SUM(status = 'absent') AS absent_days
+    FROM faculty_attendance GROUP BY faculty_id
+"""
+
+STUDENT_CHECK_SQL = """
+    SELECT IFNULL(src.student_id, r.student_id) AS student_id, IFNULL(src.section_id, r.section_id) AS section_id,
+           IFNULL(r.total, 0) AS stored_total, IFNULL(src.total, 0) AS expected_total,
+           IFNULL(r.present, 0) AS stored_present, IFNULL(src.present, 0) AS expected_present
+    FROM ({source}) src
+    LEFT JOIN attendance_rollup r ON r.student_id = src.student_id AND r.section_id = src.section_id
+    WHERE IFNULL(r.total, 0) <> src.total OR IFNULL(r.present, 0) <> src.present
+    UNION ALL
+    SELECT r.student_id, r.section_id, r.total, 0, r.present, 0
+    FROM attendance_rollup r
+    LEFT JOIN ({source}) src ON src.student_id = r.student_id AND src.section_id = r.section_id
+    WHERE src.student_id IS NULL AND (r.total <> 0 OR r.present <> 0)
+"""
+
+FACULTY_CHECK_SQL = f"""
+    SELECT f.faculty_id, IFNULL(r.total_days, 0) AS stored_total, IFNULL(src.total_days, 0) AS expected_total,
+           IFNULL(r.present_days, 0) AS stored_present, IFNULL(src.present_days, 0) AS expected_present,
+           IFNULL(r.absent_days, 0) AS stored_absent, IFNULL(src.absent_days, 0) AS expected_absent
+    FROM faculty f
+    LEFT JOIN ({FACULTY_SOURCE}) src ON src.faculty_id = f.faculty_id
+    LEFT JOIN faculty_attendance_rollup r ON r.faculty_id = f.faculty_id
+    WHERE IFNULL(r.total_days, 0) <> IFNULL(src.total_days, 0)
+       OR IFNULL(r.present_days, 0) <> IFNULL(src.present_days, 0)
+       OR IFNULL(r.absent_days, 0) <> IFNULL(src.absent_days, 0)
+"""
+
+
+def check(source='rows'):
+    """{'students': [...], 'faculty': [...]} rollups that disagree with the attendance"""
+    return {
+        'students': execute_query(STUDENT_CHECK_SQL.format(source=STUDENT_SOURCES[source])),
+        'faculty': execute_query(FACULTY_CHECK_SQL),
+    }
+
+
+def rebuild(source='rows'):
+    """
+    Recompute both rollup tables in one transaction; source is 'rows'
+    (attendance) or 'bits' (attendance_bits, ATTENDANCE_STORAGE=bitmap).
+    Returns the number of student and faculty rollup rows written.
+    """
+    with transaction() as (conn, cursor):
+        cursor.execute("DELETE FROM attendance_rollup")
+        cursor.execute(f"INSERT INTO attendance_rollup (student_id, section_id, total, present) {STUDENT_SOURCES[source]}")
+        students = cursor.rowcount
+        cursor.execute("DELETE FROM faculty_attendance_rollup")
+        cursor.execute(f"INSERT INTO faculty_attendance_rollup (faculty_id, total_days, present_days, absent_days) {FACULTY_SOURCE}")
+        faculty = cursor.rowcount
+    return {'students': students, 'faculty': faculty}
@@ -0,0 +1,383 @@
+"""
+Student attendance storage: one row per class, packed bitsets, or both
+
+ATTENDANCE_STORAGE selects where marks are written and read:
+
+    rows    attendance, one row per student, section and date (default)
+    both    writes go to both, reads use the bitsets; the rollout mode
+            while tools/backfill_attendance.py catches up
+    bitmap  bitsets only; the attendance table stops growing
+
+Bitset layout (migration 007): attendance_sessions numbers a section's class
+dates (session_no 0, 1, 2, ... in the order they were first marked), and
+attendance_bits holds one row per student and section per 64 sessions:
+
+    marked   bit n set: session n was marked
+    present  bit n set: present in session n (absent = marked & ~present)
+
+A term of class dates fits in one BIGINT pair, and a remark just flips one
+bit in place.
+
+mark()/mark_many() keep the signature of FacultyModel.mark_attendance and
+write all records in one transaction, together with the attendance rollups
+the summaries are read from (app/database/attendance_rollups.py); the
+statuses they replace are locked and read first so status flips move the
+rollups correctly, and bump versions.attendance(section_id) after the
+commit. section_day() reads one date from the bitsets; grid() a whole
+roster x date range from either storage; marked_dates() which dates
+several sections have marked.
+"""
+import os
+import datetime
+
+from app.database.connection import execute_query, transaction, chunks, row_placeholders
+from app.database import attendance_rollups, versions
+
+STORAGE_MODES = ('rows', 'both', 'bitmap')
+ATTENDANCE_STORAGE = os.getenv('ATTENDANCE_STORAGE', 'rows')
+if ATTENDANCE_STORAGE not in STORAGE_MODES:
+    print(f"Unknown ATTENDANCE_STORAGE {ATTENDANCE_STORAGE!r}, using 'rows'")
+    ATTENDANCE_STORAGE = 'rows'
+
+STATUSES = ('present', 'absent')
+WORD_BITS = 64
+CHUNK_SIZE = 1000
+
+ROWS_SQL = """
+    INSERT INTO attendance (student_id, section_id, attendance_date, status)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE status = VALUES(status)
+"""
+ROW = "(%s, %s, %s, %s)"
+
+SESSIONS_SQL = "SELECT attendance_date, session_no FROM attendance_sessions WHERE section_id = %s FOR UPDATE"
+NEW_SESSIONS_SQL = "INSERT INTO attendance_sessions (section_id, attendance_date, session_no) VALUES {rows}"
+SESSION_ROW = "(%s, %s, %s)"
+
+# marked bits accumulate; the present bits of the marked sessions are replaced
+BITS_SQL = """
+    INSERT INTO attendance_bits (section_id, student_id, word, marked, present)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE
+        present = (present & ~VALUES(marked)) | VALUES(present),
+        marked = marked | VALUES(marked)
+"""
+BITS_ROW = "(%s, %s, %s, %s, %s)"
+
+# statuses about to be overwritten (locked until the rollups are moved)
+PREVIOUS_ROWS_SQL = """
+    SELECT student_id, section_id, attendance_date, status FROM attendance
+    WHERE (student_id, section_id, attendance_date) IN ({keys})
+    FOR UPDATE
+"""
+PREVIOUS_BITS_SQL = """
+    SELECT section_id, student_id, word, marked, present FROM attendance_bits
+    WHERE (section_id, student_id, word) IN ({keys})
+    FOR UPDATE
+"""
+
+# the date's bit in every enrolled student's bitset; unmarked students get NULLs as with the LEFT JOIN on rows
+BITMAP_SECTION_DAY_SQL = """
+    SELECT s.student_id, s.student_code, s.first_name, s.last_name, NULL as attendance_id,
+        CASE WHEN b.marked & d.mask THEN IF(b.present & d.mask, 'present', 'absent') END as status,
+        IF(b.marked & d.mask, d.attendance_date, NULL) as attendance_date
+    FROM enrollments e
+    JOIN students s ON e.student_id = s.student_id
+    LEFT JOIN (
+        SELECT attendance_date, session_no DIV 64 AS word, CAST(1 AS UNSIGNED) << (session_no % 64) AS mask
+        FROM attendance_sessions WHERE section_id = %s AND attendance_date = %s
+    ) d ON TRUE
+    LEFT JOIN attendance_bits b ON b.section_id = %s AND b.student_id = e.student_id AND b.word = d.word
+    WHERE e.section_id = %s AND e.status = 'enrolled'
+    ORDER BY s.first_name, s.last_name
+"""
+
+# roster x marked dates in a range, one row per (student, date); students without marks get one NULL row
+GRID_ROWS_SQL = """
+    SELECT s.student_id, s.student_code, s.first_name, s.last_name, a.attendance_date, a.status
+    FROM enrollments e
+    JOIN students s ON e.student_id = s.student_id
+    LEFT JOIN attendance a ON a.student_id = e.student_id AND a.section_id = e.section_id
+        AND a.attendance_date BETWEEN %s AND %s
+    WHERE e.section_id = %s AND e.status = 'enrolled'
+    ORDER BY s.first_name, s.last_name, s.student_id, a.attendance_date
+"""
+
+GRID_BITS_SQL = """
+    SELECT s.student_id, s.student_code, s.first_name, s.last_name, d.attendance_date,
+        CASE WHEN b.marked & d.mask THEN IF(b.present & d.mask, 'present', 'absent') END as status
+    FROM enrollments e
+    JOIN students s ON e.student_id = s.student_id
+    LEFT JOIN (
+        SELECT attendance_date, session_no DIV 64 AS word, CAST(1 AS UNSIGNED) << (session_no % 64) AS mask
+        FROM attendance_sessions WHERE section_id = %s AND attendance_date BETWEEN %s AND %s
+    ) d ON TRUE
+    LEFT JOIN attendance_bits b ON b.section_id = e.section_id AND b.student_id = e.student_id AND b.word = d.word
+    WHERE e.section_id = %s AND e.status = 'enrolled'
+    ORDER BY s.first_name, s.last_name, s.student_id, d.attendance_date
+"""
+
+# dates with at least one mark per section (attendance has an index on (section_id, attendance_date))
+MARKED_DATES_SQL = {
+    'rows': """
+        SELECT DISTINCT section_id, attendance_date FROM attendance
+        WHERE section_id IN ({sections}) AND attendance_date BETWEEN %s AND %s
+    """,
+    'bits': """
+        SELECT section_id, attendance_date FROM attendance_sessions
+        WHERE section_id IN ({sections}) AND attendance_date BETWEEN %s AND %s
+    """,
+}
+
+# one character per date in grid strings
+GRID_CODES = {'present': 'P', 'absent': 'A', None: '-'}
+
+
+def reads_bitmaps():
+    return ATTENDANCE_STORAGE != 'rows'
+
+
+def writes_rows():
+    return ATTENDANCE_STORAGE != 'bitmap'
+
+
+def writes_bitmaps():
+    return ATTENDANCE_STORAGE != 'rows'
+
+
+def _date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def normalize(records):
+    """[(student_id, section_id, date, status)] from mark_multiple_attendance-style dicts"""
+    normalized = []
+    for record in records:
+        status = record['status']
+        if status not in STATUSES:
+            raise ValueError(f"Unknown attendance status: {status}")
+        normalized.append((int(record['student_id']), int(record['section_id']), _date(record['date']), status))
+    return normalized
+
+
+def latest(records):
+    """{(student_id, section_id, date): status}; later records for the same class win"""
+    return {(student_id, section_id, date): status for student_id, section_id, date, status in records}
+
+
+def session_numbers(cursor, section_id, dates):
+    """{date: session_no} for dates, numbering the section's new dates (locks the section's sessions)"""
+    cursor.execute(SESSIONS_SQL, (section_id,))
+    sessions = {_date(row['attendance_date']): row['session_no'] for row in cursor.fetchall()}
+    new = sorted(set(dates) - set(sessions))
+    if new:
+        start = max(sessions.values(), default=-1) + 1
+        for offset, date in enumerate(new):
+            sessions[date] = start + offset
+        params = []
+        for date in new:
+            params += [section_id, date, sessions[date]]
+        cursor.execute(NEW_SESSIONS_SQL.format(rows=row_placeholders(SESSION_ROW, len(new))), params)
+    return sessions
+
+
+def number_sessions(cursor, records):
+    """{section_id: {date: session_no}} for every section in records"""
+    by_section = {}
+    for _, section_id, date, _ in records:
+        by_section.setdefault(section_id, set()).add(date)
+    return {section_id: session_numbers(cursor, section_id, dates) for section_id, dates in sorted(by_section.items())}
+
+
+def pack(records, sessions):
+    """{(section_id, student_id, word): [marked, present]}; later records for the same session win"""
+    words = {}
+    for student_id, section_id, date, status in records:
+        session_no = sessions[section_id][date]
+        mask = 1 << (session_no % WORD_BITS)
+        bits = words.setdefault((section_id, student_id, session_no // WORD_BITS), [0, 0])
+        bits[0] |= mask
+        bits[1] = (bits[1] & ~mask) | (mask if status == 'present' else 0)
+    return words
+
+
+def write_bits(cursor, records, sessions=None, chunk_size=CHUNK_SIZE):
+    """Merge normalized records into the bitsets on the caller's cursor"""
+    if sessions is None:
+        sessions = number_sessions(cursor, records)
+    words = sorted(pack(records, sessions).items())
+    for chunk in chunks(words, chunk_size):
+        params = []
+        for (section_id, student_id, word), (marked, present) in chunk:
+            params += [section_id, student_id, word, marked, present]
+        cursor.execute(BITS_SQL.format(rows=row_placeholders(BITS_ROW, len(chunk))), params)
+    return len(words)
+
+
+def write_rows(cursor, records, chunk_size=CHUNK_SIZE):
+    for chunk in chunks(records, chunk_size):
+        params = []
+        for record in chunk:
+            params += list(record)
+        cursor.execute(ROWS_SQL.format(rows=row_placeholders(ROW, len(chunk))), params)
+
+
+def previous_rows(cursor, keys, chunk_size=CHUNK_SIZE):
+    """{(student_id, section_id, date): status} of the keys that have a row"""
+    previous = {}
+    for chunk in chunks(keys, chunk_size):
+        params = [value for key in chunk for value in key]
+        cursor.execute(PREVIOUS_ROWS_SQL.format(keys=row_placeholders('(%s, %s, %s)', len(chunk))), params)
+        for row in cursor.fetchall():
+            previous[(row['student_id'], row['section_id'], _date(row['attendance_date']))] = row['status']
+    return previous
+
+
+def previous_bits(cursor, keys, sessions, chunk_size=CHUNK_SIZE):
+    """{(student_id, section_id, date): status} of the keys whose session bit is marked"""
+    located = {key: divmod(sessions[key[1]][key[2]], WORD_BITS) for key in keys}
+    words = sorted({(section_id, student_id, word) for (student_id, section_id, _), (word, _) in located.items()})
+    bits = {}
+    for chunk in chunks(words, chunk_size):
+        params = [value for word in chunk for value in word]
+        cursor.execute(PREVIOUS_BITS_SQL.format(keys=row_placeholders('(%s, %s, %s)', len(chunk))), params)
+        for row in cursor.fetchall():
+            bits[(row['section_id'], row['student_id'], row['word'])] = (row['marked'], row['present'])
+    previous = {}
+    for (student_id, section_id, date), (word, bit) in located.items():
+        marked, present = bits.get((section_id, student_id, word), (0, 0))
+        if marked >> bit & 1:
+            previous[(student_id, section_id, date)] = 'present' if present >> bit & 1 else 'absent'
+    return previous
+
+
+def mark_many(records):
+    """Write attendance records (dicts with student_id, section_id, date, status) in one transaction"""
+    final = latest(normalize(records))
+    if not final:
+        return True
+    keys = sorted(final)
+    records = [key + (final[key],) for key in keys]
+    with transaction() as (conn, cursor):
+        if writes_rows():
+            previous = previous_rows(cursor, keys)
+        if writes_bitmaps():
+            sessions = number_sessions(cursor, records)
+            if not writes_rows():
+                previous = previous_bits(cursor, keys, sessions)
+        if writes_rows():
+            write_rows(cursor, records)
+        if writes_bitmaps():
+            write_bits(cursor, records, sessions)
+        attendance_rollups.apply_students(cursor, attendance_rollups.student_deltas(previous, final))
+    versions.bump(*[versions.attendance(section_id) for section_id in {key[1] for key in keys}])
+    return True
+
+
+def mark(student_id, section_id, date, status):
+    return mark_many([{'student_id': student_id, 'section_id': section_id, 'date': date, 'status': status}])
+
+
+def section_day(section_id, date):
+    return execute_query(BITMAP_SECTION_DAY_SQL, (section_id, date, section_id, section_id))
+
+
+def run_length(codes):
+    """'PPPAP-' -> '3P1A1P1-'"""
+    runs = []
+    for code in codes:
+        if runs and runs[-1][1] == code:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, code])
+    return ''.join(f"{count}{code}" for count, code in runs)
+
+
+def grid(section_id, date_from, date_to, encoding='string'):
+    """
+    (dates, students) for the section's enrolled roster: dates are the marked
+    dates in the range, each student's 'attendance' one GRID_CODES character
+    per date ('rle': run-length encoded), plus present/absent counts
+    """
+    if reads_bitmaps():
+        rows = execute_query(GRID_BITS_SQL, (section_id, date_from, date_to, section_id))
+    else:
+        rows = execute_query(GRID_ROWS_SQL, (date_from, date_to, section_id))
+    dates = sorted({row['attendance_date'] for row in rows if row['status']})
+    column = {date: i for i, date in enumerate(dates)}
+    students, marks = [], {}
+    for row in rows:
+        if row['student_id'] not in marks:
+            marks[row['student_id']] = ['-'] * len(dates)
+            students.append({key: row[key] for key in ('student_id', 'student_code', 'first_name', 'last_name')})
+        if row['status']:
+            marks[row['student_id']][column[row['attendance_date']]] = GRID_CODES[row['status']]
+    for student in students:
+        codes = ''.join(marks[student['student_id']])
+        student['present'] = codes.count('P')
+        student['absent'] = codes.count('A')
+        student['attendance'] = run_length(codes) if encoding == 'rle' else codes
+    return [date.isoformat() for date in dates], students
+
+
+def marked_dates(section_ids, date_from, date_to):
+    """{section_id: {date, ...}} of the dates marked in the range, for several sections in one query"""
+    result = {section_id: set() for section_id in section_ids}
+    if not result:
+        return result
+    query = MARKED_DATES_SQL['bits' if reads_bitmaps() else 'rows'].format(sections=row_placeholders('%s', len(result)))
+    for row in execute_query(query, (*result, date_from, date_to)):
+        result[row['section_id']].add(_date(row['attendance_date']))
+    return result
+
+
+# ---- backfill ----------------------------------------------------------------
+
+def backfill(section_ids=None, chunk_size=CHUNK_SIZE, log=print):
+    """
+    Copy attendance rows into the bitsets, one transaction per section. Rows
+    win over bits already present, so it can be re-run at any time (in 'both'
+    mode the two stay equal). The rollups are counted from the rows already
+    and are not touched. Returns {'sections', 'rows', 'words'}.
+    """
+    if section_ids is None:
+        section_ids = [row['section_id'] for row in execute_query("SELECT DISTINCT section_id FROM attendance ORDER BY section_id")]
+    summary = {'sections': 0, 'rows': 0, 'words': 0}
+    for section_id in section_ids:
+        with transaction() as (conn, cursor):
+            cursor.execute("SELECT student_id, section_id, attendance_date AS date, status FROM attendance WHERE section_id = %s",
+                           (section_id,))
+            records = normalize(cursor.fetchall())
+            if records:
+                summary['words'] += write_bits(cursor, records, chunk_size=chunk_size)
+        versions.bump(versions.attendance(section_id))
+        summary['sections'] += 1
+        summary['rows'] += len(records)
+        if summary['sections'] % 100 == 0:
+            log(f"  sections {summary['sections']:,}/{len(section_ids):,}")
+    log(f"Backfilled {summary['rows']:,} attendance rows of {summary['sections']:,} sections into {summary['words']:,} bitset words")
+    return summary
+
+
+# per student and section: counts from the rows next to the counts from the bitsets
+VERIFY_SQL = """
+    SELECT r.section_id, r.student_id, r.total, r.present, IFNULL(b.total, 0) AS bit_total, IFNULL(b.present, 0) AS bit_present
+    FROM (
+        SELECT section_id, student_id, COUNT(*) AS total, SUM(status = 'present') AS present
+        FROM attendance GROUP BY section_id, student_id
+    ) r
+    LEFT JOIN (
+        SELECT section_id, student_id, SUM(BIT_COUNT(marked)) AS total, SUM(BIT_COUNT(present)) AS present
+        FROM attendance_bits GROUP BY section_id, student_id
+    ) b ON b.section_id = r.section_id AND b.student_id = r.student_id
+    WHERE r.total <> IFNULL(b.total, 0) OR r.present <> IFNULL(b.present, 0)
+"""
+
+
+def verify():
+    """(section_id, student_id) pairs whose bitsets disagree with their rows"""
+    return execute_query(VERIFY_SQL)
@@ -0,0 +1,154 @@
+"""
+Semester-wide fee assessment: the batch form of
+StudentModel.compute_and_update_fee_for_semester
+
+    billing.assess_semester('Fall', due_date=datetime.date(2025, 10, 1))
+
+1. one grouped aggregation computes every student's tuition for the semester
+   (enrolled sections x credits x fee_per_credit) next to the tuition their
+   fee record already carries
+2. only the differences are applied: fee_details is upserted on its primary
+   key in chunked multi-row statements (new records are created by the same
+   statements), and one multi-row ledger insert per chunk records a charge or
+   credit per student (app/database/ledger.py)
+3. students.fee_balance is moved by one set-based UPDATE over this run's
+   ledger entries
+
+Everything runs in one transaction, so a failed run leaves nothing behind,
+and a re-run only posts what changed since (normally nothing). Run it outside
+the registration window: enrollments committed while the assessment runs are
+charged by their own path, and a second run settles any overlap.
+"""
+import time
+import uuid
+
+from app.database.connection import transaction, chunks, row_placeholders
+from app.database import versions
+from app.database.ledger import NET_SQL
+
+CHUNK_SIZE = 1000
+
+# target tuition per student, and what their (first) fee record for the semester holds;
+# the second half covers records of students with no enrolled section left
+ASSESSMENT_SQL = """
+    SELECT t.student_id, t.tuition, f.fee_id, IFNULL(f.tuition_fee, 0) AS recorded
+    FROM (
+        SELECT e.student_id, SUM(c.credits * c.fee_per_credit) AS tuition
+        FROM enrollments e
+        JOIN course_sections cs ON e.section_id = cs.section_id
+        JOIN courses c ON cs.course_id = c.course_id
+        WHERE e.status = 'enrolled' AND cs.semester = %s
+        GROUP BY e.student_id
+    ) t
+    LEFT JOIN (
+        SELECT student_id, MIN(fee_id) AS fee_id FROM fee_details WHERE semester = %s GROUP BY student_id
+    ) first_fee ON first_fee.student_id = t.student_id
+    LEFT JOIN fee_details f ON f.fee_id = first_fee.fee_id
+    UNION ALL
+    SELECT f.student_id, 0 AS tuition, f.fee_id, IFNULL(f.tuition_fee, 0) AS recorded
+    FROM fee_details f
+    JOIN (
+        SELECT student_id, MIN(fee_id) AS fee_id FROM fee_details WHERE semester = %s GROUP BY student_id
+    ) first_fee ON first_fee.fee_id = f.fee_id
+    WHERE IFNULL(f.tuition_fee, 0) <> 0
+      AND NOT EXISTS (
+        SELECT 1 FROM enrollments e
+        JOIN course_sections cs ON e.section_id = cs.section_id
+        WHERE e.student_id = f.student_id AND e.status = 'enrolled' AND cs.semester = %s
+      )
+"""
+
+# keyed on fee_id: NULL inserts a new record, an existing id adds the delta
+UPSERT_SQL = """
+    INSERT INTO fee_details (fee_id, student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, amount_due, amount_paid, due_date, status)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE
+        tuition_fee = IFNULL(tuition_fee, 0) + VALUES(tuition_fee),
+        amount_due = amount_due + VALUES(amount_due),
+        due_date = IFNULL(due_date, VALUES(due_date)),
+        status = CASE WHEN amount_paid >= amount_due THEN 'paid' WHEN status = 'paid' THEN 'pending' ELSE status END
+"""
+UPSERT_ROW = "(%s, %s, %s, %s, 0.00, 0.00, %s, 0.00, %s, 'pending')"
+
+LEDGER_SQL = "INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo) VALUES {rows}"
+LEDGER_ROW = "(%s, %s, %s, 'tuition', %s, %s)"
+
+BALANCE_SQL = f"""
+    UPDATE students s
+    JOIN (
+        SELECT student_id, SUM({NET_SQL}) AS net
+        FROM fee_ledger WHERE entry_id >= %s AND memo = %s
+        GROUP BY student_id
+    ) d ON d.student_id = s.student_id
+    SET s.fee_balance = IFNULL(s.fee_balance, 0) + d.net
+"""
+
+
+def plan(cursor, semester):
+    """[(student_id, fee_id or None, delta)] for every student whose tuition changes"""
+    cursor.execute(ASSESSMENT_SQL, (semester, semester, semester, semester))
+    changes = []
+    for row in cursor.fetchall():
+        delta = (row['tuition'] or 0) - (row['recorded'] or 0)
+        if delta or row['fee_id'] is None:
+            changes.append((row['student_id'], row['fee_id'], delta))
+    return sorted(changes)
+
+
+def assess_semester(semester, due_date=None, chunk_size=CHUNK_SIZE, dry_run=False, log=print):
+    """
+    Bring every student's tuition for semester in line with their enrollments.
+    Returns {'students', 'new_records', 'charged', 'credited', 'seconds'};
+    with dry_run=True nothing is written.
+    """
+    start = time.perf_counter()
+    memo = f"semester assessment {semester} {uuid.uuid4().hex[:8]}"
+    with transaction() as (conn, cursor):
+        changes = plan(cursor, semester)
+        summary = {
+            'students': len(changes),
+            'new_records': sum(1 for _, fee_id, _ in changes if fee_id is None),
+            'charged': sum(delta for _, _, delta in changes if delta > 0),
+            'credited': -sum(delta for _, _, delta in changes if delta < 0),
+        }
+        log(f"{semester}: {summary['students']:,} students to assess ({summary['new_records']:,} new fee records), "
+            f"charges {summary['charged']:,.2f}, credits {summary['credited']:,.2f}")
+        if dry_run or not changes:
+            summary['seconds'] = time.perf_counter() - start
+            return summary
+
+        done = 0
+        for chunk in chunks(changes, chunk_size):
+            params = []
+            for student_id, fee_id, delta in chunk:
+                params += [fee_id, student_id, semester, delta, delta, due_date]
+            cursor.execute(UPSERT_SQL.format(rows=row_placeholders(UPSERT_ROW, len(chunk))), params)
+            done += len(chunk)
+            log(f"  fee records {done:,}/{len(changes):,}")
+
+        # ids of the records created above
+        cursor.execute("SELECT student_id, MIN(fee_id) AS fee_id FROM fee_details WHERE semester = %s GROUP BY student_id", (semester,))
+        fee_ids = {row['student_id']: row['fee_id'] for row in cursor.fetchall()}
+
+        first_entry = None
+        entries = [(student_id, fee_ids[student_id], delta) for student_id, _, delta in changes if delta]
+        done = 0
+        for chunk in chunks(entries, chunk_size):
+            params = []
+            for student_id, fee_id, delta in chunk:
+                params += [student_id, fee_id, 'charge' if delta > 0 else 'credit', abs(delta), memo]
+            cursor.execute(LEDGER_SQL.format(rows=row_placeholders(LEDGER_ROW, len(chunk))), params)
+            first_entry = first_entry or cursor.lastrowid
+            done += len(chunk)
+            log(f"  ledger entries {done:,}/{len(entries):,}")
+
+        if entries:
+            cursor.execute(BALANCE_SQL, (first_entry, memo))
+            log(f"  balances updated for {cursor.rowcount:,} students")
+
+    for chunk in chunks([versions.student(student_id) for student_id, _, _ in changes], chunk_size):
+        versions.bump(*chunk)
+    versions.bump('fee_details', 'students')
+    summary['seconds'] = time.perf_counter() - start
+    log(f"Assessed {summary['students']:,} students in {summary['seconds']:.1f}s")
+    return summary
@@ -1,8 +1,72 @@
 import os
+import time
+import queue
+import threading
+import contextvars
 import pymysql
+import pymysql.cursors
 from pymysql import Error
+from pymysql.constants import CLIENT
 from contextlib import contextmanager
 
+from app import metrics
+from app.database import slow_queries
+
+
+# open track_queries() logs of this thread, or of this asyncio task: a
+# context variable, so concurrent requests on one event loop stay apart
+_tracking = contextvars.ContextVar('tracked_queries', default=())
+
+
+class QueryLog(list):
+    """(query, seconds) per statement; .connections counts connection checkouts"""
+    connections = 0
+
+
+@contextmanager
+def track_queries():
+    """Collect every statement (and connection) this thread or task uses inside the block
+
+    Example:
+        with track_queries() as queries:
+            StudentModel.get_transcript(student_id)
+        print(len(queries), queries.connections)
+    """
+    queries = QueryLog()
+    token = _tracking.set(_tracking.get() + (queries,))
+    try:
+        yield queries
+    finally:
+        _tracking.reset(token)
+
+
+class InstrumentedCursor(pymysql.cursors.DictCursor):
+    """DictCursor that records statement counts, latency, lock errors and slow statements"""
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            result = super().execute(query, args)
+        except Exception as e:
+            metrics.DB_QUERIES.inc(outcome='error')
+            kind = metrics.lock_error_kind(e)
+            if kind:
+                metrics.DB_LOCK_ERRORS.inc(kind=kind)
+            for queries in _tracking.get():
+                queries.append((query, time.perf_counter() - start))
+            raise
+        elapsed = time.perf_counter() - start
+        for queries in _tracking.get():
+            queries.append((query, elapsed))
+        metrics.DB_QUERY_LATENCY.observe(elapsed)
+        metrics.DB_QUERIES.inc(outcome='ok')
+        if elapsed * 1000.0 >= slow_queries.SLOW_QUERY_MS:
+            slow_queries.record(query, args, elapsed, self.connection, self.rowcount)
+        if slow_queries.QUERY_CAPTURE_FILE:
+            slow_queries.capture(query, args)
+        return result
+
+
 # DB config - prefer environment variables for Codespace/production
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -11,7 +75,7 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME', 'student_portal'),
     'port': int(os.getenv('DB_PORT', 3307)),
     'charset': 'utf8mb4',
-    'cursorclass': pymysql.cursors.DictCursor
+    'cursorclass': InstrumentedCursor
 }
 
 def create_database_if_not_exists():
@@ -32,8 +96,9 @@ def create_database_if_not_exists():
     except Error as e:
         print(f"Error creating database: {e}")
 
-def get_connection():
-    return pymysql.connect(
+def _connect(multi_statements=False, local_infile=False):
+    start = time.perf_counter()
+    conn = pymysql.connect(
         host=DB_CONFIG['host'],
         user=DB_CONFIG['user'],
         password=DB_CONFIG['password'],
@@ -41,11 +106,139 @@ def get_connection():
         port=DB_CONFIG['port'],
         charset=DB_CONFIG['charset'],
         cursorclass=DB_CONFIG['cursorclass'],
+        client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0,
+        local_infile=local_infile,
         autocommit=False
     )
+    metrics.DB_CONNECT_LATENCY.observe(time.perf_counter() - start)
+    metrics.DB_CONNECTIONS_OPENED.inc()
+    return conn
+
+def _track_checkout():
+    for queries in _tracking.get():
+        queries.connections += 1
+
+def get_connection(multi_statements=False, local_infile=False):
+    """A dedicated connection the caller closes (not pooled).
+    multi_statements / local_infile are for script and bulk loading only"""
+    conn = _connect(multi_statements, local_infile)
+    _track_checkout()
+    return conn
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of idle connections for execute_query/transaction, one per process.
+
+    At most `size` connections exist at once; a caller that finds none idle
+    waits up to `timeout` seconds. Connections idle longer than `recycle`
+    seconds are pinged before reuse. After fork the child drops everything it
+    inherited without closing it (closing would send COM_QUIT on the parent's
+    sockets) and opens its own connections lazily. size=0 disables pooling.
+    """
+
+    def __init__(self, size, timeout=10.0, recycle=300.0):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.reset()
+
+    def reset(self):
+        """Forget every connection (used after fork; see gunicorn.conf.py)"""
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size) if self.size else None
+        self._target = None
+        metrics.DB_POOL_IDLE.set(0)
+
+    def _check_owner(self):
+        if self.pid != os.getpid():
+            self.reset()
+        # tests and tools repoint DB_CONFIG at another database at runtime
+        target = (DB_CONFIG['host'], DB_CONFIG['port'], DB_CONFIG['user'], DB_CONFIG['database'])
+        if target != self._target:
+            self._target = target
+            self.clear()
+
+    def acquire(self):
+        _track_checkout()
+        if not self.size:
+            return _connect()
+        self._check_owner()
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            metrics.DB_POOL_EXHAUSTED.inc()
+            raise Error(f"Connection pool exhausted ({self.size} in use for {self.timeout}s)")
+        metrics.DB_POOL_WAIT.observe(time.perf_counter() - start)
+        try:
+            while True:
+                try:
+                    conn, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    return _connect()
+                metrics.DB_POOL_IDLE.dec()
+                if time.monotonic() - idle_since < self.recycle:
+                    return conn
+                try:
+                    conn.ping(reconnect=False)
+                    return conn
+                except Exception:
+                    self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        if not self.size:
+            conn.close()
+            return
+        if self.pid != os.getpid():
+            return  # checked out before fork; the child never owned a slot
+        try:
+            if broken or not conn.open:
+                self._close(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+                metrics.DB_POOL_IDLE.inc()
+        finally:
+            self._slots.release()
+
+    def clear(self):
+        """Close idle connections (checked-out ones are returned as usual)"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            metrics.DB_POOL_IDLE.dec()
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+POOL = ConnectionPool(
+    int(os.getenv('DB_POOL_SIZE', 10)),
+    timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    recycle=float(os.getenv('DB_POOL_RECYCLE', 300)),
+)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=POOL.reset)
+
+
+def reset_pool():
+    POOL.reset()
+
 
 def execute_query(query, params=None, fetch=True):
-    conn = get_connection()
+    conn = POOL.acquire()
+    broken = False
+    metrics.DB_CONNECTIONS_IN_USE.inc()
     try:
         with conn.cursor() as cursor:
             cursor.execute(query, params or ())
@@ -57,11 +250,12 @@ def execute_query(query, params=None, fetch=True):
                 conn.commit()
                 return None
     except Exception as e:
-        conn.rollback()
+        broken = _rollback(conn)
         print(f"Query error: {e}\nQuery: {query}\nParams: {params}")
         raise
     finally:
-        conn.close()
+        metrics.DB_CONNECTIONS_IN_USE.dec()
+        POOL.release(conn, broken)
 
 @contextmanager
 def transaction():
@@ -72,125 +266,50 @@ def transaction():
             cursor.execute("SELECT ... FOR UPDATE", (...,))
             ...
     """
-    conn = get_connection()
+    conn = POOL.acquire()
+    broken = False
+    metrics.DB_CONNECTIONS_IN_USE.inc()
     try:
         with conn.cursor() as cursor:
             yield conn, cursor
             conn.commit()
-    except Exception:
-        conn.rollback()
+    except BaseException:
+        # GeneratorExit/KeyboardInterrupt too: never pool a connection mid-transaction
+        broken = _rollback(conn)
         raise
     finally:
-        conn.close()
+        metrics.DB_CONNECTIONS_IN_USE.dec()
+        POOL.release(conn, broken)
 
-def init_db():
-    """Initialize DB from schema.sql (keeps your existing init behavior)"""
+def chunks(items, size):
+    """Lists of at most size consecutive items (any iterable) for chunked multi-row statements"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def row_placeholders(row, count):
+    """`row` repeated count times, comma separated: VALUES {rows} of a multi-row INSERT or an IN list
+
+        cursor.execute(SQL.format(rows=row_placeholders("(%s, %s)", len(chunk))), params)
+    """
+    return ', '.join([row] * count)
+
+
+def _rollback(conn):
+    """Roll back; True when the connection is unusable and must not be pooled"""
     try:
-        create_database_if_not_exists()
-        print("🔄 Initializing database schema...")
-        schema_path = os.path.join('Backend', 'database', 'schema.sql')
-        if not os.path.exists(schema_path):
-            schema_path = os.path.join('database', 'schema.sql')
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            sql_script = f.read()
-        conn = get_connection()
-        with conn.cursor() as cursor:
-            cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-        commands = [cmd.strip() for cmd in sql_script.split(';') if cmd.strip()]
-        with conn.cursor() as cursor:
-            for command in commands:
-                if command and not command.strip().startswith('--'):
-                    try:
-                        cursor.execute(command)
-                    except Exception as e:
-                        msg = str(e).lower()
-                        if 'already exists' not in msg and 'duplicate' not in msg:
-                            print(f"Warning executing statement: {e}")
-        with conn.cursor() as cursor:
-            cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
-        conn.commit()
-        conn.close()
-        # After creating base schema, try to apply any incremental migrations if present
-        migrate_path = os.path.join('Backend', 'database', 'migrate_update_schema.sql')
-        if not os.path.exists(migrate_path):
-            migrate_path = os.path.join('database', 'migrate_update_schema.sql')
-        if os.path.exists(migrate_path):
-            try:
-                print("🔁 Applying DB migrations (if any)...")
-                with open(migrate_path, 'r', encoding='utf-8') as mf:
-                    mig_script = mf.read()
-                conn = get_connection()
-                with conn.cursor() as cursor:
-                    commands = [cmd.strip() for cmd in mig_script.split(';') if cmd.strip()]
-                    for command in commands:
-                        if command and not command.strip().startswith('--'):
-                            try:
-                                cursor.execute(command)
-                            except Exception as e:
-                                # ignore if already exists or other duplicate errors
-                                msg = str(e).lower()
-                                if 'already exists' not in msg and 'duplicate' not in msg and 'unknown column' not in msg:
-                                    print(f"Warning executing migration statement: {e}")
-                conn.commit()
-                conn.close()
-                print("✓ Migrations applied (if any)")
-            except Exception as e:
-                print(f"Error applying migrations: {e}")
-        print("✓ Database schema initialized successfully")
-        # Ensure critical columns exist in case migration parsing failed
-        try:
-            conn = get_connection()
-            with conn.cursor() as cursor:
-                # Helper to ensure a column exists
-                def ensure_column(table, column_name, column_def_sql):
-                    cursor.execute("SELECT COUNT(*) as cnt FROM information_schema.columns WHERE table_schema = %s AND table_name = %s AND column_name = %s", (DB_CONFIG['database'], table, column_name))
-                    exists = cursor.fetchone()
-                    if exists and exists.get('cnt', 0) == 0:
-                        try:
-                            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_def_sql}")
-                            print(f"Added missing column {column_name} to {table}")
-                        except Exception as e:
-                            # If we can't add (permissions or syntax), warn and continue
-                            print(f"Warning: could not add column {column_name} to {table}: {e}")
-
-                # Faculty: email, hire_date
-                ensure_column('faculty', 'email', "email VARCHAR(100) NULL")
-                ensure_column('faculty', 'hire_date', "hire_date DATE NULL")
-
-                # Courses: fee_per_credit, department_id
-                ensure_column('courses', 'fee_per_credit', "fee_per_credit DECIMAL(10,2) DEFAULT 10000.00")
-                ensure_column('courses', 'department_id', "department_id INT NULL")
-
-                # Students: fee_balance
-                ensure_column('students', 'fee_balance', "fee_balance DECIMAL(10,2) DEFAULT 0.00")
-
-                # Fee details: tuition_fee, lab_fee, miscellaneous_fee
-                ensure_column('fee_details', 'tuition_fee', "tuition_fee DECIMAL(10,2) DEFAULT 0.00")
-                ensure_column('fee_details', 'lab_fee', "lab_fee DECIMAL(10,2) DEFAULT 0.00")
-                ensure_column('fee_details', 'miscellaneous_fee', "miscellaneous_fee DECIMAL(10,2) DEFAULT 0.00")
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Warning while ensuring columns after migrations: {e}")
-        # Ensure important tables exist (sequence tables for code generation)
-        try:
-            conn = get_connection()
-            with conn.cursor() as cursor:
-                def ensure_table(table_name, create_sql):
-                    cursor.execute("SELECT COUNT(*) as cnt FROM information_schema.tables WHERE table_schema = %s AND table_name = %s", (DB_CONFIG['database'], table_name))
-                    exists = cursor.fetchone()
-                    if exists and exists.get('cnt', 0) == 0:
-                        try:
-                            cursor.execute(create_sql)
-                            print(f"Created missing table {table_name}")
-                        except Exception as e:
-                            print(f"Warning: could not create table {table_name}: {e}")
-
-                ensure_table('student_code_seq', 'CREATE TABLE IF NOT EXISTS student_code_seq (year_small INT PRIMARY KEY, last_seq INT DEFAULT 0)')
-                ensure_table('faculty_code_seq', 'CREATE TABLE IF NOT EXISTS faculty_code_seq (year_small INT PRIMARY KEY, last_seq INT DEFAULT 0)')
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Warning while ensuring important tables after migrations: {e}")
-    except Exception as e:
-        print(f"Error initializing database: {e}")
\ No newline at end of file
+        conn.rollback()
+        return not conn.open
+    except Exception:
+        return True
+
+def init_db():
+    """Bring the schema to head (see app/database/migrate.py)"""
+    from app.database.migrate import ensure_schema
+    return ensure_schema()
@@ -0,0 +1,486 @@
+"""
+Synthetic dataset generator for load testing
+
+Produces a realistic, deterministic portal database: departments, courses,
+faculty, students spread over four intake years, and for every term of the
+history the sections, enrollments, marks, attendance, transcript and fee rows
+that the app would have accumulated. The same seed and scale always produce
+the same rows (ids included), so measurements can be repeated.
+
+Rows are streamed to the server in chunks, either as multi-row INSERTs
+(executemany) or through LOAD DATA LOCAL INFILE, which is the fastest path for
+the attendance table. Use tools/generate_dataset.py to run it against a
+separate database.
+"""
+import os
+import math
+import time
+import random
+import datetime
+import tempfile
+
+import pymysql.cursors
+
+from app.database.connection import get_connection, chunks, row_placeholders
+from app.database import versions, attendance_rollups
+
+DEFAULT_SCALE = {
+    'students': 40000,
+    'departments': 8,
+    'courses_per_dept': 15,
+    'faculty_per_dept': 25,
+    'terms': 4,                 # terms of history, the last one is the current term
+    'courses_per_term': 5,      # courses each student takes per term
+    'section_capacity': 40,
+    'class_days': 28,           # attendance days per section per completed term
+    'current_progress': 0.5,    # share of the current term already taught
+    'seed': 42,
+}
+
+# generated tables, children first (used by truncate)
+TABLES = (
+    'attendance_risk', 'attendance_rollup', 'faculty_attendance_rollup', 'attendance_bits', 'attendance_sessions',
+    'attendance', 'marks', 'transcript', 'fee_ledger', 'fee_details', 'faculty_attendance',
+    'announcements', 'admin_announcements', 'enrollments', 'course_sections',
+    'courses', 'students', 'faculty', 'admin_info', 'users', 'departments',
+    'registration_periods', 'student_code_seq', 'faculty_code_seq',
+)
+
+DEPARTMENT_NAMES = [
+    ('CS', 'Computer Science'), ('EE', 'Electrical Engineering'), ('BBA', 'Business Administration'),
+    ('MATH', 'Mathematics'), ('PHY', 'Physics'), ('ME', 'Mechanical Engineering'),
+    ('CE', 'Civil Engineering'), ('ECO', 'Economics'), ('CHEM', 'Chemistry'), ('BIO', 'Biology'),
+    ('SE', 'Software Engineering'), ('AI', 'Artificial Intelligence'),
+]
+FIRST_NAMES = ['Ali', 'Sara', 'Ahmed', 'Fatima', 'Usman', 'Ayesha', 'Bilal', 'Hina', 'Omar', 'Zainab',
+               'Hamza', 'Maryam', 'Imran', 'Sana', 'Hassan', 'Noor', 'Kamran', 'Iqra', 'Farhan', 'Amna']
+LAST_NAMES = ['Khan', 'Ahmed', 'Ali', 'Hussain', 'Sheikh', 'Malik', 'Qureshi', 'Siddiqui', 'Butt', 'Raza',
+              'Javed', 'Iqbal', 'Chaudhry', 'Mirza', 'Abbasi', 'Baig', 'Zaidi', 'Rizvi', 'Hashmi', 'Anwar']
+SCHEDULES = [('MWF', (0, 2, 4)), ('TTH', (1, 3))]
+SLOTS = ['08:00-09:00', '09:00-10:00', '10:00-11:30', '11:30-13:00', '14:00-15:30', '15:30-17:00']
+FEE_PER_CREDIT = 10000
+PASSWORD = 'password123'  # same default as seed_data.sql
+
+
+def grade_for(percentage):
+    """Letter grade and grade points, same bands as the student_grades view"""
+    if percentage >= 90:
+        return 'A', 4.0
+    if percentage >= 80:
+        return 'B', 3.0
+    if percentage >= 70:
+        return 'C', 2.0
+    if percentage >= 60:
+        return 'D', 1.0
+    return 'F', 0.0
+
+
+def current_term(today=None):
+    today = today or datetime.date.today()
+    return ('Spring', today.year) if today.month < 7 else ('Fall', today.year)
+
+
+def term_history(count, last):
+    """[(semester, year)] oldest first, alternating Fall/Spring and ending at `last`"""
+    terms = [last]
+    semester, year = last
+    while len(terms) < count:
+        semester, year = ('Fall', year - 1) if semester == 'Spring' else ('Spring', year)
+        terms.append((semester, year))
+    return list(reversed(terms))
+
+
+def term_start(semester, year):
+    return datetime.date(year, 1, 15) if semester == 'Spring' else datetime.date(year, 8, 25)
+
+
+def class_dates(start, weekdays, count):
+    dates = []
+    day = start
+    while len(dates) < count:
+        if day.weekday() in weekdays:
+            dates.append(day)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def _tsv_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+class BulkWriter:
+    """Streams rows into tables with multi-row INSERTs or LOAD DATA LOCAL INFILE"""
+
+    def __init__(self, conn, method='insert', chunk_rows=5000, log=print):
+        self.conn = conn
+        self.method = method
+        self.chunk_rows = chunk_rows if method == 'insert' else max(chunk_rows, 200000)
+        self.log = log
+        self.counts = {}
+
+    def write(self, table, columns, rows):
+        start = time.perf_counter()
+        total = 0
+        for chunk in chunks(rows, self.chunk_rows):
+            if self.method == 'infile':
+                self._load_infile(table, columns, chunk)
+            else:
+                placeholders = row_placeholders('%s', len(columns))
+                sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+                # plain cursor: bulk chunks should not go through the slow query log
+                with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+                    # pymysql rewrites this into multi-row INSERT statements
+                    cursor.executemany(sql, chunk)
+            self.conn.commit()
+            total += len(chunk)
+        self.counts[table] = self.counts.get(table, 0) + total
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed if elapsed > 0 else total
+        self.log(f"  {table:<20} {total:>10,} rows  {elapsed:7.1f}s  ({rate:,.0f} rows/s)")
+        return total
+
+    def _load_infile(self, table, columns, chunk):
+        fd, path = tempfile.mkstemp(suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                for row in chunk:
+                    f.write('\t'.join(_tsv_value(v) for v in row))
+                    f.write('\n')
+            with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                    (path,)
+                )
+        finally:
+            os.remove(path)
+
+
+class DatasetGenerator:
+    """Builds the dataset in memory-light passes; run() writes everything"""
+
+    def __init__(self, scale=None, last_term=None, log=print):
+        self.scale = dict(DEFAULT_SCALE, **(scale or {}))
+        self.rng = random.Random(self.scale['seed'])
+        self.terms = term_history(self.scale['terms'], last_term or current_term())
+        self.log = log
+        self.departments = []     # (dept_id, code, name)
+        self.courses = {}         # dept_id -> [(course_id, code, name, credits)]
+        self.faculty = {}         # dept_id -> [faculty_id]
+        self.students = []        # (student_id, user_id, dept_id, start_term_index, ability, presence)
+        self.sections = []        # (section_id, course_id, faculty_id, code, semester, year, schedule, is_active, weekdays)
+        self.enrollments = []     # (enrollment_id, student_id, section_id, term_index)
+
+    # -- master data ---------------------------------------------------------
+
+    def _build_master(self):
+        s = self.scale
+        for i in range(s['departments']):
+            code, name = DEPARTMENT_NAMES[i] if i < len(DEPARTMENT_NAMES) else (f'D{i + 1:02d}', f'Department {i + 1}')
+            self.departments.append((i + 1, code, name))
+        course_id = 0
+        for dept_id, code, name in self.departments:
+            self.courses[dept_id] = []
+            for n in range(s['courses_per_dept']):
+                course_id += 1
+                level = 100 * (1 + n * 4 // s['courses_per_dept'])
+                credits = self.rng.choice((3, 3, 3, 4, 2, 1))
+                self.courses[dept_id].append((course_id, f'{code}{level + n}', f'{name} {level + n}', credits))
+
+    def _users(self):
+        """Admin, faculty and students; fills self.faculty and self.students"""
+        s = self.scale
+        user_id = 1
+        yield (user_id, 'admin', PASSWORD, 'admin@university.edu', 'admin', True)
+        faculty_id = 0
+        last_year = self.terms[-1][1]
+        self.faculty_rows = []
+        for dept_id, _, _ in self.departments:
+            self.faculty[dept_id] = []
+            for n in range(s['faculty_per_dept']):
+                user_id += 1
+                faculty_id += 1
+                hire_year = last_year - self.rng.randint(0, 15)
+                code = f'{hire_year % 100:02d}f-{faculty_id:03d}'
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                email = f'{code}@university.edu'
+                self.faculty[dept_id].append(faculty_id)
+                self.faculty_rows.append((faculty_id, user_id, code, first, last, dept_id, f'0300{faculty_id:07d}', email, datetime.date(hire_year, 8, 1), 'active'))
+                yield (user_id, code, PASSWORD, email, 'faculty', True)
+        # intake years so that everyone started within the history or up to 3 years before it
+        intake_years = [last_year - k for k in range(4)]
+        self.student_rows = []
+        per_year = {}
+        for student_id in range(1, s['students'] + 1):
+            user_id += 1
+            intake = intake_years[(student_id - 1) % len(intake_years)]
+            per_year[intake] = per_year.get(intake, 0) + 1
+            code = f'{intake % 100:02d}k-{per_year[intake]:03d}'
+            dept_id = self.departments[self.rng.randrange(len(self.departments))][0]
+            start_index = 0
+            for index, (semester, year) in enumerate(self.terms):
+                if (year, semester == 'Fall') >= (intake, True):
+                    start_index = index
+                    break
+            else:
+                start_index = len(self.terms)
+            ability = min(0.99, max(0.35, self.rng.gauss(0.78, 0.12)))
+            presence = min(0.99, max(0.40, self.rng.gauss(0.85, 0.10)))
+            self.students.append((student_id, user_id, dept_id, start_index, ability, presence))
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            terms_done = sum(1 for (sem, yr) in self.terms if (yr, sem == 'Fall') >= (intake, True))
+            self.student_rows.append((student_id, user_id, code, first, last, datetime.date(intake - 19, 1 + student_id % 12, 1 + student_id % 28),
+                                      f'0321{student_id:07d}', f'{35200 + student_id % 1000}-{student_id:07d}-1', datetime.date(intake, 8, 15),
+                                      dept_id, max(1, terms_done), 'active'))
+            email = f'{code}@university.edu'
+            yield (user_id, code, PASSWORD, email, 'student', True)
+        self.intake_counts = per_year
+
+    # -- term data -----------------------------------------------------------
+
+    def _build_terms(self):
+        """Choose courses per student and cut sections by capacity"""
+        s = self.scale
+        taken = {}
+        section_id = 0
+        enrollment_id = 0
+        last_index = len(self.terms) - 1
+        for index, (semester, year) in enumerate(self.terms):
+            demand = {}
+            for student_id, _, dept_id, start_index, _, _ in self.students:
+                if start_index > index:
+                    continue
+                done = taken.setdefault(student_id, set())
+                options = [c for c in self.courses[dept_id] if c[0] not in done]
+                for course in self.rng.sample(options, min(s['courses_per_term'], len(options))):
+                    done.add(course[0])
+                    demand.setdefault(course[0], []).append(student_id)
+            for dept_id, _, _ in self.departments:
+                teachers = self.faculty[dept_id]
+                for n, (course_id, _, _, _) in enumerate(self.courses[dept_id]):
+                    students = demand.get(course_id, [])
+                    count = max(1, math.ceil(len(students) / s['section_capacity'])) if students or index == last_index else 0
+                    for k in range(count):
+                        section_id += 1
+                        label, weekdays = SCHEDULES[(n + k) % len(SCHEDULES)]
+                        code = chr(ord('A') + k) if k < 26 else f'S{k + 1}'
+                        faculty_id = teachers[(n * 3 + k) % len(teachers)]
+                        self.sections.append((section_id, course_id, faculty_id, code, semester, year,
+                                              f'{label} {SLOTS[(n + k) % len(SLOTS)]}', index == last_index, weekdays))
+                        for student_id in students[k * s['section_capacity']:(k + 1) * s['section_capacity']]:
+                            enrollment_id += 1
+                            self.enrollments.append((enrollment_id, student_id, section_id, index))
+
+    def _section_rows(self):
+        for section_id, course_id, faculty_id, code, semester, year, schedule, active, _ in self.sections:
+            yield (section_id, course_id, faculty_id, code, semester, year, schedule, f'R-{100 + section_id % 400}', self.scale['section_capacity'], active)
+
+    def _enrollment_rows(self):
+        last_index = len(self.terms) - 1
+        for enrollment_id, student_id, section_id, index in self.enrollments:
+            semester, year = self.terms[index]
+            status = 'enrolled' if index == last_index else 'completed'
+            yield (enrollment_id, student_id, section_id, term_start(semester, year) - datetime.timedelta(days=10), status)
+
+    def _marks(self, ability, complete):
+        """(quiz, a1, a2, project, midterm, final) scaled to the default totals"""
+        rng = self.rng
+        def score(total):
+            return round(total * min(1.0, max(0.0, rng.gauss(ability, 0.08))), 2)
+        marks = [score(10), score(10), score(10), score(20), score(20), score(30)]
+        if not complete:
+            marks[3] = marks[5] = 0
+        return marks
+
+    def _marks_and_transcript(self):
+        """Marks for every enrollment; transcript rows for completed terms"""
+        last_index = len(self.terms) - 1
+        ability = {st[0]: st[4] for st in self.students}
+        course_of_section = {sec[0]: sec[1] for sec in self.sections}
+        course_info = {c[0]: c for courses in self.courses.values() for c in courses}
+        self.transcript_rows = []
+        for enrollment_id, student_id, section_id, index in self.enrollments:
+            complete = index != last_index
+            marks = self._marks(ability[student_id], complete)
+            yield (enrollment_id, *marks)
+            if complete:
+                grade, points = grade_for(sum(marks))
+                _, code, name, credits = course_info[course_of_section[section_id]]
+                semester, year = self.terms[index]
+                self.transcript_rows.append((student_id, code, name, credits, f'{semester} {year}', grade, points))
+
+    def _attendance(self):
+        """One row per enrolled student per class day - the bulk of the dataset"""
+        s = self.scale
+        last_index = len(self.terms) - 1
+        presence = {st[0]: st[5] for st in self.students}
+        by_section = {}
+        for _, student_id, section_id, _ in self.enrollments:
+            by_section.setdefault(section_id, []).append(student_id)
+        term_index = {term: i for i, term in enumerate(self.terms)}
+        rng = self.rng
+        for section_id, _, _, _, semester, year, _, _, weekdays in self.sections:
+            students = by_section.get(section_id)
+            if not students:
+                continue
+            days = s['class_days'] if term_index[(semester, year)] != last_index else int(s['class_days'] * s['current_progress'])
+            for day in class_dates(term_start(semester, year), weekdays, days):
+                for student_id in students:
+                    yield (student_id, section_id, day, 'present' if rng.random() < presence[student_id] else 'absent')
+
+    def _fees(self):
+        last_index = len(self.terms) - 1
+        credits = {c[0]: c[3] for courses in self.courses.values() for c in courses}
+        course_of_section = {sec[0]: sec[1] for sec in self.sections}
+        per_term = {}
+        for _, student_id, section_id, index in self.enrollments:
+            key = (student_id, index)
+            per_term[key] = per_term.get(key, 0) + credits[course_of_section[section_id]]
+        for (student_id, index), total_credits in sorted(per_term.items()):
+            semester, year = self.terms[index]
+            tuition = total_credits * FEE_PER_CREDIT
+            due = term_start(semester, year) + datetime.timedelta(days=30)
+            if index != last_index or student_id % 3 == 0:
+                paid, status, paid_on = tuition, 'paid', due - datetime.timedelta(days=5)
+            elif student_id % 3 == 1:
+                paid, status, paid_on = tuition / 2, 'pending', None
+            else:
+                paid, status, paid_on = 0, 'pending', None
+            yield (student_id, f'{semester} {year}', tuition, 0, 0, tuition, paid, due, paid_on, status)
+
+    def _faculty_attendance(self):
+        semester, year = self.terms[-1]
+        days = class_dates(term_start(semester, year), (0, 1, 2, 3, 4), int(self.scale['class_days'] * self.scale['current_progress']))
+        for faculty_ids in self.faculty.values():
+            for faculty_id in faculty_ids:
+                for n, day in enumerate(days):
+                    status = 'present' if self.rng.random() > 0.10 else 'absent'
+                    yield (faculty_id, day, 'Morning' if n % 2 == 0 else 'Evening', status, 1)
+
+    def _announcements(self):
+        last_index = len(self.terms) - 1
+        semester, year = self.terms[last_index]
+        start = term_start(semester, year)
+        for section_id, _, faculty_id, _, sec_semester, sec_year, _, _, _ in self.sections:
+            if (sec_semester, sec_year) != (semester, year):
+                continue
+            for week in (1, 8):
+                created = datetime.datetime.combine(start + datetime.timedelta(days=7 * (week - 1) + section_id % 7), datetime.time(9))
+                yield (faculty_id, section_id, f'Week {week} update', 'Please check the course outline and upcoming deadlines.', created)
+
+    # -- driver --------------------------------------------------------------
+
+    def run(self, writer):
+        s = self.scale
+        start = time.perf_counter()
+        self.log(f"Generating dataset: {s['students']:,} students, terms {self.terms[0][0]} {self.terms[0][1]} .. {self.terms[-1][0]} {self.terms[-1][1]}, seed {s['seed']}")
+        self._build_master()
+        writer.write('departments', ('dept_id', 'dept_code', 'dept_name'), self.departments)
+        writer.write('users', ('user_id', 'username', 'password_hash', 'email', 'role', 'is_active'), self._users())
+        writer.write('admin_info', ('admin_id', 'user_id', 'name', 'department', 'email', 'contact'),
+                     [(1, 1, 'Admin User', 'Administration', 'admin@university.edu', '0300-0000000')])
+        writer.write('faculty', ('faculty_id', 'user_id', 'faculty_code', 'first_name', 'last_name', 'department_id', 'phone', 'email', 'hire_date', 'status'), self.faculty_rows)
+        writer.write('students', ('student_id', 'user_id', 'student_code', 'first_name', 'last_name', 'date_of_birth', 'phone', 'cnic', 'enrollment_date', 'major_dept_id', 'current_semester', 'status'), self.student_rows)
+        writer.write('courses', ('course_id', 'course_code', 'course_name', 'credits', 'fee_per_credit', 'department_id'),
+                     [(c[0], c[1], c[2], c[3], FEE_PER_CREDIT, dept_id) for dept_id, courses in self.courses.items() for c in courses])
+        self._build_terms()
+        writer.write('course_sections', ('section_id', 'course_id', 'faculty_id', 'section_code', 'semester', 'year', 'schedule', 'room', 'max_capacity', 'is_active'), self._section_rows())
+        writer.write('enrollments', ('enrollment_id', 'student_id', 'section_id', 'enrollment_date', 'status'), self._enrollment_rows())
+        writer.write('marks', ('enrollment_id', 'quiz_marks', 'assignment1_marks', 'assignment2_marks', 'project_marks', 'midterm_marks', 'final_marks'), self._marks_and_transcript())
+        writer.write('transcript', ('student_id', 'course_code', 'course_name', 'credits', 'semester', 'final_grade', 'grade_points'), self.transcript_rows)
+        writer.write('attendance', ('student_id', 'section_id', 'attendance_date', 'status'), self._attendance())
+        writer.write('fee_details', ('student_id', 'semester', 'tuition_fee', 'lab_fee', 'miscellaneous_fee', 'amount_due', 'amount_paid', 'due_date', 'payment_date', 'status'), self._fees())
+        writer.write('faculty_attendance', ('faculty_id', 'attendance_date', 'session', 'status', 'marked_by'), self._faculty_attendance())
+        writer.write('announcements', ('faculty_id', 'section_id', 'title', 'message', 'created_at'), self._announcements())
+        semester, year = self.terms[-1]
+        writer.write('admin_announcements', ('title', 'message', 'type', 'created_by', 'created_at', 'is_active'),
+                     [('Welcome back', f'Classes for {semester} {year} have started.', 'general', 1, datetime.datetime.combine(term_start(semester, year), datetime.time(8)), True)])
+        writer.write('registration_periods', ('semester', 'year', 'start_date', 'end_date', 'is_active'),
+                     [(sem, yr, term_start(sem, yr) - datetime.timedelta(days=30), term_start(sem, yr) + datetime.timedelta(days=14), (sem, yr) == (semester, year)) for sem, yr in self.terms])
+        writer.write('student_code_seq', ('year_small', 'last_seq'), sorted((year % 100, n) for year, n in self.intake_counts.items()))
+        self._finish(writer.conn)
+        self.log(f"Done in {time.perf_counter() - start:.1f}s")
+        return writer.counts
+
+    def _finish(self, conn):
+        """Derived columns, computed set-based like seed_data.sql does"""
+        with conn.cursor() as cursor:
+            # opening ledger entries for the generated fee records (tuition charge + payment)
+            cursor.execute("""
+                INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+                SELECT student_id, fee_id, 'charge', 'tuition', tuition_fee, 'opening balance' FROM fee_details WHERE tuition_fee > 0
+            """)
+            cursor.execute("""
+                INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+                SELECT student_id, fee_id, 'payment', NULL, amount_paid, 'opening balance' FROM fee_details WHERE amount_paid > 0
+            """)
+            cursor.execute("""
+                UPDATE students s
+                JOIN (SELECT student_id, SUM(amount_due - amount_paid) AS balance FROM fee_details GROUP BY student_id) b
+                  ON b.student_id = s.student_id
+                SET s.fee_balance = b.balance
+            """)
+            cursor.execute("""
+                UPDATE faculty f
+                JOIN (
+                    SELECT cs.faculty_id, SUM(c.credits * c.fee_per_credit) AS total
+                    FROM course_sections cs JOIN courses c ON cs.course_id = c.course_id
+                    WHERE cs.is_active = TRUE
+                    GROUP BY cs.faculty_id
+                ) t ON t.faculty_id = f.faculty_id
+                SET f.salary = t.total
+            """)
+            cursor.execute(f"INSERT INTO attendance_rollup (student_id, section_id, total, present) {attendance_rollups.STUDENT_SOURCES['rows']}")
+            cursor.execute(f"INSERT INTO faculty_attendance_rollup (faculty_id, total_days, present_days, absent_days) {attendance_rollups.FACULTY_SOURCE}")
+            cursor.execute("""
+                INSERT INTO faculty_code_seq (year_small, last_seq)
+                SELECT CAST(LEFT(faculty_code, 2) AS UNSIGNED), MAX(faculty_id) FROM faculty GROUP BY LEFT(faculty_code, 2)
+                ON DUPLICATE KEY UPDATE last_seq = VALUES(last_seq)
+            """)
+            cursor.execute("ANALYZE TABLE attendance, enrollments, course_sections, marks, transcript, fee_details")
+            cursor.fetchall()
+        conn.commit()
+
+
+def prepare_session(conn):
+    """Loader settings: skip per-row FK/unique checks (ids are generated consistently)"""
+    with conn.cursor() as cursor:
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+    conn.commit()
+
+
+def truncate(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        for table in TABLES:
+            cursor.execute(f"TRUNCATE TABLE {table}")
+    conn.commit()
+
+
+def is_empty(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS cnt FROM users")
+        return cursor.fetchone()['cnt'] == 0
+
+
+def generate(scale=None, last_term=None, method='insert', chunk_rows=5000, replace=False, log=print):
+    """Fill the configured database; returns {table: rows written}"""
+    conn = get_connection(local_infile=(method == 'infile'))
+    try:
+        if not is_empty(conn):
+            if not replace:
+                raise RuntimeError("Target database already has users; pass replace=True (--truncate) to wipe it")
+            truncate(conn)
+        prepare_session(conn)
+        generator = DatasetGenerator(scale, last_term, log)
+        counts = generator.run(BulkWriter(conn, method, chunk_rows, log))
+    finally:
+        conn.close()
+    # a running app may have cached the previous contents
+    versions.bump_all()
+    return counts
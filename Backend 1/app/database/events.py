@@ -0,0 +1,233 @@
+"""
+Event log and in-process pub/sub behind the server-sent events stream
+
+Writers call publish() / publish_seats() after their transaction has
+committed; each appends one row to event_log (migration 004). Every process
+runs one tailer thread while it has subscribers: it reads new rows every
+EVENT_POLL_INTERVAL seconds and fans them out to its local subscribers, so
+a thousand open streams cost one indexed range scan per interval per worker,
+and an announcement posted through one gunicorn worker reaches clients
+connected to any other.
+
+Each subscriber has a bounded buffer (EVENT_BUFFER events). A client that
+falls behind loses its backlog and gets a single 'resync' event instead,
+telling it to refetch with the regular REST endpoints; a slow reader can
+never grow memory or hold up the tailer.
+
+    sub = BROKER.subscribe({'announcements', 'seats'}, last_event_id=41)
+    if sub.wait(15):
+        for event in sub.drain():
+            ...  # {'id': 42, 'topic': 'seats', 'data': {...}}
+    BROKER.unsubscribe(sub)
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+
+from app import metrics
+from app.database.connection import execute_query
+
+EVENTS_ENABLED = os.getenv('EVENTS_ENABLED', '1') == '1'
+EVENT_BUFFER = int(os.getenv('EVENT_BUFFER', 100))
+EVENT_POLL_INTERVAL = float(os.getenv('EVENT_POLL_INTERVAL', 0.5))
+EVENT_RETENTION_MINUTES = int(os.getenv('EVENT_RETENTION_MINUTES', 60))
+
+TOPICS = ('announcements', 'seats')
+
+# rows read per tailer poll; a bigger burst is picked up on the next poll
+_BATCH = 500
+_PRUNE_EVERY = 60.0
+
+_SEATS_SQL = """
+    INSERT INTO event_log (topic, payload)
+    SELECT 'seats', JSON_OBJECT(
+        'section_id', cs.section_id,
+        'max_capacity', cs.max_capacity,
+        'enrolled', COUNT(e.enrollment_id),
+        'seats_available', cs.max_capacity - COUNT(e.enrollment_id))
+    FROM course_sections cs
+    LEFT JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+    WHERE cs.section_id = %s
+    GROUP BY cs.section_id, cs.max_capacity
+"""
+
+
+def publish(topic, data):
+    """Append an event for every subscriber of topic (call after commit)"""
+    if not EVENTS_ENABLED:
+        return False
+    try:
+        execute_query("INSERT INTO event_log (topic, payload) VALUES (%s, %s)",
+                      (topic, json.dumps(data, default=str)), fetch=False)
+        return True
+    except Exception as e:
+        print(f"Event publish error: {e}")
+        return False
+
+
+def publish_seats(section_id):
+    """Publish the section's current seat counts; one INSERT ... SELECT"""
+    if not EVENTS_ENABLED:
+        return False
+    try:
+        execute_query(_SEATS_SQL, (section_id,), fetch=False)
+        return True
+    except Exception as e:
+        print(f"Event publish error: {e}")
+        return False
+
+
+def read_since(event_id, upto=None, limit=_BATCH):
+    """Events after event_id (and at most upto), oldest first"""
+    query = "SELECT event_id, topic, payload FROM event_log WHERE event_id > %s"
+    params = [event_id]
+    if upto is not None:
+        query += " AND event_id <= %s"
+        params.append(upto)
+    query += " ORDER BY event_id LIMIT %s"
+    params.append(limit)
+    events = []
+    for row in execute_query(query, tuple(params)):
+        try:
+            data = json.loads(row['payload'])
+        except ValueError:
+            data = {}
+        events.append({'id': row['event_id'], 'topic': row['topic'], 'data': data})
+    return events
+
+
+def last_event_id():
+    rows = execute_query("SELECT COALESCE(MAX(event_id), 0) as last_id FROM event_log")
+    return rows[0]['last_id'] if rows else 0
+
+
+def prune():
+    """Drop events older than EVENT_RETENTION_MINUTES"""
+    try:
+        execute_query("DELETE FROM event_log WHERE created_at < NOW() - INTERVAL %s MINUTE LIMIT 10000",
+                      (EVENT_RETENTION_MINUTES,), fetch=False)
+    except Exception as e:
+        print(f"Event prune error: {e}")
+
+
+class Subscriber:
+    """One stream's bounded buffer; accept(event) -> bool filters what it receives"""
+
+    def __init__(self, topics, accept=None, notify=None):
+        self.topics = set(topics)
+        self.accept = accept
+        self.notify = notify
+        self.dropped = 0
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def push(self, event):
+        if event['topic'] not in self.topics:
+            return
+        if self.accept is not None and not self.accept(event):
+            return
+        with self._lock:
+            if len(self._events) >= EVENT_BUFFER:
+                # slow consumer: replace the backlog with one "refetch everything"
+                self.dropped += len(self._events)
+                metrics.EVENTS_DROPPED.inc(amount=len(self._events))
+                self._events.clear()
+                event = {'id': event['id'], 'topic': 'resync', 'data': {}}
+            self._events.append(event)
+        self._ready.set()
+        if self.notify is not None:
+            self.notify()
+
+    def drain(self):
+        """Buffered events, oldest first"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            self._ready.clear()
+        return events
+
+    def wait(self, timeout):
+        """True when events are buffered, False after timeout seconds"""
+        return self._ready.wait(timeout)
+
+
+class EventBroker:
+    """Per-process fan-out of event_log rows to subscribers"""
+
+    def __init__(self, poll_interval=EVENT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._last_id = None
+
+    def subscribe(self, topics, accept=None, notify=None, last_event_id=None):
+        """
+        Register a subscriber. With last_event_id (the SSE Last-Event-ID of a
+        reconnecting client) the events it missed are replayed first, as long
+        as they are still in the log.
+        """
+        sub = Subscriber(topics, accept, notify)
+        with self._lock:
+            self._ensure_tailer()
+            if last_event_id is not None and last_event_id < self._last_id:
+                # the tailer dispatches everything after _last_id; replay up to it under the lock
+                for event in read_since(last_event_id, upto=self._last_id, limit=EVENT_BUFFER + 1):
+                    sub.push(event)
+            self._subscribers.add(sub)
+            metrics.EVENT_SUBSCRIBERS.set(len(self._subscribers))
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+            metrics.EVENT_SUBSCRIBERS.set(len(self._subscribers))
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def dispatch(self, events):
+        """Deliver events to the local subscribers (the tailer calls this)"""
+        with self._lock:
+            for event in events:
+                self._last_id = max(self._last_id or 0, event['id'])
+                for sub in self._subscribers:
+                    sub.push(event)
+
+    def _ensure_tailer(self):
+        # the thread does not survive a fork; a child starts its own
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        if self._pid != os.getpid():
+            self._subscribers = set()
+        self._pid = os.getpid()
+        self._last_id = last_event_id()
+        self._thread = threading.Thread(target=self._tail, name='event-tailer', daemon=True)
+        self._thread.start()
+
+    def _tail(self):
+        last_prune = time.monotonic()
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._subscribers or self._pid != os.getpid():
+                    self._thread = None
+                    return
+                after = self._last_id
+            try:
+                events = read_since(after)
+                if events:
+                    self.dispatch(events)
+                if time.monotonic() - last_prune >= _PRUNE_EVERY:
+                    last_prune = time.monotonic()
+                    prune()
+            except Exception as e:
+                print(f"Event tailer error: {e}")
+
+
+BROKER = EventBroker()
@@ -0,0 +1,227 @@
+"""
+Append-only fee ledger (fee_ledger, migration 005)
+
+Every change to what a student owes is one appended entry:
+- charge:  tuition for an enrollment, a fee record added by the admin
+- credit:  a dropped enrollment, a correction
+- payment: money received
+fee_details (one row per student and semester) and students.fee_balance are
+running totals: post() adds the entry's delta to them, so an enroll, drop or
+payment touches a few rows by key instead of re-aggregating the student's
+whole fee history. reconcile() recomputes the totals from scratch.
+
+post() runs on the caller's cursor, inside the caller's transaction; bump
+the versions after the commit:
+
+    with transaction() as (conn, cursor):
+        ...
+        ledger.post(cursor, student_id, semester, 'charge', fee, enrollment_id=enrollment_id)
+    versions.bump('fee_details', 'students', versions.student(student_id))
+"""
+from decimal import Decimal
+
+from app.database.connection import execute_query, transaction
+from app.database import versions
+
+ENTRY_TYPES = ('charge', 'credit', 'payment')
+# ledger component -> fee_details column
+COMPONENTS = {'tuition': 'tuition_fee', 'lab': 'lab_fee', 'miscellaneous': 'miscellaneous_fee'}
+
+# charge +, credit -, payment - (from the student's point of view: what they owe)
+NET_SQL = "CASE entry_type WHEN 'charge' THEN amount ELSE -amount END"
+DUE_SQL = "CASE entry_type WHEN 'charge' THEN amount WHEN 'credit' THEN -amount ELSE 0 END"
+
+# tuition one enrollment adds; the section's semester keys its fee_details row
+SECTION_FEE_SQL = """
+    SELECT cs.semester, c.credits * c.fee_per_credit AS fee
+    FROM course_sections cs
+    JOIN courses c ON cs.course_id = c.course_id
+    WHERE cs.section_id = %s
+"""
+
+
+def signed(entry_type, amount):
+    """Change of the student's balance for an entry"""
+    return amount if entry_type == 'charge' else -amount
+
+
+def _fee_row(cursor, student_id, semester, due_date):
+    """fee_id of the student's fee_details row for semester (locked), created when missing"""
+    cursor.execute("SELECT fee_id FROM fee_details WHERE student_id = %s AND semester = %s ORDER BY fee_id LIMIT 1 FOR UPDATE",
+                   (student_id, semester))
+    row = cursor.fetchone()
+    if row:
+        return row['fee_id']
+    cursor.execute("""
+        INSERT INTO fee_details (student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, amount_due, amount_paid, due_date, status)
+        VALUES (%s, %s, 0.00, 0.00, 0.00, 0.00, 0.00, %s, 'pending')
+    """, (student_id, semester, due_date))
+    return cursor.lastrowid
+
+
+def post(cursor, student_id, semester, entry_type, amount, component='tuition', fee_id=None,
+         enrollment_id=None, due_date=None, memo=None):
+    """
+    Append one entry and apply its delta to fee_details and students.fee_balance.
+    Charges and credits move amount_due and the component's column (component=None:
+    amount_due only); payments move amount_paid. Returns the fee_id.
+    """
+    if entry_type not in ENTRY_TYPES:
+        raise ValueError(f"Unknown ledger entry type: {entry_type}")
+    if component is not None and component not in COMPONENTS:
+        raise ValueError(f"Unknown fee component: {component}")
+    amount = Decimal(str(amount or 0))
+    if amount < 0:
+        raise ValueError("Ledger amounts must not be negative")
+    if fee_id is None:
+        fee_id = _fee_row(cursor, student_id, semester, due_date)
+
+    if entry_type == 'payment':
+        component = None
+    cursor.execute("""
+        INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, enrollment_id, memo)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (student_id, fee_id, entry_type, component, amount, enrollment_id, memo))
+
+    # MySQL evaluates SET left to right, so status sees the new amounts
+    status = "status = CASE WHEN amount_paid >= amount_due THEN 'paid' WHEN status = 'paid' THEN 'pending' ELSE status END"
+    if entry_type == 'payment':
+        cursor.execute(f"UPDATE fee_details SET amount_paid = amount_paid + %s, payment_date = CURDATE(), {status} WHERE fee_id = %s",
+                       (amount, fee_id))
+    else:
+        delta = signed(entry_type, amount)
+        column = COMPONENTS.get(component)
+        moves = "amount_due = amount_due + %s" + (f", {column} = IFNULL({column}, 0) + %s" if column else "")
+        params = (delta, delta) if column else (delta,)
+        cursor.execute(f"UPDATE fee_details SET {moves}, due_date = IFNULL(due_date, %s), {status} WHERE fee_id = %s",
+                       params + (due_date, fee_id))
+    cursor.execute("UPDATE students SET fee_balance = IFNULL(fee_balance, 0) + %s WHERE student_id = %s",
+                   (signed(entry_type, amount), student_id))
+    return fee_id
+
+
+def charge_enrollment(cursor, student_id, section_id, enrollment_id):
+    """Charge the section's tuition for a new enrollment; returns the semester"""
+    cursor.execute(SECTION_FEE_SQL, (section_id,))
+    section = cursor.fetchone()
+    if not section:
+        return None
+    post(cursor, student_id, section['semester'], 'charge', section['fee'] or 0, enrollment_id=enrollment_id)
+    return section['semester']
+
+
+def credit_enrollment(cursor, student_id, section_id, enrollment_id):
+    """Credit back what the enrollment was charged; returns the semester"""
+    cursor.execute(SECTION_FEE_SQL, (section_id,))
+    section = cursor.fetchone()
+    if not section:
+        return None
+    cursor.execute(f"SELECT COUNT(*) AS entries, IFNULL(SUM({DUE_SQL}), 0) AS net FROM fee_ledger WHERE enrollment_id = %s",
+                   (enrollment_id,))
+    charged = cursor.fetchone()
+    if charged and charged['entries']:
+        if charged['net'] > 0:
+            post(cursor, student_id, section['semester'], 'credit', charged['net'], enrollment_id=enrollment_id)
+    elif section['fee']:
+        # enrolled before the ledger existed: its tuition is part of the opening balance
+        post(cursor, student_id, section['semester'], 'credit', section['fee'],
+             enrollment_id=enrollment_id, memo='drop of a pre-ledger enrollment')
+    return section['semester']
+
+
+# ---- reconciliation ---------------------------------------------------------
+
+BALANCE_CHECK_SQL = f"""
+    SELECT s.student_id, s.fee_balance AS stored, IFNULL(l.net, 0) AS expected
+    FROM students s
+    LEFT JOIN (SELECT student_id, SUM({NET_SQL}) AS net FROM fee_ledger GROUP BY student_id) l
+      ON l.student_id = s.student_id
+    WHERE IFNULL(s.fee_balance, 0) <> IFNULL(l.net, 0)
+"""
+
+FEE_CHECK_SQL = f"""
+    SELECT f.fee_id, f.student_id, f.semester,
+           f.amount_due, IFNULL(l.due, 0) AS expected_due,
+           f.amount_paid, IFNULL(l.paid, 0) AS expected_paid,
+           f.tuition_fee, IFNULL(l.tuition, 0) AS expected_tuition,
+           f.lab_fee, IFNULL(l.lab, 0) AS expected_lab,
+           f.miscellaneous_fee, IFNULL(l.miscellaneous, 0) AS expected_miscellaneous
+    FROM fee_details f
+    LEFT JOIN (
+        SELECT fee_id,
+               SUM({DUE_SQL}) AS due,
+               SUM(IF(entry_type = 'payment', amount, 0)) AS paid,
+               SUM(IF(component = 'tuition', {DUE_SQL}, 0)) AS tuition,
+               SUM(IF(component = 'lab', {DUE_SQL}, 0)) AS lab,
+               SUM(IF(component = 'miscellaneous', {DUE_SQL}, 0)) AS miscellaneous
+        FROM fee_ledger GROUP BY fee_id
+    ) l ON l.fee_id = f.fee_id
+    WHERE f.amount_due <> IFNULL(l.due, 0)
+       OR IFNULL(f.amount_paid, 0) <> IFNULL(l.paid, 0)
+       OR IFNULL(f.tuition_fee, 0) <> IFNULL(l.tuition, 0)
+       OR IFNULL(f.lab_fee, 0) <> IFNULL(l.lab, 0)
+       OR IFNULL(f.miscellaneous_fee, 0) <> IFNULL(l.miscellaneous, 0)
+"""
+
+# enrollments charged through the ledger: still enrolled -> no credit yet, dropped -> fully credited
+ENROLLMENT_CHECK_SQL = f"""
+    SELECT e.enrollment_id, e.student_id, e.section_id, e.status, l.charged, l.net
+    FROM enrollments e
+    JOIN (
+        SELECT enrollment_id, SUM(IF(entry_type = 'charge', amount, 0)) AS charged, SUM({DUE_SQL}) AS net
+        FROM fee_ledger WHERE enrollment_id IS NOT NULL GROUP BY enrollment_id
+        HAVING charged > 0
+    ) l ON l.enrollment_id = e.enrollment_id
+    WHERE (e.status = 'enrolled' AND l.net <> l.charged)
+       OR (e.status = 'dropped' AND l.net <> 0)
+"""
+
+FIX_BALANCES_SQL = f"""
+    UPDATE students s
+    LEFT JOIN (SELECT student_id, SUM({NET_SQL}) AS net FROM fee_ledger GROUP BY student_id) l
+      ON l.student_id = s.student_id
+    SET s.fee_balance = IFNULL(l.net, 0)
+    WHERE IFNULL(s.fee_balance, 0) <> IFNULL(l.net, 0)
+"""
+
+FIX_FEES_SQL = f"""
+    UPDATE fee_details f
+    LEFT JOIN (
+        SELECT fee_id,
+               SUM({DUE_SQL}) AS due,
+               SUM(IF(entry_type = 'payment', amount, 0)) AS paid,
+               SUM(IF(component = 'tuition', {DUE_SQL}, 0)) AS tuition,
+               SUM(IF(component = 'lab', {DUE_SQL}, 0)) AS lab,
+               SUM(IF(component = 'miscellaneous', {DUE_SQL}, 0)) AS miscellaneous
+        FROM fee_ledger GROUP BY fee_id
+    ) l ON l.fee_id = f.fee_id
+    SET f.amount_due = IFNULL(l.due, 0), f.amount_paid = IFNULL(l.paid, 0),
+        f.tuition_fee = IFNULL(l.tuition, 0), f.lab_fee = IFNULL(l.lab, 0),
+        f.miscellaneous_fee = IFNULL(l.miscellaneous, 0)
+    WHERE f.amount_due <> IFNULL(l.due, 0)
+       OR IFNULL(f.amount_paid, 0) <> IFNULL(l.paid, 0)
+       OR IFNULL(f.tuition_fee, 0) <> IFNULL(l.tuition, 0)
+       OR IFNULL(f.lab_fee, 0) <> IFNULL(l.lab, 0)
+       OR IFNULL(f.miscellaneous_fee, 0) <> IFNULL(l.miscellaneous, 0)
+"""
+
+
+def reconcile(fix=False):
+    """
+    Compare the running totals with a full recomputation from the ledger.
+    Returns {'balances': [...], 'fees': [...], 'enrollments': [...]} of mismatching
+    rows; with fix=True the totals are rewritten from the ledger (which is never
+    changed) and mismatching enrollments are only reported.
+    """
+    result = {
+        'balances': execute_query(BALANCE_CHECK_SQL),
+        'fees': execute_query(FEE_CHECK_SQL),
+        'enrollments': execute_query(ENROLLMENT_CHECK_SQL),
+    }
+    if fix and (result['balances'] or result['fees']):
+        with transaction() as (conn, cursor):
+            cursor.execute(FIX_FEES_SQL)
+            cursor.execute(FIX_BALANCES_SQL)
+        students = {r['student_id'] for r in result['balances'] + result['fees']}
+        versions.bump('fee_details', 'students', *[versions.student(s) for s in students])
+    return result
@@ -0,0 +1,280 @@
+"""
+Versioned schema migrations
+
+Version 000 is the baseline: schema.sql, migrate_update_schema.sql and the
+column/table guards that init_db used to run on every start. Every
+NNN_name.sql file in database/migrations is one further version. Applied
+versions are recorded in schema_migrations together with the checksum of
+their SQL, so each one runs exactly once per database.
+
+Workers call ensure_schema() at startup. A single SELECT against
+schema_migrations decides whether the database is already at head; only
+when it is not is a GET_LOCK taken, so one process applies the DDL while
+the others wait and then find nothing left to do.
+
+CLI:
+    python -m app.database.migrate                # apply pending migrations
+    python -m app.database.migrate status         # applied / pending versions
+    python -m app.database.migrate up --dry-run   # show what would run
+"""
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+
+if __name__ == '__main__':
+    # the CLI runs outside main.py, so load app/.env before DB_CONFIG is built
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+import pymysql
+
+from app.database.connection import get_connection, create_database_if_not_exists, DB_CONFIG
+from app.database.sql_script import execute_file, ScriptError
+
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(DATABASE_DIR, 'migrations')
+BASELINE_FILES = ('schema.sql', 'migrate_update_schema.sql')
+LOCK_TIMEOUT = int(os.getenv('MIGRATION_LOCK_TIMEOUT', 120))
+
+_FILE_RE = re.compile(r'^(\d{3,})_(\w+)\.sql$')
+# MySQL errors that only mean "this object is already there" - migrations stay
+# re-runnable. Codes, not messages: 'Duplicate entry' (1062) is a data error.
+ER_TABLE_EXISTS, ER_DUP_FIELDNAME, ER_DUP_KEYNAME = 1050, 1060, 1061
+_ALREADY_APPLIED = (ER_TABLE_EXISTS, ER_DUP_FIELDNAME, ER_DUP_KEYNAME)
+# the baseline predates versioning and is applied leniently (other errors only warn):
+# unknown column, can't drop field/key, duplicate foreign key constraint name
+_BASELINE_TOLERATED = _ALREADY_APPLIED + (1054, 1091, 1826)
+
+SCHEMA_MIGRATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(20) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    duration_ms INT DEFAULT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _lock_name():
+    return f"{DB_CONFIG['database']}.schema_migrations"
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def discover():
+    """All known migrations in version order (baseline first)"""
+    baseline_paths = [os.path.join(DATABASE_DIR, f) for f in BASELINE_FILES]
+    migrations = [{
+        'version': '000',
+        'name': 'baseline',
+        'paths': baseline_paths,
+        'checksum': hashlib.sha256(''.join(_read(p) for p in baseline_paths).encode('utf-8')).hexdigest(),
+        'tolerated': _BASELINE_TOLERATED,
+        'strict': False,
+        'legacy_comments': True,
+        'after': _baseline_guards,
+    }]
+    if os.path.isdir(MIGRATIONS_DIR):
+        for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+            match = _FILE_RE.match(filename)
+            if not match:
+                continue
+            path = os.path.join(MIGRATIONS_DIR, filename)
+            migrations.append({
+                'version': match.group(1),
+                'name': match.group(2),
+                'paths': [path],
+                'checksum': hashlib.sha256(_read(path).encode('utf-8')).hexdigest(),
+                'tolerated': _ALREADY_APPLIED,
+                'strict': True,
+                'legacy_comments': False,
+                'after': None,
+            })
+    versions = [m['version'] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {MIGRATIONS_DIR}")
+    return migrations
+
+
+def _baseline_guards(cursor):
+    """Columns/tables that older databases may miss even after the baseline scripts"""
+    def ensure_column(table, column_name, column_def_sql):
+        cursor.execute("SELECT COUNT(*) as cnt FROM information_schema.columns WHERE table_schema = %s AND table_name = %s AND column_name = %s", (DB_CONFIG['database'], table, column_name))
+        exists = cursor.fetchone()
+        if exists and exists.get('cnt', 0) == 0:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_def_sql}")
+            print(f"Added missing column {column_name} to {table}")
+
+    ensure_column('faculty', 'email', "email VARCHAR(100) NULL")
+    ensure_column('faculty', 'hire_date', "hire_date DATE NULL")
+    ensure_column('courses', 'fee_per_credit', "fee_per_credit DECIMAL(10,2) DEFAULT 10000.00")
+    ensure_column('courses', 'department_id', "department_id INT NULL")
+    ensure_column('students', 'fee_balance', "fee_balance DECIMAL(10,2) DEFAULT 0.00")
+    ensure_column('fee_details', 'tuition_fee', "tuition_fee DECIMAL(10,2) DEFAULT 0.00")
+    ensure_column('fee_details', 'lab_fee', "lab_fee DECIMAL(10,2) DEFAULT 0.00")
+    ensure_column('fee_details', 'miscellaneous_fee', "miscellaneous_fee DECIMAL(10,2) DEFAULT 0.00")
+    cursor.execute('CREATE TABLE IF NOT EXISTS student_code_seq (year_small INT PRIMARY KEY, last_seq INT DEFAULT 0)')
+    cursor.execute('CREATE TABLE IF NOT EXISTS faculty_code_seq (year_small INT PRIMARY KEY, last_seq INT DEFAULT 0)')
+
+
+def applied_versions(cursor):
+    """{version: checksum} from schema_migrations ({} when the table is missing)"""
+    try:
+        cursor.execute("SELECT version, checksum FROM schema_migrations")
+    except pymysql.err.ProgrammingError as e:
+        if e.args and e.args[0] == 1146:  # table doesn't exist
+            return {}
+        raise
+    return {row['version']: row['checksum'] for row in cursor.fetchall()}
+
+
+def is_at_head(migrations=None):
+    """Fast path: one connection, one SELECT"""
+    migrations = migrations if migrations is not None else discover()
+    try:
+        conn = get_connection()
+    except pymysql.err.OperationalError as e:
+        if e.args and e.args[0] == 1049:  # unknown database
+            return False
+        raise
+    try:
+        with conn.cursor() as cursor:
+            applied = applied_versions(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    return all(m['version'] in applied for m in migrations)
+
+
+def _apply(conn, migration):
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for path in migration['paths']:
+            try:
+                execute_file(path, conn=conn, strict=migration['strict'], ignore=migration['tolerated'],
+                             legacy_comments=migration['legacy_comments'])
+            except ScriptError as e:
+                raise MigrationError(f"{os.path.basename(path)} {e}")
+        if migration['after']:
+            with conn.cursor() as cursor:
+                migration['after'](cursor)
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    duration_ms = int((time.perf_counter() - start) * 1000)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+            (migration['version'], migration['name'], migration['checksum'], duration_ms)
+        )
+    conn.commit()
+    return duration_ms
+
+
+def migrate(dry_run=False):
+    """Apply every pending migration under a named lock; returns the versions applied"""
+    migrations = discover()
+    create_database_if_not_exists()
+    conn = get_connection(multi_statements=True)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS got", (_lock_name(), LOCK_TIMEOUT))
+            if not cursor.fetchone()['got']:
+                raise MigrationError(f"Timed out after {LOCK_TIMEOUT}s waiting for the migration lock")
+        try:
+            with conn.cursor() as cursor:
+                if not dry_run:
+                    cursor.execute(SCHEMA_MIGRATIONS_SQL)
+                applied = applied_versions(cursor)
+            conn.commit()
+            for m in migrations:
+                if m['version'] in applied and applied[m['version']] != m['checksum']:
+                    print(f"Warning: migration {m['version']}_{m['name']} changed after it was applied")
+            pending = [m for m in migrations if m['version'] not in applied]
+            done = []
+            for m in pending:
+                if dry_run:
+                    print(f"Would apply {m['version']}_{m['name']}")
+                    done.append(m['version'])
+                    continue
+                print(f"🔁 Applying migration {m['version']}_{m['name']}...")
+                duration_ms = _apply(conn, m)
+                print(f"✓ {m['version']}_{m['name']} applied in {duration_ms} ms")
+                done.append(m['version'])
+            return done
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (_lock_name(),))
+    finally:
+        conn.close()
+
+
+def ensure_schema():
+    """Startup hook: return quickly when already at head, otherwise migrate"""
+    try:
+        if is_at_head():
+            return True
+        migrate()
+        return True
+    except Exception as e:
+        print(f"Error applying migrations: {e}")
+        return False
+
+
+def status():
+    """[(version, name, applied_at or None, checksum_ok)] for every known migration"""
+    migrations = discover()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute("SELECT version, checksum, applied_at FROM schema_migrations")
+                rows = {r['version']: r for r in cursor.fetchall()}
+            except pymysql.err.ProgrammingError:
+                rows = {}
+        conn.commit()
+    finally:
+        conn.close()
+    result = []
+    for m in migrations:
+        row = rows.get(m['version'])
+        result.append((m['version'], m['name'], row['applied_at'] if row else None, row is None or row['checksum'] == m['checksum']))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply or inspect versioned schema migrations')
+    parser.add_argument('command', nargs='?', default='up', choices=['up', 'status'])
+    parser.add_argument('--dry-run', action='store_true', help='list pending migrations without applying them')
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'status':
+            for version, name, applied_at, checksum_ok in status():
+                state = f"applied {applied_at}" if applied_at else 'pending'
+                flag = '' if checksum_ok else '  (checksum changed)'
+                print(f"{version}_{name:<30} {state}{flag}")
+            return 0
+        done = migrate(dry_run=args.dry_run)
+        if not done:
+            print("✓ Database is at head")
+        return 0
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,18 @@
+-- Migration 001: composite indexes for the hot access paths
+-- Each index leads with the equality columns used by the endpoint queries and
+-- carries the remaining referenced columns so the lookup can be index-only.
+
+-- seat counts, rosters, per-section enrollment joins
+CREATE INDEX idx_enrollments_section_status ON enrollments (section_id, status, student_id);
+-- student's enrolled sections (dashboard, announcements, fee computation)
+CREATE INDEX idx_enrollments_student_status ON enrollments (student_id, status, section_id);
+-- per-section attendance sheets and per-date lookups
+CREATE INDEX idx_attendance_section_date ON attendance (section_id, attendance_date, student_id, status);
+-- fee_details lookup by student and semester (fee recomputation, billing)
+CREATE INDEX idx_fee_details_student_semester ON fee_details (student_id, semester);
+-- SGPA/CGPA aggregation reads only these columns
+CREATE INDEX idx_transcript_student_semester ON transcript (student_id, semester, credits, grade_points);
+-- available courses for a term
+CREATE INDEX idx_course_sections_term ON course_sections (semester, year, is_active);
+-- admin faculty attendance by date
+CREATE INDEX idx_faculty_attendance_date ON faculty_attendance (attendance_date, faculty_id, session);
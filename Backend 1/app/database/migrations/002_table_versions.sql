@@ -0,0 +1,8 @@
+-- Migration 002: version counters for cache invalidation (app/database/versions.py)
+-- scope is a table name ('enrollments') or a row scope ('section:12', 'student:7').
+
+CREATE TABLE table_versions (
+    scope VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+) ENGINE=InnoDB;
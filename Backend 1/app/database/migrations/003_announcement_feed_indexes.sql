@@ -0,0 +1,8 @@
+-- Migration 003: keyset pagination for announcement history (app/website/announcements.py)
+
+-- active admin announcements, newest first
+CREATE INDEX idx_admin_announcements_active_created ON admin_announcements (is_active, created_at, announcement_id);
+-- per-section feed and history
+CREATE INDEX idx_announcements_section_created ON announcements (section_id, created_at, announcement_id);
+-- a faculty member's own announcements
+CREATE INDEX idx_announcements_faculty_created ON announcements (faculty_id, created_at);
@@ -0,0 +1,12 @@
+-- Migration 004: event log behind the server-sent events stream (app/database/events.py)
+-- Writers append one row per event; every worker tails the table from its
+-- last seen event_id, so a publish in one process reaches subscribers in all
+-- of them. Rows older than EVENT_RETENTION_MINUTES are pruned by the tailers.
+
+CREATE TABLE event_log (
+    event_id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    topic VARCHAR(32) NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    KEY idx_event_log_created (created_at)
+) ENGINE=InnoDB;
@@ -0,0 +1,47 @@
+-- Migration 005: append-only fee ledger (app/database/ledger.py)
+-- fee_details.amount_due/amount_paid/tuition_fee/... and students.fee_balance
+-- become running totals of these entries. amount is never negative; the
+-- entry_type gives the sign (charge +, credit -, payment -). component names
+-- the fee_details column a charge/credit also moves (NULL: amount_due only).
+
+CREATE TABLE fee_ledger (
+    entry_id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    student_id INT NOT NULL,
+    fee_id INT NOT NULL,
+    entry_type ENUM('charge', 'credit', 'payment') NOT NULL,
+    component ENUM('tuition', 'lab', 'miscellaneous') NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    enrollment_id INT NULL,
+    memo VARCHAR(255) NULL,
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    KEY idx_fee_ledger_student (student_id, entry_id),
+    KEY idx_fee_ledger_fee (fee_id, entry_type, amount),
+    KEY idx_fee_ledger_enrollment (enrollment_id, entry_type, amount)
+) ENGINE=InnoDB;
+
+-- opening entries: what fee_details holds today, one row per component and payment
+INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+SELECT student_id, fee_id, 'charge', 'tuition', tuition_fee, 'opening balance'
+FROM fee_details WHERE tuition_fee > 0;
+
+INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+SELECT student_id, fee_id, 'charge', 'lab', lab_fee, 'opening balance'
+FROM fee_details WHERE lab_fee > 0;
+
+INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+SELECT student_id, fee_id, 'charge', 'miscellaneous', miscellaneous_fee, 'opening balance'
+FROM fee_details WHERE miscellaneous_fee > 0;
+
+-- amount_due set without a breakdown (POST /api/admin/fees)
+INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+SELECT student_id, fee_id, IF(amount_due > components, 'charge', 'credit'), NULL, ABS(amount_due - components), 'opening balance'
+FROM (
+    SELECT student_id, fee_id, amount_due,
+           IFNULL(tuition_fee, 0) + IFNULL(lab_fee, 0) + IFNULL(miscellaneous_fee, 0) AS components
+    FROM fee_details
+) f
+WHERE amount_due <> components;
+
+INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo)
+SELECT student_id, fee_id, 'payment', NULL, amount_paid, 'opening balance'
+FROM fee_details WHERE amount_paid > 0;
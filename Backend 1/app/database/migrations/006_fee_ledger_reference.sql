@@ -0,0 +1,7 @@
+-- Migration 006: bank references on ledger payments (app/database/payments.py)
+-- A bank transaction split over several fee records gets one entry per record;
+-- the unique key makes re-importing the same statement a no-op.
+
+ALTER TABLE fee_ledger
+    ADD COLUMN reference VARCHAR(64) NULL AFTER memo,
+    ADD UNIQUE KEY uq_fee_ledger_reference (reference, fee_id);
@@ -0,0 +1,23 @@
+-- Migration 007: packed attendance bitsets (app/database/attendance_store.py)
+-- attendance_sessions numbers each section's class dates; attendance_bits keeps
+-- one row per student and section per 64 sessions, bit n of marked/present
+-- standing for session n. Used when ATTENDANCE_STORAGE is 'both' or 'bitmap';
+-- tools/backfill_attendance.py fills them from the attendance rows.
+
+CREATE TABLE attendance_sessions (
+    section_id INT NOT NULL,
+    attendance_date DATE NOT NULL,
+    session_no SMALLINT UNSIGNED NOT NULL,
+    PRIMARY KEY (section_id, attendance_date),
+    UNIQUE KEY uq_attendance_session_no (section_id, session_no)
+) ENGINE=InnoDB;
+
+CREATE TABLE attendance_bits (
+    section_id INT NOT NULL,
+    student_id INT NOT NULL,
+    word SMALLINT UNSIGNED NOT NULL,
+    marked BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    present BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (section_id, student_id, word),
+    KEY idx_attendance_bits_student (student_id, section_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,36 @@
+-- Migration 008: attendance rollups (app/database/attendance_rollups.py)
+-- faculty_attendance had no unique key, so its ON DUPLICATE KEY UPDATE never
+-- fired and re-marking a session added a second row. Keep the latest row per
+-- faculty, date and session and add the key. The rollup tables hold the
+-- running counts the dashboards read; they are filled from the attendance here
+-- and kept current by every attendance write (tools/rebuild_attendance_rollups.py
+-- recomputes them).
+
+DELETE fa FROM faculty_attendance fa
+JOIN faculty_attendance newer
+  ON newer.faculty_id = fa.faculty_id AND newer.attendance_date = fa.attendance_date
+ AND newer.session = fa.session AND newer.attendance_id > fa.attendance_id;
+
+ALTER TABLE faculty_attendance ADD UNIQUE KEY uq_faculty_attendance (faculty_id, attendance_date, session);
+
+CREATE TABLE attendance_rollup (
+    student_id INT NOT NULL,
+    section_id INT NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    present INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, section_id),
+    KEY idx_attendance_rollup_section (section_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE faculty_attendance_rollup (
+    faculty_id INT NOT NULL PRIMARY KEY,
+    total_days INT NOT NULL DEFAULT 0,
+    present_days INT NOT NULL DEFAULT 0,
+    absent_days INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB;
+
+INSERT INTO attendance_rollup (student_id, section_id, total, present)
+SELECT student_id, section_id, COUNT(*), SUM(status = 'present') FROM attendance GROUP BY student_id, section_id;
+
+INSERT INTO faculty_attendance_rollup (faculty_id, total_days, present_days, absent_days)
+SELECT faculty_id, COUNT(*), SUM(status = 'present'), SUM(status = 'absent') FROM faculty_attendance GROUP BY faculty_id;
@@ -0,0 +1,17 @@
+-- Migration 009: attendance shortage early warning (app/database/attendance_risk.py)
+-- One row per active enrollment, rewritten by tools/compute_attendance_risk.py;
+-- the admin report filters on (status, department_id), students look up their own rows.
+
+CREATE TABLE attendance_risk (
+    enrollment_id INT NOT NULL PRIMARY KEY,
+    student_id INT NOT NULL,
+    section_id INT NOT NULL,
+    department_id INT NULL,
+    total INT NOT NULL,
+    present INT NOT NULL,
+    allowed_absences INT NOT NULL,
+    status ENUM('short', 'warning', 'ok') NOT NULL,
+    computed_at DATETIME(6) NOT NULL,
+    KEY idx_attendance_risk_status (status, department_id, allowed_absences),
+    KEY idx_attendance_risk_student (student_id)
+) ENGINE=InnoDB;
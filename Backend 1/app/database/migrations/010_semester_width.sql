@@ -0,0 +1,6 @@
+-- Migration 010: room for the year in fee and transcript semesters
+-- Rows carry the term as 'Spring 2025' (11 characters), which VARCHAR(10)
+-- rejects in strict mode; both columns are indexed (001) and keep their keys.
+
+ALTER TABLE transcript MODIFY COLUMN semester VARCHAR(20) NOT NULL;
+ALTER TABLE fee_details MODIFY COLUMN semester VARCHAR(20) NOT NULL;
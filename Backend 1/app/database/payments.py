@@ -0,0 +1,209 @@
+"""
+Bulk payment import from bank statements (CSV)
+
+    student_code,semester,amount,reference
+    25-0001,Fall,30000.00,TRX-88123
+    25-0002,,15000,TRX-88124
+
+semester may be empty: the payment then goes to the student's oldest
+outstanding records first. reference (the bank's transaction id) is optional
+but makes a re-import of the same file a no-op.
+
+import_payments() reads the fee records of every student in the file with
+one locking query per chunk and keeps them in an in-memory index by
+(student code, semester), allocates each payment in memory (partial and full
+payments, oldest record first, overpayments stay on the last record as a
+credit), then applies everything set-based in one transaction: chunked
+multi-row ledger inserts, one UPDATE of the affected fee_details rows and one
+UPDATE of the affected students' balances.
+"""
+import csv
+import io
+import uuid
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from app.database.connection import transaction, chunks, row_placeholders
+from app.database import versions
+from app.database.ledger import NET_SQL
+
+CHUNK_SIZE = 1000
+
+REQUIRED_COLUMNS = ('student_code', 'amount')
+
+# fee_details / fee_ledger amounts are DECIMAL(10,2)
+MAX_AMOUNT = Decimal('99999999.99')
+CENT = Decimal('0.01')
+
+FEE_INDEX_SQL = """
+    SELECT f.fee_id, f.student_id, s.student_code, f.semester, f.amount_due, IFNULL(f.amount_paid, 0) AS amount_paid
+    FROM fee_details f
+    JOIN students s ON s.student_id = f.student_id
+    WHERE s.student_code IN ({placeholders})
+    ORDER BY f.fee_id
+    FOR UPDATE
+"""
+
+LEDGER_SQL = "INSERT INTO fee_ledger (student_id, fee_id, entry_type, component, amount, memo, reference) VALUES {rows}"
+LEDGER_ROW = "(%s, %s, 'payment', NULL, %s, %s, %s)"
+
+# status is assigned before amount_paid: MySQL may apply the SET list left to
+# right, so an assignment after amount_paid would add p.paid a second time
+APPLY_FEES_SQL = """
+    UPDATE fee_details f
+    JOIN (
+        SELECT fee_id, SUM(amount) AS paid FROM fee_ledger
+        WHERE entry_id >= %s AND memo = %s GROUP BY fee_id
+    ) p ON p.fee_id = f.fee_id
+    SET f.status = CASE WHEN IFNULL(f.amount_paid, 0) + p.paid >= f.amount_due THEN 'paid'
+                        WHEN f.status = 'paid' THEN 'pending' ELSE f.status END,
+        f.amount_paid = IFNULL(f.amount_paid, 0) + p.paid,
+        f.payment_date = CURDATE()
+"""
+
+APPLY_BALANCES_SQL = f"""
+    UPDATE students s
+    JOIN (
+        SELECT student_id, SUM({NET_SQL}) AS net FROM fee_ledger
+        WHERE entry_id >= %s AND memo = %s GROUP BY student_id
+    ) d ON d.student_id = s.student_id
+    SET s.fee_balance = IFNULL(s.fee_balance, 0) + d.net
+"""
+
+
+def _key(student_code, semester=''):
+    return (student_code.strip().upper(), (semester or '').strip().lower())
+
+
+def parse_csv(text):
+    """(transactions, invalid): transactions are dicts with line, student_code, semester, amount, reference"""
+    reader = csv.DictReader(io.StringIO(text))
+    columns = [c.strip().lower() for c in (reader.fieldnames or [])]
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    transactions, invalid = [], []
+    for line, raw in enumerate(reader, start=2):
+        row = {(k or '').strip().lower(): (v or '').strip() for k, v in raw.items()}
+        try:
+            amount = Decimal(row['amount'].replace(',', ''))
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite():
+            invalid.append({'line': line, 'reason': f"invalid amount {row['amount']!r}"})
+            continue
+        if amount > MAX_AMOUNT:
+            invalid.append({'line': line, 'reason': f"amount {row['amount']!r} is above {MAX_AMOUNT:,}"})
+            continue
+        amount = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+        if not row['student_code'] or amount <= 0:
+            invalid.append({'line': line, 'reason': 'student_code and a positive amount are required'})
+            continue
+        transactions.append({
+            'line': line,
+            'student_code': row['student_code'],
+            'semester': row.get('semester', ''),
+            'amount': amount,
+            'reference': row.get('reference') or None,
+        })
+    return transactions, invalid
+
+
+def build_index(cursor, student_codes, chunk_size=CHUNK_SIZE):
+    """{(code, semester): [fee row, ...]} and {(code, ''): [all the student's rows]}, oldest first"""
+    index = {}
+    codes = sorted({_key(code)[0] for code in student_codes})
+    for chunk in chunks(codes, chunk_size):
+        cursor.execute(FEE_INDEX_SQL.format(placeholders=row_placeholders('%s', len(chunk))), chunk)
+        for row in cursor.fetchall():
+            row['outstanding'] = (row['amount_due'] or 0) - (row['amount_paid'] or 0)
+            index.setdefault(_key(row['student_code'], row['semester']), []).append(row)
+            index.setdefault(_key(row['student_code']), []).append(row)
+    return index
+
+
+def allocate(transactions, index):
+    """
+    Split payments over the indexed fee rows (mutates their 'outstanding').
+    Returns (entries, unmatched, overpaid); entries are (student_id, fee_id, amount, reference).
+    """
+    entries, unmatched, overpaid = [], [], []
+    for tx in transactions:
+        rows = index.get(_key(tx['student_code'], tx['semester']))
+        if not rows:
+            unmatched.append({'line': tx['line'], 'student_code': tx['student_code'], 'semester': tx['semester'],
+                              'amount': tx['amount'], 'reason': 'no fee record'})
+            continue
+        remaining = tx['amount']
+        split = {}
+        for row in rows:
+            if remaining <= 0:
+                break
+            if row['outstanding'] <= 0:
+                continue
+            paid = min(remaining, row['outstanding'])
+            split[row['fee_id']] = (row, split.get(row['fee_id'], (row, 0))[1] + paid)
+            row['outstanding'] -= paid
+            remaining -= paid
+        if remaining > 0:
+            # nothing left to pay: keep the rest as a credit on the latest record
+            row = rows[-1]
+            split[row['fee_id']] = (row, split.get(row['fee_id'], (row, 0))[1] + remaining)
+            row['outstanding'] -= remaining
+            overpaid.append({'line': tx['line'], 'student_code': tx['student_code'], 'amount': remaining})
+        for fee_id, (row, amount) in split.items():
+            entries.append((row['student_id'], fee_id, amount, tx['reference']))
+    return entries, unmatched, overpaid
+
+
+def import_payments(text, dry_run=False, chunk_size=CHUNK_SIZE, log=print):
+    """Apply a bank CSV; returns a report dict (nothing is written with dry_run=True)"""
+    transactions, invalid = parse_csv(text)
+    report = {'rows': len(transactions) + len(invalid), 'invalid': invalid, 'duplicates': [], 'unmatched': [],
+              'overpaid': [], 'entries': 0, 'students': 0, 'amount': Decimal('0')}
+    if not transactions:
+        return report
+    memo = f"bank import {uuid.uuid4().hex[:8]}"
+    with transaction() as (conn, cursor):
+        # references that were imported before
+        references = sorted({tx['reference'] for tx in transactions if tx['reference']})
+        seen = set()
+        for chunk in chunks(references, chunk_size):
+            cursor.execute(f"SELECT DISTINCT reference FROM fee_ledger WHERE reference IN ({row_placeholders('%s', len(chunk))})", chunk)
+            seen.update(row['reference'] for row in cursor.fetchall())
+        fresh, in_file = [], set()
+        for tx in transactions:
+            if tx['reference'] and (tx['reference'] in seen or tx['reference'] in in_file):
+                report['duplicates'].append({'line': tx['line'], 'reference': tx['reference']})
+                continue
+            if tx['reference']:
+                in_file.add(tx['reference'])
+            fresh.append(tx)
+
+        index = build_index(cursor, [tx['student_code'] for tx in fresh], chunk_size)
+        entries, report['unmatched'], report['overpaid'] = allocate(fresh, index)
+        report['entries'] = len(entries)
+        report['students'] = len({student_id for student_id, _, _, _ in entries})
+        report['amount'] = sum((amount for _, _, amount, _ in entries), Decimal('0'))
+        log(f"{len(fresh):,} new payments for {report['students']:,} students, {report['amount']:,.2f} in total; "
+            f"{len(report['duplicates'])} duplicate(s), {len(report['unmatched'])} unmatched, {len(invalid)} invalid")
+        if dry_run or not entries:
+            return report
+
+        first_entry = None
+        done = 0
+        for chunk in chunks(entries, chunk_size):
+            params = []
+            for student_id, fee_id, amount, reference in chunk:
+                params += [student_id, fee_id, amount, memo, reference]
+            cursor.execute(LEDGER_SQL.format(rows=row_placeholders(LEDGER_ROW, len(chunk))), params)
+            first_entry = first_entry or cursor.lastrowid
+            done += len(chunk)
+            log(f"  ledger entries {done:,}/{len(entries):,}")
+        cursor.execute(APPLY_FEES_SQL, (first_entry, memo))
+        cursor.execute(APPLY_BALANCES_SQL, (first_entry, memo))
+
+    students = sorted({versions.student(student_id) for student_id, _, _, _ in entries})
+    for chunk in chunks(students, chunk_size):
+        versions.bump(*chunk)
+    versions.bump('fee_details', 'students')
+    return report
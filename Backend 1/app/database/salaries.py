@@ -0,0 +1,144 @@
+"""
+Faculty salaries: one set-based statement recomputes every affected member
+
+A salary is the sum of credits x fee_per_credit over the member's active
+sections, so it depends on course_sections (faculty_id, course_id,
+is_active) and on courses (credits, fee_per_credit). Write paths report what
+they changed after their commit:
+
+    salaries.touch(faculty_ids=[old_faculty, new_faculty])   # section moved
+    salaries.touch(course_ids=[course_id])                   # fee_per_credit changed
+
+and the affected salaries are recomputed by a single UPDATE ... JOIN. Inside
+a deferred() block the changes only accumulate and are applied once when the
+outermost block exits, so setting up a term with hundreds of sections costs
+one salary statement instead of one transaction per section:
+
+    with salaries.deferred():
+        for row in sections:
+            AdminModel.create_course_section(**row)
+
+recompute_all() is the full batch job (tools/recompute_salaries.py).
+"""
+import threading
+from contextlib import contextmanager
+
+from app.database.connection import execute_query, transaction
+from app.database import versions
+
+# active teaching load per faculty member; {sections} narrows it to the affected ones
+LOAD_SQL = """
+    SELECT cs.faculty_id, SUM(c.credits * c.fee_per_credit) AS total
+    FROM course_sections cs
+    JOIN courses c ON cs.course_id = c.course_id
+    WHERE cs.is_active = TRUE {sections}
+    GROUP BY cs.faculty_id
+"""
+
+RECOMPUTE_SQL = """
+    UPDATE faculty f
+    LEFT JOIN ({load}) t ON t.faculty_id = f.faculty_id
+    SET f.salary = IFNULL(t.total, 0)
+    WHERE NOT (f.salary <=> IFNULL(t.total, 0)) {members}
+"""
+
+# members whose stored salary differs from their teaching load (dry run of recompute_all)
+DRIFT_SQL = """
+    SELECT f.faculty_id, f.faculty_code, f.salary AS stored, IFNULL(t.total, 0) AS expected
+    FROM faculty f
+    LEFT JOIN ({load}) t ON t.faculty_id = f.faculty_id
+    WHERE NOT (f.salary <=> IFNULL(t.total, 0))
+    ORDER BY f.faculty_id
+"""
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, 'depth'):
+        _state.depth = 0
+        _state.faculty_ids = set()
+        _state.course_ids = set()
+    return _state
+
+
+def _in(column, ids):
+    return f"{column} IN ({', '.join(['%s'] * len(ids))})"
+
+
+def recompute(faculty_ids=(), course_ids=()):
+    """
+    Recompute the salaries of faculty_ids and of everyone teaching one of
+    course_ids in one statement; returns the number of salaries that changed
+    (None on error)
+    """
+    faculty_ids = sorted({f for f in faculty_ids if f})
+    course_ids = sorted({c for c in course_ids if c})
+    if not faculty_ids and not course_ids:
+        return 0
+    # affected: the listed faculty plus whoever teaches an affected course (active or not);
+    # the same condition narrows the load aggregation and the updated rows
+    def affected(column):
+        conditions = []
+        if faculty_ids:
+            conditions.append(_in(column, faculty_ids))
+        if course_ids:
+            conditions.append(f"{column} IN (SELECT faculty_id FROM course_sections WHERE {_in('course_id', course_ids)})")
+        return f"AND ({' OR '.join(conditions)})"
+    params = tuple(faculty_ids) + tuple(course_ids)
+    query = RECOMPUTE_SQL.format(load=LOAD_SQL.format(sections=affected('cs.faculty_id')), members=affected('f.faculty_id'))
+    return _run(query, params + params)
+
+
+def recompute_all():
+    """Full batch: every faculty member's salary from the current sections"""
+    return _run(RECOMPUTE_SQL.format(load=LOAD_SQL.format(sections=''), members=''), ())
+
+
+def drift():
+    """Faculty rows recompute_all() would change"""
+    return execute_query(DRIFT_SQL.format(load=LOAD_SQL.format(sections='')))
+
+
+def _run(query, params):
+    try:
+        with transaction() as (conn, cursor):
+            cursor.execute(query, params)
+            changed = cursor.rowcount
+    except Exception as e:
+        print(f"Salary recompute error: {e}")
+        return None
+    if changed:
+        versions.bump('faculty')
+    return changed
+
+
+def touch(faculty_ids=(), course_ids=()):
+    """Record a change that affects salaries; applied now, or when the outermost deferred() exits"""
+    state = _pending()
+    state.faculty_ids.update(f for f in faculty_ids if f)
+    state.course_ids.update(c for c in course_ids if c)
+    if state.depth == 0:
+        return flush()
+    return 0
+
+
+def flush():
+    """Apply the recorded changes in one statement"""
+    state = _pending()
+    faculty_ids, course_ids = state.faculty_ids, state.course_ids
+    state.faculty_ids, state.course_ids = set(), set()
+    return recompute(faculty_ids, course_ids)
+
+
+@contextmanager
+def deferred():
+    """Collect touch() calls and recompute once at the end of the outermost block"""
+    state = _pending()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if state.depth == 0:
+            flush()
@@ -0,0 +1,208 @@
+"""
+Slow query recorder
+
+Statements slower than SLOW_QUERY_MS are kept in an in-memory ring buffer
+with their normalized SQL, a fingerprint of the parameters (types and a
+digest, never the raw values), duration and the model method that issued
+them. The first time a fingerprint is seen its EXPLAIN plan is captured;
+plans are kept for the SLOW_QUERY_PLANS most recently seen fingerprints.
+
+With QUERY_CAPTURE_FILE set, the first SELECT of every fingerprint is also
+appended (template + parameters) to that JSON-lines file so that
+tools/index_advisor.py can replay it against EXPLAIN later.
+"""
+import collections
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+import pymysql.cursors
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', '1') == '1'
+SLOW_QUERY_BUFFER = int(os.getenv('SLOW_QUERY_BUFFER', 200))
+SLOW_QUERY_PLANS = int(os.getenv('SLOW_QUERY_PLANS', 500))
+QUERY_CAPTURE_FILE = os.getenv('QUERY_CAPTURE_FILE')
+
+_EXPLAINABLE = ('select', 'update', 'delete', 'insert', 'replace')
+
+_lock = threading.Lock()
+_entries = collections.deque(maxlen=SLOW_QUERY_BUFFER)
+_plans = collections.OrderedDict()  # fingerprint -> plan, least recently seen first
+_captured = set()
+
+_COMMENT_RE = re.compile(r'(--[^\n]*|#[^\n]*|/\*.*?\*/)', re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(query):
+    """Strip comments/literals so that equivalent statements share one shape"""
+    sql = _COMMENT_RE.sub(' ', query)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?+)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:16]
+
+
+def params_fingerprint(params):
+    """Describe parameters without keeping their values"""
+    if params is None:
+        return {'count': 0, 'types': [], 'digest': None}
+    values = list(params.values()) if isinstance(params, dict) else list(params) if isinstance(params, (list, tuple)) else [params]
+    return {
+        'count': len(values),
+        'types': [type(v).__name__ for v in values],
+        'digest': hashlib.sha1(repr(values).encode('utf-8')).hexdigest()[:12],
+    }
+
+
+def _calling_method():
+    """Return 'Model.method' (or view function) that issued the statement"""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename.replace('\\', '/')
+        name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        if filename.endswith('website/models.py'):
+            return name
+        if fallback is None and '/app/' in filename and '/app/database/' not in filename:
+            fallback = name
+        frame = frame.f_back
+    return fallback or 'unknown'
+
+
+def _explain(connection, query, params):
+    try:
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute('EXPLAIN ' + query, params)
+            return cursor.fetchall()
+    except Exception as e:
+        return [{'error': str(e)}]
+
+
+def _store_plan(fp, plan):
+    # caller holds _lock; evicts the least recently seen fingerprints (LRU)
+    _plans[fp] = plan
+    _plans.move_to_end(fp)
+    while len(_plans) > SLOW_QUERY_PLANS:
+        _plans.popitem(last=False)
+
+
+def record(query, params, duration, connection=None, rowcount=None):
+    """Store a statement if it crossed the threshold; returns True when recorded"""
+    duration_ms = duration * 1000.0
+    if duration_ms < SLOW_QUERY_MS:
+        return False
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    normalized = normalize_sql(query)
+    fp = fingerprint(normalized)
+    entry = {
+        'fingerprint': fp,
+        'sql': normalized,
+        'params': params_fingerprint(params),
+        'duration_ms': round(duration_ms, 3),
+        'rows': rowcount,
+        'caller': _calling_method(),
+        'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    run_explain = False
+    with _lock:
+        _entries.append(entry)
+        if fp in _plans:
+            _plans.move_to_end(fp)
+        elif SLOW_QUERY_EXPLAIN and normalized.lower().startswith(_EXPLAINABLE):
+            _store_plan(fp, None)
+            run_explain = True
+    if run_explain and connection is not None:
+        # the result set of the slow statement is already buffered, so the
+        # same connection (and transaction) can run EXPLAIN right away
+        plan = _explain(connection, query, params)
+        with _lock:
+            _store_plan(fp, plan)
+    return True
+
+
+def capture(query, params):
+    """Append the first SELECT of each fingerprint to QUERY_CAPTURE_FILE"""
+    if not QUERY_CAPTURE_FILE:
+        return False
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    normalized = normalize_sql(query)
+    if not normalized.lower().startswith('select'):
+        return False
+    fp = fingerprint(normalized)
+    with _lock:
+        if fp in _captured:
+            return False
+        _captured.add(fp)
+    line = json.dumps({
+        'fingerprint': fp,
+        'sql': query,
+        'params': list(params) if isinstance(params, (list, tuple)) else params,
+        'caller': _calling_method(),
+    }, default=str)
+    try:
+        with open(QUERY_CAPTURE_FILE, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except OSError as e:
+        print(f"Query capture error: {e}")
+        return False
+    return True
+
+
+def get_entries(limit=None):
+    """Most recent slow statements first, each with its captured plan"""
+    with _lock:
+        entries = list(_entries)
+        plans = dict(_plans)
+    entries.reverse()
+    if limit:
+        entries = entries[:limit]
+    return [dict(e, plan=plans.get(e['fingerprint'])) for e in entries]
+
+
+def get_summary():
+    """Aggregate the buffer by fingerprint, slowest total time first"""
+    with _lock:
+        entries = list(_entries)
+        plans = dict(_plans)
+    groups = {}
+    for e in entries:
+        g = groups.setdefault(e['fingerprint'], {
+            'fingerprint': e['fingerprint'], 'sql': e['sql'], 'callers': set(),
+            'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+        })
+        g['count'] += 1
+        g['total_ms'] += e['duration_ms']
+        g['max_ms'] = max(g['max_ms'], e['duration_ms'])
+        g['callers'].add(e['caller'])
+    result = []
+    for g in groups.values():
+        g['callers'] = sorted(g['callers'])
+        g['avg_ms'] = round(g['total_ms'] / g['count'], 3)
+        g['total_ms'] = round(g['total_ms'], 3)
+        g['plan'] = plans.get(g['fingerprint'])
+        result.append(g)
+    result.sort(key=lambda g: g['total_ms'], reverse=True)
+    return result
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+        _plans.clear()
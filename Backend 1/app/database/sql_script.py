@@ -0,0 +1,218 @@
+"""
+SQL script executor
+
+iter_statements() reads a script as a stream and yields one statement at a
+time. It understands quoted strings and identifiers (with backslash and
+doubled-quote escapes), --, # and /* */ comments (MySQL /*! ... */ comments
+are kept), and DELIMITER changes, so a ';' inside a string, a view or a
+procedure body does not end the statement. `--` starts a comment only when
+followed by whitespace, as in the mysql client; the hand-written baseline
+scripts (schema.sql: `--without enum`, `,--must be sum`) are read with
+legacy_comments=True, where every `--` outside a string starts one.
+
+execute_script() sends the statements in batches over a connection opened
+with CLIENT.MULTI_STATEMENTS, so a seed file becomes a handful of round
+trips instead of one per INSERT. In strict mode the first unexpected error
+aborts; otherwise it is reported and the rest of the script still runs.
+Errors matching `ignore` are always skipped: MySQL error codes (ints, e.g.
+1050 table exists) or message substrings (e.g. 'already exists').
+"""
+import io
+import re
+
+import pymysql.cursors
+
+from app.database.connection import get_connection
+
+BATCH_STATEMENTS = 200
+BATCH_BYTES = 1024 * 1024  # stay well below max_allowed_packet
+
+_QUOTES = "'\"`"
+_DELIMITER_RE = re.compile(r'^\s*DELIMITER\s+(\S+)\s*$', re.I)
+
+
+class ScriptError(Exception):
+    def __init__(self, number, statement, error):
+        self.number = number
+        self.statement = statement
+        self.error = error
+        super().__init__(f"statement {number}: {error}\n{statement[:300]}")
+
+
+def _special_re(delimiter):
+    return re.compile(r"['\"`#]|--|/\*|" + re.escape(delimiter))
+
+
+def iter_statements(source, legacy_comments=False):
+    """Yield the statements of a script (str or text file object) without their delimiter"""
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    delimiter = ';'
+    special = _special_re(delimiter)
+    buf = []
+    state = None  # None, a quote character, or '*' inside a block comment
+    for line in source:
+        if state is None and not ''.join(buf).strip():
+            match = _DELIMITER_RE.match(line)
+            if match:
+                delimiter = match.group(1)
+                special = _special_re(delimiter)
+                buf = []
+                continue
+        i, n = 0, len(line)
+        while i < n:
+            if state == '*':
+                end = line.find('*/', i)
+                if end < 0:
+                    i = n
+                    continue
+                buf.append(' ')
+                i = end + 2
+                state = None
+                continue
+            if state is not None:
+                # inside a quoted string / identifier
+                j = i
+                while j < n:
+                    c = line[j]
+                    if c == '\\' and state != '`':
+                        j += 2
+                        continue
+                    if c == state:
+                        if j + 1 < n and line[j + 1] == state:
+                            j += 2
+                            continue
+                        break
+                    j += 1
+                if j >= n:
+                    buf.append(line[i:])
+                    i = n
+                else:
+                    buf.append(line[i:j + 1])
+                    i = j + 1
+                    state = None
+                continue
+            match = special.search(line, i)
+            if match is None:
+                buf.append(line[i:])
+                break
+            buf.append(line[i:match.start()])
+            token = match.group()
+            i = match.end()
+            if token in _QUOTES:
+                buf.append(token)
+                state = token
+            elif token == '#':
+                buf.append('\n')
+                break
+            elif token == '--':
+                if legacy_comments or i >= n or line[i] in ' \t\r\n':
+                    buf.append('\n')
+                    break
+                buf.append(token)
+            elif token == '/*':
+                if line.startswith('!', i) or line.startswith('+', i):
+                    # executable comment / optimizer hint: part of the statement
+                    end = line.find('*/', i)
+                    if end >= 0:
+                        buf.append(line[match.start():end + 2])
+                        i = end + 2
+                        continue
+                state = '*'
+            else:
+                statement = ''.join(buf).strip()
+                buf = []
+                if statement:
+                    yield statement
+    statement = ''.join(buf).strip()
+    if statement:
+        yield statement
+
+
+def _ignored(error, ignore):
+    """True when error's MySQL code or message matches an entry of ignore"""
+    code = error.args[0] if getattr(error, 'args', None) else None
+    message = str(error).lower()
+    return any(code == s if isinstance(s, int) else s in message for s in ignore)
+
+
+def _run_batch(cursor, statements):
+    """Execute statements as one multi-statement request.
+
+    Returns (None, None) on success or (index, exception) of the first
+    failing statement; the server skips everything after it."""
+    pos = 0
+    try:
+        cursor.execute(';\n'.join(statements))
+        pos = 1
+        while cursor.nextset():
+            pos += 1
+    except Exception as e:
+        return pos, e
+    return None, None
+
+
+def execute_script(source, conn=None, strict=True, ignore=(), on_progress=None,
+                   batch_statements=BATCH_STATEMENTS, batch_bytes=BATCH_BYTES, legacy_comments=False):
+    """Run every statement of `source`; returns {'statements', 'batches', 'ignored', 'failed'}"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection(multi_statements=True)
+    ignore = tuple(s if isinstance(s, int) else s.lower() for s in ignore)
+    stats = {'statements': 0, 'batches': 0, 'ignored': 0, 'failed': 0}
+    # plain cursor: no instrumentation hooks between the results of a batch
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+
+    def flush(batch, start):
+        # start: 1-based number of the first statement in batch
+        while batch:
+            failed_at, error = _run_batch(cursor, batch)
+            stats['batches'] += 1
+            if failed_at is None:
+                stats['statements'] += len(batch)
+                break
+            stats['statements'] += failed_at
+            statement = batch[failed_at]
+            if _ignored(error, ignore):
+                stats['ignored'] += 1
+            elif strict:
+                raise ScriptError(start + failed_at, statement, error)
+            else:
+                stats['failed'] += 1
+                print(f"  ⚠️  Warning on statement {start + failed_at}: {error}")
+            start += failed_at + 1
+            batch = batch[failed_at + 1:]
+        conn.commit()
+        if on_progress:
+            on_progress(stats)
+
+    try:
+        batch, size, start = [], 0, 1
+        for number, statement in enumerate(iter_statements(source, legacy_comments), 1):
+            # bodies written with a custom DELIMITER contain ';' - send them alone
+            if ';' in statement and batch:
+                flush(batch, start)
+                batch, size = [], 0
+            if not batch:
+                start = number
+            batch.append(statement)
+            size += len(statement)
+            if ';' in statement or len(batch) >= batch_statements or size >= batch_bytes:
+                flush(batch, start)
+                batch, size = [], 0
+        if batch:
+            flush(batch, start)
+        return stats
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+
+def execute_file(path, **kwargs):
+    """execute_script() on a file, streamed line by line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return execute_script(f, **kwargs)
@@ -0,0 +1,119 @@
+"""
+Version counters for cache invalidation and ETags (table_versions, migration 002)
+
+Every write path bumps the scopes it changes: a table name ('enrollments'),
+and where useful a row scope (section(12) -> 'section:12', student(7) ->
+'student:7', attendance(12) -> 'attendance:12', marks(12) -> 'marks:12'). Readers key caches and ETags on the counters instead of
+guessing a TTL:
+
+    versions.token('courses', 'course_sections', 'enrollments')
+    # -> 'courses.4;course_sections.19;enrollments.3051', one PK lookup
+
+Bumps run after the write has committed (never inside the transaction), so a
+reader can never pair a new version with old data, and the hot counter rows
+are only locked for one autocommit statement. Counters read within
+VERSION_CACHE_TTL seconds are served from process memory; a bump made by
+this process invalidates them immediately, bumps from other workers are seen
+after at most the TTL (default 0: always read).
+"""
+import os
+import time
+import threading
+
+from app.database.connection import execute_query
+
+VERSION_CACHE_TTL = float(os.getenv('VERSION_CACHE_TTL', 0))
+
+# table scopes bumped by the models; row scopes are added by section()/student()
+TABLES = ('courses', 'course_sections', 'enrollments', 'admin_announcements', 'announcements',
+          'users', 'students', 'faculty', 'fee_details')
+
+_lock = threading.Lock()
+_cache = {}  # scope -> (version, read_at)
+
+
+def section(section_id):
+    return f"section:{section_id}"
+
+
+def student(student_id):
+    return f"student:{student_id}"
+
+
+def attendance(section_id):
+    return f"attendance:{section_id}"
+
+
+def marks(section_id):
+    return f"marks:{section_id}"
+
+
+def bump(*scopes):
+    """Increment the counters of scopes (call after the write has committed)"""
+    scopes = sorted({s for s in scopes if s})
+    if not scopes:
+        return False
+    with _lock:
+        for scope in scopes:
+            _cache.pop(scope, None)
+    query = ("INSERT INTO table_versions (scope, version) VALUES "
+             + ", ".join(["(%s, 1)"] * len(scopes))
+             + " ON DUPLICATE KEY UPDATE version = version + 1")
+    try:
+        execute_query(query, tuple(scopes), fetch=False)
+        return True
+    except Exception as e:
+        print(f"Version bump error: {e}")
+        return False
+
+
+def bump_all():
+    """Invalidate every scope; for cascading deletes whose row scopes are unknown"""
+    clear_cache()
+    try:
+        bump(*TABLES)
+        execute_query("UPDATE table_versions SET version = version + 1", fetch=False)
+        return True
+    except Exception as e:
+        print(f"Version bump error: {e}")
+        return False
+
+
+def get(*scopes):
+    """{scope: version} (0 for scopes never bumped); None when the table is unavailable"""
+    now = time.monotonic()
+    result, missing = {}, []
+    with _lock:
+        for scope in scopes:
+            cached = _cache.get(scope)
+            if cached and now - cached[1] < VERSION_CACHE_TTL:
+                result[scope] = cached[0]
+            else:
+                missing.append(scope)
+    if missing:
+        try:
+            rows = execute_query(
+                f"SELECT scope, version FROM table_versions WHERE scope IN ({', '.join(['%s'] * len(missing))})",
+                tuple(missing))
+        except Exception as e:
+            print(f"Version read error: {e}")
+            return None
+        found = {row['scope']: row['version'] for row in rows}
+        with _lock:
+            for scope in missing:
+                result[scope] = found.get(scope, 0)
+                _cache[scope] = (result[scope], now)
+    return result
+
+
+def token(*scopes):
+    """Compact string of the scopes' versions for ETags and cache keys; None when unavailable"""
+    current = get(*scopes)
+    if current is None:
+        return None
+    return ";".join(f"{scope}.{current[scope]}" for scope in scopes)
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
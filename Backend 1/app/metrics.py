@@ -0,0 +1,340 @@
+"""
+In-process metrics registry (Prometheus text format)
+
+Counters, gauges and histograms are plain Python objects guarded by a lock,
+so recording a sample is a dict update and nothing more. When the app runs
+under a pre-fork server each worker keeps its own registry; set METRICS_DIR
+to a shared writable directory and every worker periodically dumps a snapshot
+there so that /metrics can merge all of them.
+"""
+import json
+import os
+import threading
+import time
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1.0))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def merge(self, values, samples):
+        for key, value in samples:
+            key = tuple(key)
+            values[key] = values.get(key, 0) + value
+
+    def render(self, values):
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down (connections in use, pool size...)"""
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets plus _sum and _count"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(k), [list(v[0]), v[1], v[2]]] for k, v in self._values.items()]
+
+    def merge(self, values, samples):
+        for key, (counts, total, count) in samples:
+            key = tuple(key)
+            state = values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+            state[2] += count
+
+    def render(self, values):
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+class Registry:
+    """Holds every metric of this process and renders the exposition text"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    # ---------- multi-process support ----------
+
+    def _snapshot_path(self, pid=None):
+        return os.path.join(METRICS_DIR, f"metrics-{pid or os.getpid()}.json")
+
+    def flush(self, force=False):
+        """Write this worker's snapshot to METRICS_DIR (throttled)"""
+        if not METRICS_DIR:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = self._snapshot_path()
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Metrics flush error: {e}")
+
+    def _collect_snapshots(self):
+        if not METRICS_DIR:
+            return [(os.getpid(), self.snapshot())]
+        self.flush(force=True)
+        snapshots = []
+        try:
+            names = os.listdir(METRICS_DIR)
+        except OSError:
+            names = []
+        for filename in names:
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            try:
+                pid = int(filename[len('metrics-'):-len('.json')])
+                with open(os.path.join(METRICS_DIR, filename), encoding='utf-8') as f:
+                    snapshots.append((pid, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        """Return the Prometheus text exposition of all (merged) metrics"""
+        merged = {name: {} for name in self._metrics}
+        for pid, snapshot in self._collect_snapshots():
+            alive = _pid_alive(pid)
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                # gauges describe current state: drop those of exited workers
+                if metric.kind == 'gauge' and not alive:
+                    continue
+                metric.merge(merged[name], samples)
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(merged[name]))
+        lines.extend(_render_cache_ratios(merged.get('cache_lookups_total', {})))
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _render_cache_ratios(lookups):
+    caches = {}
+    for (cache, result), value in lookups.items():
+        caches.setdefault(cache, {})[result] = value
+    if not caches:
+        return []
+    lines = [
+        "# HELP cache_hit_ratio Share of cache lookups served from cache",
+        "# TYPE cache_hit_ratio gauge",
+    ]
+    for cache, results in sorted(caches.items()):
+        total = results.get('hit', 0) + results.get('miss', 0)
+        ratio = results.get('hit', 0) / total if total else 0.0
+        lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {_format_value(round(ratio, 6))}')
+    return lines
+
+
+REGISTRY = Registry()
+
+if hasattr(os, 'register_at_fork'):
+    # A preloaded master may already hold samples; children must start from
+    # zero or the merged output would count them once per worker.
+    os.register_at_fork(after_in_child=REGISTRY.reset)
+
+# ========== APPLICATION METRICS ==========
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests served',
+    ('blueprint', 'endpoint', 'method', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ('blueprint', 'endpoint'))
+HTTP_NOT_MODIFIED = REGISTRY.counter(
+    'http_not_modified_total', '304 responses to conditional GETs', ('endpoint',))
+HTTP_ERRORS = REGISTRY.counter(
+    'http_request_errors_total', 'HTTP requests answered with a 5xx status or an unhandled exception',
+    ('blueprint', 'endpoint'))
+
+DB_QUERIES = REGISTRY.counter(
+    'db_queries_total', 'SQL statements executed', ('outcome',))
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    'db_query_duration_seconds', 'SQL statement execution time', ())
+DB_CONNECT_LATENCY = REGISTRY.histogram(
+    'db_connect_duration_seconds', 'Time spent opening a MySQL connection', ())
+DB_CONNECTIONS_OPENED = REGISTRY.counter(
+    'db_connections_opened_total', 'MySQL connections opened')
+DB_CONNECTIONS_IN_USE = REGISTRY.gauge(
+    'db_connections_in_use', 'MySQL connections currently checked out by execute_query/transaction')
+DB_POOL_IDLE = REGISTRY.gauge(
+    'db_pool_idle_connections', 'Open connections waiting in the pool')
+DB_POOL_WAIT = REGISTRY.histogram(
+    'db_pool_wait_seconds', 'Time spent waiting for a free pool slot')
+DB_POOL_EXHAUSTED = REGISTRY.counter(
+    'db_pool_exhausted_total', 'Checkouts that gave up after DB_POOL_TIMEOUT')
+DB_LOCK_ERRORS = REGISTRY.counter(
+    'db_lock_errors_total', 'Lock wait timeouts and deadlocks reported by MySQL', ('kind',))
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    'cache_lookups_total', 'Cache lookups by result', ('cache', 'result'))
+
+ENROLLMENT_ATTEMPTS = REGISTRY.counter(
+    'enrollment_attempts_total', 'Enroll/drop attempts by outcome', ('operation', 'outcome'))
+
+EVENT_SUBSCRIBERS = REGISTRY.gauge(
+    'event_subscribers', 'Open server-sent event streams')
+EVENTS_DROPPED = REGISTRY.counter(
+    'events_dropped_total', 'Events discarded from full subscriber buffers')
+
+# MySQL error codes for lock contention
+LOCK_WAIT_TIMEOUT = 1205
+DEADLOCK = 1213
+
+
+def lock_error_kind(exc):
+    """Return 'lock_wait_timeout' / 'deadlock' for MySQL lock errors, else None"""
+    code = exc.args[0] if getattr(exc, 'args', None) else None
+    if code == LOCK_WAIT_TIMEOUT:
+        return 'lock_wait_timeout'
+    if code == DEADLOCK:
+        return 'deadlock'
+    return None
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
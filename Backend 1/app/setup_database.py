@@ -22,6 +22,8 @@ if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
 from app.database.connection import get_connection, create_database_if_not_exists, DB_CONFIG
+from app.database.migrate import migrate
+from app.database.sql_script import execute_file
 
 
 def run_sql_file(filepath, description):
@@ -33,35 +35,15 @@ def run_sql_file(filepath, description):
             print(f"❌ File not found: {filepath}")
             return False
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            sql_script = f.read()
+        def progress(stats):
+            print(f"  Executed {stats['statements']} statements ({stats['batches']} batches)...")
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Split by semicolon and execute each statement
-        statements = [s.strip() for s in sql_script.split(';') if s.strip()]
-        
-        for i, statement in enumerate(statements):
-            # Skip comments and empty statements
-            if not statement or statement.startswith('--'):
-                continue
-            
-            try:
-                cursor.execute(statement)
-                if i % 50 == 0 and i > 0:
-                    print(f"  Executed {i}/{len(statements)} statements...")
-            except Exception as e:
-                error_msg = str(e).lower()
-                # Ignore duplicate/already exists errors
-                if 'duplicate' not in error_msg and 'already exists' not in error_msg:
-                    print(f"  ⚠️  Warning on statement {i}: {e}")
+        # Streamed, batched over one multi-statement connection; duplicate/already
+        # exists errors are ignored, anything else is reported and skipped
+        stats = execute_file(filepath, strict=False, ignore=('duplicate', 'already exists'), on_progress=progress,
+                             legacy_comments=True)
         
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        print(f"✅ {description} completed successfully!")
+        print(f"✅ {description} completed successfully! ({stats['statements']} statements, {stats['failed']} warnings)")
         return True
         
     except Exception as e:
@@ -78,9 +60,11 @@ def fresh_install():
     # Ensure database exists
     create_database_if_not_exists()
     
-    # Run schema
-    schema_path = os.path.join(os.path.dirname(__file__), 'database', 'schema.sql')
-    if not run_sql_file(schema_path, "Creating database schema"):
+    # Run schema (baseline + numbered migrations, recorded in schema_migrations)
+    try:
+        migrate()
+    except Exception as e:
+        print(f"❌ Error: {e}")
         return False
     
     # Run seed data
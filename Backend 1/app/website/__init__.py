@@ -5,20 +5,31 @@ from flask import Flask
 from flask_cors import CORS
 import os
 
+# Browser origins allowed to call the API (the async routes in asgi.py use it too)
+CORS_ORIGINS = ["http://localhost:5173"]
+
 def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'sonnadasaikotomoshitanainoyogoodbye')
+
+    from .json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     # ONLY use Flask-CORS - NO manual headers
     CORS(app, 
-         origins=["http://localhost:5173"],
+         origins=CORS_ORIGINS,
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
          allow_headers=["Content-Type", "Authorization"],
          supports_credentials=True)
 
     from .auth import auth
     from .views import views
+    from .events import events
+    from . import monitoring, http_cache
     app.register_blueprint(auth, url_prefix='/')
     app.register_blueprint(views, url_prefix='/')
-    
+    app.register_blueprint(events, url_prefix='/')
+    monitoring.init_app(app)
+    http_cache.init_app(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Announcement feeds served from versioned caches (app/website/cache.py)
+
+- admin announcements: one cached list for everybody
+- faculty announcements: cached per section, assembled per student from the
+  sections they are enrolled in (the section list is cached per student)
+- a faculty member's own announcements: cached per faculty
+
+Writes bump 'admin_announcements' / 'announcements' + section:<id> (see
+AdminModel/FacultyModel.create_announcement and the delete routes), so a warm
+student dashboard costs two primary-key lookups instead of the announcement
+joins.
+History is paginated with an opaque keyset cursor on (created_at, id).
+"""
+import base64
+import datetime
+
+from app.database.connection import execute_query
+from app.database import versions
+from .cache import VersionedCache
+from .models import AdminModel, FacultyModel
+
+_admin_cache = VersionedCache('admin_announcements', maxsize=1)
+_section_cache = VersionedCache('section_announcements', maxsize=4096)
+_student_sections_cache = VersionedCache('student_sections', maxsize=50000)
+_faculty_cache = VersionedCache('faculty_announcements', maxsize=2048)
+
+# names and codes joined into the feeds come from these tables
+_ADMIN_SCOPES = ('admin_announcements', 'users')
+_SECTION_SCOPES = ('faculty', 'courses', 'course_sections')
+
+SECTION_FEED_SQL = """
+    SELECT a.*, f.faculty_code, CONCAT(f.first_name, ' ', f.last_name) as faculty_name,
+           cs.section_code, c.course_code, c.course_name
+    FROM announcements a
+    JOIN course_sections cs ON a.section_id = cs.section_id
+    JOIN courses c ON cs.course_id = c.course_id
+    JOIN faculty f ON a.faculty_id = f.faculty_id
+    WHERE a.section_id IN ({placeholders})
+    ORDER BY a.created_at DESC, a.announcement_id DESC
+"""
+
+HISTORY_PAGE_MAX = 100
+
+
+def _token(current, scopes):
+    """versions.token() from an already fetched versions.get() result"""
+    if current is None:
+        return None
+    return ";".join(f"{scope}.{current[scope]}" for scope in scopes)
+
+
+def _newest_first(rows):
+    return sorted(rows, key=lambda r: (r['created_at'] or datetime.datetime.min, r['announcement_id']), reverse=True)
+
+
+def encode_cursor(row):
+    raw = f"{row['created_at'].isoformat()}|{row['announcement_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, announcement_id) or None for an invalid cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, announcement_id = raw.split('|')
+        return datetime.datetime.fromisoformat(created_at), int(announcement_id)
+    except Exception:
+        return None
+
+
+class AnnouncementFeed:
+    """Cached announcement reads for dashboards and feeds"""
+
+    @staticmethod
+    def admin(current=None):
+        """Active admin announcements, newest first"""
+        version = _token(current, _ADMIN_SCOPES) if current else versions.token(*_ADMIN_SCOPES)
+        return _admin_cache.get('all', version, AdminModel.get_all_announcements)
+
+    @staticmethod
+    def _load_sections(section_ids):
+        grouped = {section_id: [] for section_id in section_ids}
+        query = SECTION_FEED_SQL.format(placeholders=', '.join(['%s'] * len(section_ids)))
+        for row in execute_query(query, tuple(section_ids)):
+            grouped[row['section_id']].append(row)
+        return grouped
+
+    @staticmethod
+    def sections(section_ids):
+        """{section_id: [announcement, ...]}; all cache misses are loaded in one query"""
+        if not section_ids:
+            return {}
+        current = versions.get(*[versions.section(s) for s in section_ids], *_SECTION_SCOPES)
+        if current is None:
+            return AnnouncementFeed._load_sections(list(section_ids))
+        shared = ';'.join(str(current[scope]) for scope in _SECTION_SCOPES)
+        keys_versions = {s: f"{current[versions.section(s)]};{shared}" for s in section_ids}
+        return _section_cache.get_many(keys_versions, AnnouncementFeed._load_sections)
+
+    @staticmethod
+    def student_section_ids(student_id, current=None):
+        """Sections the student is enrolled in"""
+        def load():
+            rows = execute_query("SELECT section_id FROM enrollments WHERE student_id = %s AND status = 'enrolled'", (student_id,))
+            return tuple(sorted({row['section_id'] for row in rows}))
+        scope = versions.student(student_id)
+        version = _token(current, (scope,)) if current else versions.token(scope)
+        return _student_sections_cache.get(student_id, version, load)
+
+    @staticmethod
+    def for_student(student_id):
+        """{'admin': [...], 'faculty': [...]} like StudentModel.get_student_announcements"""
+        try:
+            # one lookup for the student's and the admin feed's versions, one for the sections'
+            current = versions.get(versions.student(student_id), *_ADMIN_SCOPES)
+            by_section = AnnouncementFeed.sections(AnnouncementFeed.student_section_ids(student_id, current))
+            faculty = _newest_first([row for rows in by_section.values() for row in rows])
+            return {'admin': AnnouncementFeed.admin(current), 'faculty': faculty}
+        except Exception as e:
+            print(f"Student announcement feed error: {e}")
+            return {'admin': [], 'faculty': []}
+
+    @staticmethod
+    def for_faculty(faculty_id, current=None):
+        """Announcements the faculty member posted (FacultyModel.get_faculty_announcements)"""
+        scopes = ('announcements',) + _SECTION_SCOPES
+        version = _token(current, scopes) if current else versions.token(*scopes)
+        return _faculty_cache.get(faculty_id, version, lambda: FacultyModel.get_faculty_announcements(faculty_id))
+
+    @staticmethod
+    def history(section_id=None, cursor=None, limit=20):
+        """
+        One page of admin (section_id=None) or section announcements, newest
+        first. Returns (rows, next_cursor); next_cursor is None on the last page.
+        """
+        limit = max(1, min(int(limit), HISTORY_PAGE_MAX))
+        if section_id is None:
+            query = """
+                SELECT a.*, u.username as created_by_name
+                FROM admin_announcements a
+                JOIN users u ON a.created_by = u.user_id
+                WHERE a.is_active = TRUE {keyset}
+                ORDER BY a.created_at DESC, a.announcement_id DESC
+                LIMIT %s
+            """
+            params = []
+        else:
+            query = """
+                SELECT a.*, f.faculty_code, CONCAT(f.first_name, ' ', f.last_name) as faculty_name,
+                       cs.section_code, c.course_code, c.course_name
+                FROM announcements a
+                JOIN course_sections cs ON a.section_id = cs.section_id
+                JOIN courses c ON cs.course_id = c.course_id
+                JOIN faculty f ON a.faculty_id = f.faculty_id
+                WHERE a.section_id = %s {keyset}
+                ORDER BY a.created_at DESC, a.announcement_id DESC
+                LIMIT %s
+            """
+            params = [section_id]
+        keyset = ''
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None:
+                raise ValueError("Invalid cursor")
+            keyset = "AND (a.created_at < %s OR (a.created_at = %s AND a.announcement_id < %s))"
+            params += [position[0], position[0], position[1]]
+        rows = execute_query(query.format(keyset=keyset), tuple(params + [limit + 1]))
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    @staticmethod
+    def clear():
+        for cache in (_admin_cache, _section_cache, _student_sections_cache, _faculty_cache):
+            cache.clear()
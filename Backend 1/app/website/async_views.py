@@ -0,0 +1,92 @@
+"""
+Async versions of the hot read endpoints, served natively by app/asgi.py
+
+Each handler takes current_user and returns (payload, status) with the same
+JSON as its route in views.py. Reads that do not depend on each other are
+awaited together, so a dashboard costs one profile lookup plus the slowest
+of the remaining queries instead of their sum. Announcements come from the
+versioned in-process feed cache (announcements.py) in a worker thread, as
+does the cached faculty dashboard (faculty_dashboard.py).
+"""
+import asyncio
+
+from app.database import aio
+from .models import StudentModel, CourseModel, FacultyModel
+from .views import student_profile, faculty_profile, attach_attendance
+from .announcements import AnnouncementFeed
+from .faculty_dashboard import FacultyDashboard
+
+
+async def student_dashboard(current_user):
+    """Async GET /api/student/dashboard"""
+    if current_user['role'] != 'student':
+        return {'success': False, 'message': 'Access denied'}, 403
+    try:
+        student = await aio.fetch_one(StudentModel.PROFILE_SQL, (current_user['user_id'],))
+        if not student:
+            return {'success': False, 'message': 'Student not found'}, 404
+        student_id = student['student_id']
+
+        courses, attendance, announcements = await asyncio.gather(
+            aio.execute_query(CourseModel.STUDENT_ENROLLMENTS_SQL, (student_id,)),
+            aio.execute_query(StudentModel.ATTENDANCE_SUMMARY_SQL, (student_id,)),
+            aio.run_sync(AnnouncementFeed.for_student, student_id),
+        )
+        attach_attendance(courses, attendance)
+
+        return {
+            'success': True,
+            'data': {
+                'student': student_profile(student),
+                'enrolled_courses': courses,
+                'announcements': announcements
+            }
+        }, 200
+    except Exception as e:
+        print(f"Dashboard error: {e}")
+        return {'success': False, 'message': f'Error: {str(e)}'}, 500
+
+
+async def student_announcements(current_user):
+    """Async GET /api/student/announcements"""
+    if current_user['role'] != 'student':
+        return {'success': False, 'message': 'Access denied'}, 403
+    try:
+        student = await aio.fetch_one(StudentModel.PROFILE_SQL, (current_user['user_id'],))
+        if not student:
+            return {'success': False, 'message': 'Student not found'}, 404
+        announcements = await aio.run_sync(AnnouncementFeed.for_student, student['student_id'])
+        return {'success': True, 'data': {'announcements': announcements}}, 200
+    except Exception as e:
+        return {'success': False, 'message': f'Error: {str(e)}'}, 500
+
+
+async def faculty_dashboard(current_user):
+    """Async GET /api/faculty/dashboard"""
+    if current_user['role'] != 'faculty':
+        return {'success': False, 'message': 'Access denied'}, 403
+    try:
+        faculty = await aio.fetch_one(FacultyModel.PROFILE_SQL, (current_user['user_id'],))
+        if not faculty:
+            return {'success': False, 'message': 'Faculty not found'}, 404
+        dashboard = await aio.run_sync(FacultyDashboard.load, faculty['faculty_id'])
+        return {
+            'success': True,
+            'data': {
+                'faculty': faculty_profile(faculty),
+                'teaching_courses': dashboard['teaching_courses'],
+                'pending': dashboard['pending'],
+                'announcements': dashboard['announcements']
+            }
+        }, 200
+    except Exception as e:
+        print(f"Faculty dashboard error: {e}")
+        return {'success': False, 'message': f'Error: {str(e)}'}, 500
+
+
+# (method, path) -> handler; everything else goes to the Flask app
+ROUTES = {
+    ('GET', '/api/student/dashboard'): student_dashboard,
+    ('GET', '/api/student/announcements'): student_announcements,
+    ('GET', '/api/faculty/dashboard'): faculty_dashboard,
+}
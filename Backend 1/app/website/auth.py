@@ -24,55 +24,49 @@ def generate_token(user_id, username, role):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
 
+def decode_token(auth_header):
+    """
+    Resolve an Authorization header to (current_user, None), or to
+    (None, (message, error_code)) when the token is missing or invalid.
+    Shared by token_required and the async routes (app/asgi.py).
+    """
+    token = None
+    try:
+        if auth_header and auth_header.startswith('Bearer '):
+            token = auth_header.split(' ')[1]
+    except Exception:
+        token = None
+
+    if not token:
+        return None, ('Token is missing!', 'TOKEN_MISSING')
+
+    try:
+        data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+        return {
+            'user_id': data['user_id'],
+            'username': data['username'],
+            'role': data['role']
+        }, None
+    except jwt.ExpiredSignatureError:
+        return None, ('Token has expired!', 'TOKEN_EXPIRED')
+    except jwt.InvalidTokenError:
+        return None, ('Invalid token!', 'TOKEN_INVALID')
+    except Exception:
+        return None, ('Token verification failed', 'TOKEN_VERIFICATION_FAILED')
+
 def token_required(f):
     """Token verification decorator with enhanced error handling"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Get token from authorization header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                if auth_header.startswith('Bearer '):
-                    token = auth_header.split(' ')[1]
-            except Exception:
-                token = None
-        
-        if not token:
+        current_user, error = decode_token(request.headers.get('Authorization'))
+        if error:
+            message, error_code = error
             return jsonify({
                 'success': False,
-                'message': 'Token is missing!',
-                'error_code': 'TOKEN_MISSING'
+                'message': message,
+                'error_code': error_code
             }), 401
-        
-        try:
-            # Decode token
-            data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-            current_user = {
-                'user_id': data['user_id'],
-                'username': data['username'],
-                'role': data['role']
-            }
-        except jwt.ExpiredSignatureError:
-            return jsonify({
-                'success': False,
-                'message': 'Token has expired!',
-                'error_code': 'TOKEN_EXPIRED'
-            }), 401
-        except jwt.InvalidTokenError:
-            return jsonify({
-                'success': False,
-                'message': 'Invalid token!',
-                'error_code': 'TOKEN_INVALID'
-            }), 401
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'message': 'Token verification failed',
-                'error_code': 'TOKEN_VERIFICATION_FAILED'
-            }), 401
-        
+
         return f(current_user, *args, **kwargs)
     
     return decorated
@@ -0,0 +1,76 @@
+"""
+In-process LRU caches keyed on version counters (app/database/versions.py)
+
+An entry is (version, value); it is served only while the caller's current
+version matches, so there is no TTL and no explicit invalidation: bumping
+the scope on write is enough. When versions are unavailable (version=None)
+the cache is bypassed. Values are shared between requests: treat them as
+read-only.
+
+    feed = cache.get(section_id, versions.token(versions.section(section_id)),
+                     lambda: load_section(section_id))
+"""
+import threading
+from collections import OrderedDict
+
+from app import metrics
+
+
+class VersionedCache:
+    def __init__(self, name, maxsize=1024):
+        self.name = name
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key, version):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            return True, entry[1]
+        return False, None
+
+    def _store(self, key, version, value):
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key, version, loader):
+        """Cached value for key at version, else loader() (stored under version)"""
+        if version is None:
+            return loader()
+        with self._lock:
+            hit, value = self._lookup(key, version)
+        metrics.record_cache_lookup(self.name, hit)
+        if hit:
+            return value
+        value = loader()
+        with self._lock:
+            self._store(key, version, value)
+        return value
+
+    def get_many(self, keys_versions, loader):
+        """{key: value} for {key: version}; loader(missing_keys) -> {key: value} loads all misses at once"""
+        result, missing = {}, {}
+        with self._lock:
+            for key, version in keys_versions.items():
+                hit, value = self._lookup(key, version) if version is not None else (False, None)
+                if hit:
+                    result[key] = value
+                else:
+                    missing[key] = version
+        for key in keys_versions:
+            metrics.record_cache_lookup(self.name, key not in missing)
+        if missing:
+            loaded = loader(list(missing))
+            with self._lock:
+                for key, version in missing.items():
+                    result[key] = loaded.get(key)
+                    if version is not None:
+                        self._store(key, version, result[key])
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,164 @@
+"""
+Server-sent events: GET /api/events?topics=announcements,seats
+
+    const source = new EventSource(`${API}/api/events?token=${token}`);
+    source.addEventListener('seats', e => updateSeats(JSON.parse(e.data)));
+    source.addEventListener('announcements', e => refreshAnnouncements());
+    source.addEventListener('resync', () => reloadEverything());
+
+EventSource cannot send headers, so the JWT may also come as ?token=.
+Students receive admin announcements and those of the sections they are
+enrolled in, faculty admin announcements and their own sections', admins
+everything; seat changes go to everyone. A comment line is sent every
+EVENT_HEARTBEAT seconds so proxies keep the connection open, and a stream
+ends after EVENT_STREAM_MAX_SECONDS: the browser reconnects by itself with
+Last-Event-ID and is replayed what it missed, which also refreshes the
+section filter and lets gunicorn recycle the thread. Under gunicorn every
+open stream holds one worker thread, so at most EVENT_WSGI_MAX_STREAMS
+streams are served per process (0: none) and further clients get a 503 with
+Retry-After; serve /api/events from the ASGI mode (asgi.py), which has no
+such limit, for many concurrent clients.
+"""
+import os
+import json
+import time
+import threading
+
+from flask import Blueprint, Response, request, jsonify
+
+from app.database.connection import execute_query
+from app.database.events import BROKER, TOPICS
+from .auth import decode_token
+from .announcements import AnnouncementFeed
+
+EVENT_HEARTBEAT = float(os.getenv('EVENT_HEARTBEAT', 15))
+EVENT_STREAM_MAX_SECONDS = float(os.getenv('EVENT_STREAM_MAX_SECONDS', 300))
+EVENT_RETRY_MS = 3000
+# gthread workers have at most 16 threads: keep most of them for the API
+EVENT_WSGI_MAX_STREAMS = int(os.getenv('EVENT_WSGI_MAX_STREAMS', 4))
+
+_wsgi_streams = threading.BoundedSemaphore(EVENT_WSGI_MAX_STREAMS) if EVENT_WSGI_MAX_STREAMS > 0 else None
+
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+events = Blueprint('events', __name__)
+
+
+def auth_header(header, token_arg):
+    """Authorization header, else the ?token= query parameter as a bearer header"""
+    if header:
+        return header
+    return f"Bearer {token_arg}" if token_arg else None
+
+
+def parse_topics(value):
+    """Requested topics (all by default); None when one is unknown"""
+    if not value:
+        return set(TOPICS)
+    topics = {t.strip() for t in value.split(',') if t.strip()}
+    return topics if topics <= set(TOPICS) else None
+
+
+def parse_last_event_id(value):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def section_filter(current_user):
+    """accept(event) for the user, from a snapshot of their sections taken at connect time"""
+    role = current_user['role']
+    if role == 'admin':
+        return None
+    if role == 'student':
+        rows = execute_query("SELECT student_id FROM students WHERE user_id = %s", (current_user['user_id'],))
+        section_ids = set(AnnouncementFeed.student_section_ids(rows[0]['student_id'])) if rows else set()
+    else:
+        rows = execute_query("""
+            SELECT cs.section_id FROM course_sections cs
+            JOIN faculty f ON f.faculty_id = cs.faculty_id
+            WHERE f.user_id = %s
+        """, (current_user['user_id'],))
+        section_ids = {row['section_id'] for row in rows}
+
+    def accept(event):
+        if event['topic'] != 'announcements' or event['data'].get('scope') == 'admin':
+            return True
+        return event['data'].get('section_id') in section_ids
+    return accept
+
+
+def format_event(event):
+    data = json.dumps(event['data'], default=str, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {data}\n\n"
+
+
+def heartbeat():
+    return ": heartbeat\n\n"
+
+
+def open_stream(header, token_arg, topics_arg, last_event_id, notify=None):
+    """(subscriber, None) or (None, (payload, status)); shared with asgi.py"""
+    current_user, error = decode_token(auth_header(header, token_arg))
+    if error:
+        message, error_code = error
+        return None, ({'success': False, 'message': message, 'error_code': error_code}, 401)
+    topics = parse_topics(topics_arg)
+    if topics is None:
+        return None, ({'success': False, 'message': f"topics must be a subset of {', '.join(TOPICS)}"}, 400)
+    try:
+        sub = BROKER.subscribe(topics, section_filter(current_user), notify, parse_last_event_id(last_event_id))
+    except Exception as e:
+        print(f"Event stream error: {e}")
+        return None, ({'success': False, 'message': 'Event stream unavailable'}, 503)
+    return sub, None
+
+
+@events.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream announcement and seat events (text/event-stream)"""
+    slots = _wsgi_streams
+    if slots is None or not slots.acquire(blocking=False):
+        response = jsonify({'success': False, 'retry': True,
+                            'message': 'Too many open event streams on this server; serve /api/events from asgi.py'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, EVENT_RETRY_MS // 1000))
+        return response
+    released = []
+
+    def release():
+        if not released:
+            released.append(True)
+            slots.release()
+
+    sub, error = open_stream(request.headers.get('Authorization'), request.args.get('token'),
+                             request.args.get('topics'),
+                             request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    if error:
+        release()
+        payload, status = error
+        return jsonify(payload), status
+
+    def close():
+        BROKER.unsubscribe(sub)  # a no-op once the subscriber is gone
+        release()
+
+    def generate():
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            deadline = time.monotonic() + EVENT_STREAM_MAX_SECONDS
+            while time.monotonic() < deadline:
+                if not sub.wait(min(EVENT_HEARTBEAT, max(deadline - time.monotonic(), 0))):
+                    yield heartbeat()
+                    continue
+                for event in sub.drain():
+                    yield format_event(event)
+        finally:
+            close()
+
+    response = Response(generate(), mimetype='text/event-stream', headers=STREAM_HEADERS)
+    # also when the client goes away before the first chunk, where the
+    # generator never starts and its finally never runs
+    response.call_on_close(close)
+    return response
@@ -0,0 +1,141 @@
+"""
+Faculty dashboard in a bounded number of queries, cached per faculty member
+
+FacultyDashboard.load(faculty_id) returns the faculty member's active
+sections with live enrollment counts, their pending work and the
+announcement feeds:
+
+    teaching_courses  active sections with enrolled_students, missing_marks
+                      (enrolled students without a marks row) and
+                      unmarked_dates (scheduled class days of the last
+                      FACULTY_PENDING_DAYS days with no attendance marked,
+                      for sections with students)
+    pending           {'attendance': [...], 'marks': [...]} the sections with
+                      unmarked dates / missing marks
+    announcements     {'admin': [...], 'faculty': [...]} (AnnouncementFeed)
+
+A cold load is one version lookup for the table scopes, the section list,
+one version lookup for the sections' row scopes, one query for the
+sections and counts, one for the marked dates and the two announcement
+feeds, however many sections there are. The result is cached on those
+versions (section:<id> moves with enrollments, attendance:<id> with
+attendance, marks:<id> with FacultyModel.upload_marks) and on today's
+date, so a warm dashboard costs the two version lookups.
+
+Class days are read from the schedule's day code ('MWF 09:00-10:00',
+'TTH 10:00-11:30'); sections without one never report unmarked dates.
+"""
+import os
+import re
+import datetime
+
+from app.database.connection import execute_query
+from app.database import attendance_store, versions
+from .announcements import AnnouncementFeed, _token
+from .cache import VersionedCache
+
+FACULTY_PENDING_DAYS = int(os.getenv('FACULTY_PENDING_DAYS', 14))
+
+_section_ids_cache = VersionedCache('faculty_sections', maxsize=2048)
+_dashboard_cache = VersionedCache('faculty_dashboard', maxsize=2048)
+
+# table scopes of everything the dashboard joins, announcements included
+_SCOPES = ('course_sections', 'courses', 'faculty', 'announcements', 'admin_announcements', 'users')
+
+SECTION_IDS_SQL = "SELECT section_id FROM course_sections WHERE faculty_id = %s AND is_active = TRUE"
+
+SECTIONS_SQL = """
+    SELECT cs.section_id, cs.section_code, cs.semester, cs.year, cs.schedule, cs.room, cs.max_capacity,
+           c.course_code, c.course_name, c.credits,
+           COUNT(e.enrollment_id) as enrolled_students,
+           COUNT(e.enrollment_id) - COUNT(m.mark_id) as missing_marks
+    FROM course_sections cs
+    JOIN courses c ON cs.course_id = c.course_id
+    LEFT JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+    LEFT JOIN marks m ON m.enrollment_id = e.enrollment_id
+    WHERE cs.section_id IN ({sections})
+    GROUP BY cs.section_id, cs.section_code, cs.semester, cs.year, cs.schedule, cs.room, cs.max_capacity,
+             c.course_code, c.course_name, c.credits
+    ORDER BY c.course_code, cs.section_code
+"""
+
+DAY_CODES = {'M': 0, 'T': 1, 'W': 2, 'TH': 3, 'R': 3, 'F': 4, 'SA': 5, 'SU': 6}
+_DAY_PATTERN = re.compile(r'TH|SA|SU|[MTWRF]')
+
+
+def weekdays(schedule):
+    """{0..6} weekdays of a schedule like 'TTH 10:00-11:30' (empty when there is no day code)"""
+    code = (schedule or '').split()[:1]
+    return {DAY_CODES[day] for day in _DAY_PATTERN.findall(code[0].upper())} if code else set()
+
+
+def class_dates(schedule, date_from, date_to):
+    days = weekdays(schedule)
+    dates, day = [], date_from
+    while day <= date_to:
+        if day.weekday() in days:
+            dates.append(day)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+class FacultyDashboard:
+    """Cached faculty dashboard reads"""
+
+    @staticmethod
+    def section_ids(faculty_id, current=None):
+        """Active sections the faculty member teaches"""
+        def load():
+            return tuple(sorted(row['section_id'] for row in execute_query(SECTION_IDS_SQL, (faculty_id,))))
+        version = _token(current, ('course_sections',)) if current else versions.token('course_sections')
+        return _section_ids_cache.get(faculty_id, version, load)
+
+    @staticmethod
+    def _load(section_ids, today):
+        if not section_ids:
+            return {'teaching_courses': [], 'pending': {'attendance': [], 'marks': []}}
+        rows = execute_query(SECTIONS_SQL.format(sections=', '.join(['%s'] * len(section_ids))), tuple(section_ids))
+        date_from = today - datetime.timedelta(days=FACULTY_PENDING_DAYS)
+        date_to = today - datetime.timedelta(days=1)
+        marked = attendance_store.marked_dates(section_ids, date_from, date_to)
+
+        pending = {'attendance': [], 'marks': []}
+        for row in rows:
+            row['enrolled_students'] = int(row['enrolled_students'])
+            row['missing_marks'] = int(row['missing_marks'])
+            unmarked = [] if not row['enrolled_students'] else [
+                day for day in class_dates(row['schedule'], date_from, date_to)
+                if day not in marked.get(row['section_id'], ())]
+            row['unmarked_dates'] = [day.isoformat() for day in unmarked]
+            section = {key: row[key] for key in ('section_id', 'course_code', 'course_name', 'section_code')}
+            if unmarked:
+                pending['attendance'].append(dict(section, dates=row['unmarked_dates']))
+            if row['missing_marks']:
+                pending['marks'].append(dict(section, missing=row['missing_marks']))
+        return {'teaching_courses': rows, 'pending': pending}
+
+    @staticmethod
+    def load(faculty_id, today=None):
+        """{'teaching_courses', 'pending', 'announcements'} for the faculty dashboard"""
+        today = today or datetime.date.today()
+        current = versions.get(*_SCOPES)
+        section_ids = FacultyDashboard.section_ids(faculty_id, current)
+
+        row_scopes = [scope for s in section_ids
+                      for scope in (versions.section(s), versions.attendance(s), versions.marks(s))]
+        rows_current = versions.get(*row_scopes) if row_scopes else {}
+        version = None
+        if current is not None and rows_current is not None:
+            version = ';'.join([today.isoformat(), _token(current, ('course_sections', 'courses')),
+                                _token(rows_current, row_scopes)])
+        dashboard = _dashboard_cache.get(faculty_id, version, lambda: FacultyDashboard._load(section_ids, today))
+
+        return dict(dashboard, announcements={
+            'admin': AnnouncementFeed.admin(current),
+            'faculty': AnnouncementFeed.for_faculty(faculty_id, current),
+        })
+
+    @staticmethod
+    def clear():
+        for cache in (_section_ids_cache, _dashboard_cache):
+            cache.clear()
@@ -0,0 +1,124 @@
+"""
+Response compression and conditional GETs
+
+init_app(app) compresses JSON/text responses of at least COMPRESS_MIN_BYTES
+with brotli (when installed and accepted) or gzip.
+
+@etag(...) goes under @token_required and answers If-None-Match with 304:
+
+    @views.route('/api/courses/available')
+    @token_required
+    @etag(lambda current_user: versions.token('courses', 'course_sections', 'enrollments'))
+    def get_available_courses(current_user): ...
+
+With a validator the tag is derived from it, the user and the URL, so a 304
+costs no model query. Without one (or when it returns None) the tag is a
+hash of the body: the query still runs but an unchanged response is not
+sent again.
+"""
+import os
+import gzip
+import hashlib
+from functools import wraps
+
+from flask import request, make_response, current_app
+
+from app import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 4))
+
+_COMPRESSIBLE = ('application/json', 'text/')
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """after_request hook"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(_COMPRESSIBLE)):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+    if encoding == 'br':
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # a strong ETag names one representation; the compressed one gets its own
+    tag, weak = response.get_etag()
+    if tag:
+        response.set_etag(f"{tag}-{encoding}", weak)
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
+
+
+def _matches(tag):
+    """If-None-Match check that also accepts our -gzip/-br variants of tag"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    return any(if_none_match.contains_weak(t) for t in (tag, f"{tag}-gzip", f"{tag}-br"))
+
+
+def _not_modified(tag):
+    response = current_app.response_class(status=304)
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Accept-Encoding')
+    metrics.HTTP_NOT_MODIFIED.inc(endpoint=request.url_rule.rule if request.url_rule else 'unmatched')
+    return response
+
+
+def _user_tag(current_user, version):
+    key = f"{request.path}?{request.query_string.decode('latin-1')}|{current_user['user_id']}|{version}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def etag(validator=None):
+    """Conditional GET for a token_required view; validator(current_user, **view_args) -> str"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            tag = None
+            version = validator(current_user, *args, **kwargs) if validator is not None else None
+            if version is not None:
+                tag = _user_tag(current_user, version)
+                if _matches(tag):
+                    return _not_modified(tag)
+            response = make_response(f(current_user, *args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if tag is None:
+                tag = hashlib.sha1(response.get_data()).hexdigest()
+                if _matches(tag):
+                    return _not_modified(tag)
+            response.set_etag(tag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated
+    return decorator
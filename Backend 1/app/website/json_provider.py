@@ -0,0 +1,99 @@
+"""
+JSON encoding for API responses (installed as app.json in create_app)
+
+Rows from the DictCursor carry Decimal (fees, GPAs, percentages), date,
+datetime and TIME (timedelta) values. They are encoded the same way
+everywhere: Decimal as a number, dates as ISO 8601 ("2025-09-01",
+"2025-09-01T10:30:00"), TIME as "HH:MM:SS". orjson does the work when it
+is installed; the stdlib encoder with the same rules is the fallback.
+
+Per-endpoint key pruning:
+
+    @views.route('/api/admin/users')
+    @token_required
+    @json_exclude('password_hash')
+    def get_all_users(current_user): ...
+"""
+import json
+import decimal
+import datetime
+from functools import wraps
+
+from flask import g, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (datetime.date, datetime.datetime, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, datetime.timedelta):
+        seconds = int(o.total_seconds())
+        sign = '-' if seconds < 0 else ''
+        hours, rest = divmod(abs(seconds), 3600)
+        return f"{sign}{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+    if isinstance(o, (bytes, bytearray)):
+        return o.decode('utf-8', 'replace')
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def prune(obj, keys):
+    """Copy of obj without the given dict keys, at any depth"""
+    if isinstance(obj, dict):
+        return {k: prune(v, keys) for k, v in obj.items() if k not in keys}
+    if isinstance(obj, (list, tuple)):
+        return [prune(v, keys) for v in obj]
+    return obj
+
+
+def json_exclude(*keys):
+    """Drop these keys from every object in the view's JSON response"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            g.json_exclude = frozenset(keys)
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson, ISO dates, numeric Decimals and key pruning"""
+
+    def _encode(self, obj, indent=False):
+        """Encode to bytes"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(obj, default=_default, option=option)
+        if indent:
+            return json.dumps(obj, default=_default, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'indent', 'separators'}:
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return self._encode(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        exclude = g.get('json_exclude') if has_request_context() else None
+        if exclude:
+            obj = prune(obj, exclude)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -3,6 +3,8 @@ Database Models and CRUD Operations (PYMYSQL VERSION)
 """
 
 from app.database.connection import execute_query,transaction
+from app.database import versions, events, ledger, salaries, attendance_store, attendance_rollups
+from app import metrics
 import datetime
 import re
 import secrets
@@ -26,17 +28,8 @@ class AdminModel:
     @staticmethod
     def mark_faculty_attendance(faculty_id, date, session, status, marked_by_user_id):
         """Mark faculty attendance"""
-        query = """
-            INSERT INTO faculty_attendance (faculty_id, attendance_date, session, status, marked_by)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE status = %s, marked_at = CURRENT_TIMESTAMP
-        """
-        try:
-            execute_query(query, (faculty_id, date, session, status, marked_by_user_id, status), fetch=False)
-            return True
-        except Exception as e:
-            print(f"Faculty attendance mark error: {e}")
-            return False
+        record = {'faculty_id': faculty_id, 'date': date, 'session': session, 'status': status}
+        return AdminModel.mark_multiple_faculty_attendance([record], marked_by_user_id)
     
     @staticmethod
     def get_faculty_attendance_by_date(date):
@@ -66,42 +59,15 @@ class AdminModel:
     @staticmethod
     def get_faculty_attendance_summary():
         """Get faculty attendance summary"""
-        query = """
-            SELECT 
-                f.faculty_id,
-                f.faculty_code,
-                CONCAT(f.first_name, ' ', f.last_name) as faculty_name,
-                d.dept_name,
-                COUNT(fa.attendance_id) as total_days,
-                SUM(CASE WHEN fa.status = 'present' THEN 1 ELSE 0 END) as present_days,
-                SUM(CASE WHEN fa.status = 'absent' THEN 1 ELSE 0 END) as absent_days,
-                ROUND((SUM(CASE WHEN fa.status = 'present' THEN 1 ELSE 0 END) / COUNT(fa.attendance_id)) * 100, 2) as attendance_percentage
-            FROM faculty f
-            JOIN departments d ON f.department_id = d.dept_id
-            LEFT JOIN faculty_attendance fa ON f.faculty_id = fa.faculty_id
-            WHERE f.status = 'active'
-            GROUP BY f.faculty_id, f.faculty_code, f.first_name, f.last_name, d.dept_name
-            ORDER BY f.first_name, f.last_name
-        """
-        return execute_query(query)
+        return execute_query(attendance_rollups.FACULTY_SUMMARY_SQL)
 
     @staticmethod
     def mark_multiple_faculty_attendance(attendance_data, marked_by_user_id):
         """Mark attendance for multiple faculty at once"""
         try:
-            for record in attendance_data:
-                faculty_id = record['faculty_id']
-                date = record['date']
-                session = record['session']
-                status = record['status']
-                
-                query = """
-                    INSERT INTO faculty_attendance (faculty_id, attendance_date, session, status, marked_by)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE status = %s, marked_at = CURRENT_TIMESTAMP
-                """
-                execute_query(query, (faculty_id, date, session, status, marked_by_user_id, status), fetch=False)
-            
+            # one transaction; the faculty rollups move with the rows
+            with transaction() as (conn, cursor):
+                attendance_rollups.mark_faculty(cursor, attendance_data, marked_by_user_id)
             return True
         except Exception as e:
             print(f"Multiple faculty attendance error: {e}")
@@ -187,22 +153,25 @@ class AdminModel:
             print(f"Update admin info error: {e}")
             return False
 
+    ACTIVE_ANNOUNCEMENTS_SQL = """
+        SELECT a.*, u.username as created_by_name
+        FROM admin_announcements a
+        JOIN users u ON a.created_by = u.user_id
+        WHERE a.is_active = TRUE
+        ORDER BY a.created_at DESC
+    """
+
     @staticmethod
     def get_all_announcements():
-        query = """
-            SELECT a.*, u.username as created_by_name
-            FROM admin_announcements a
-            JOIN users u ON a.created_by = u.user_id
-            WHERE a.is_active = TRUE
-            ORDER BY a.created_at DESC
-        """
-        return execute_query(query)
+        return execute_query(AdminModel.ACTIVE_ANNOUNCEMENTS_SQL)
 
     @staticmethod
     def create_announcement(title, message, announcement_type, created_by):
         query = "INSERT INTO admin_announcements (title, message, type, created_by) VALUES (%s, %s, %s, %s)"
         try:
             execute_query(query, (title, message, announcement_type, created_by), fetch=False)
+            versions.bump('admin_announcements')
+            events.publish('announcements', {'scope': 'admin', 'title': title, 'type': announcement_type})
             return True
         except Exception as e:
             print(f"Create announcement error: {e}")
@@ -225,19 +194,17 @@ class AdminModel:
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, TRUE)
                 """
                 cursor.execute(query, (course_id, faculty_id, section_code, semester, year, schedule, room, max_capacity))
-                # update faculty salary after creating a new section
-                # do it outside transaction helper using our model method
-                # we still call compute_and_update_salary to ensure consistency
-            try:
-                FacultyModel.compute_and_update_salary(faculty_id)
-            except Exception:
-                # ensure that even if salary update fails, section creation still completes
-                pass
+            versions.bump('course_sections')
+            # after commit; a failed salary update does not undo the section (see salaries.deferred for bulk setup)
+            salaries.touch(faculty_ids=[faculty_id])
             return True
         except Exception as e:
             print(f"Create course section error: {e}")
             return False
     
+    # section columns a salary depends on (app/database/salaries.py)
+    SALARY_COLUMNS = {'faculty_id', 'course_id', 'is_active'}
+
     @staticmethod
     def update_course_section(section_id, **kwargs):
         """Update course section details"""
@@ -251,28 +218,16 @@ class AdminModel:
         query = f"UPDATE course_sections SET {set_clause} WHERE section_id = %s"
         
         try:
-            # fetch previous state to detect changes
-            old = execute_query("SELECT faculty_id, is_active FROM course_sections WHERE section_id = %s", (section_id,))
-            old_fac = old[0]['faculty_id'] if old else None
-            old_active = old[0]['is_active'] if old else None
+            affects_salary = bool(AdminModel.SALARY_COLUMNS & set(kwargs))
+            if affects_salary:
+                # previous assignment: moving a section changes the old and the new teacher's salary
+                old = execute_query("SELECT faculty_id FROM course_sections WHERE section_id = %s", (section_id,))
+                old_fac = old[0]['faculty_id'] if old else None
             execute_query(query, values, fetch=False)
+            versions.bump('course_sections', versions.section(section_id))
 
-            # If faculty assignment changed or activation changed, recompute salaries
-            new = execute_query("SELECT faculty_id, is_active FROM course_sections WHERE section_id = %s", (section_id,))
-            new_fac = new[0]['faculty_id'] if new else None
-            new_active = new[0]['is_active'] if new else None
-
-            # Recompute for old and new faculty if applicable
-            try:
-                if old_fac and old_fac != new_fac:
-                    FacultyModel.compute_and_update_salary(old_fac)
-                if new_fac:
-                    FacultyModel.compute_and_update_salary(new_fac)
-                # If is_active changed, recompute for current faculty
-                if old_active != new_active and new_fac:
-                    FacultyModel.compute_and_update_salary(new_fac)
-            except Exception:
-                pass
+            if affects_salary:
+                salaries.touch(faculty_ids=[old_fac, kwargs.get('faculty_id', old_fac)])
             return True
         except Exception as e:
             print(f"Update course section error: {e}")
@@ -318,6 +273,7 @@ class DepartmentModel:
         try:
             query = "UPDATE courses SET department_id = %s WHERE course_id = %s"
             execute_query(query, (department_id, course_id), fetch=False)
+            versions.bump('courses')
             return True
         except Exception as e:
             print(f"Add course to department error: {e}")
@@ -329,6 +285,7 @@ class DepartmentModel:
         try:
             query = "UPDATE courses SET department_id = NULL WHERE course_id = %s"
             execute_query(query, (course_id,), fetch=False)
+            versions.bump('courses')
             return True
         except Exception as e:
             print(f"Drop course from department error: {e}")
@@ -348,13 +305,15 @@ class DepartmentModel:
 
     @staticmethod
     def add_fee_record(student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, due_date):
-        """Add new fee record with component breakdown"""
-        query = """
-            INSERT INTO fee_details (student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, due_date, status)
-            VALUES (%s, %s, %s, %s, %s, %s, 'pending')
-        """
+        """Charge fee components to the student's record for the semester (one ledger entry each)"""
         try:
-            execute_query(query, (student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, due_date), fetch=False)
+            charges = [(component, amount) for component, amount in
+                       (('tuition', tuition_fee), ('lab', lab_fee), ('miscellaneous', miscellaneous_fee)) if amount]
+            with transaction() as (conn, cursor):
+                for component, amount in charges or [('tuition', 0)]:
+                    ledger.post(cursor, student_id, semester, 'charge', amount, component=component,
+                                due_date=due_date, memo='fee record')
+            versions.bump('fee_details', 'students', versions.student(student_id))
             return True
         except Exception as e:
             print(f"Add fee record error: {e}")
@@ -369,16 +328,19 @@ class DepartmentModel:
             WHERE fee_id = %s
         """
         try:
-            # figure out the student_id and semester to recompute balance
-            row = execute_query("SELECT student_id, semester FROM fee_details WHERE fee_id = %s", (fee_id,))
-            if not row:
-                return False
-            student_id = row[0]['student_id']
-            semester = row[0]['semester']
-            # also set amount_paid to amount_due when marking paid
-            execute_query("UPDATE fee_details SET status = 'paid', payment_date = CURDATE(), amount_paid = amount_due WHERE fee_id = %s", (fee_id,), fetch=False)
-            # recompute balance for the student (all semesters) - call compute for the specific semester and then compute total balance
-            StudentModel.compute_and_update_fee_for_semester(student_id, semester)
+            with transaction() as (conn, cursor):
+                cursor.execute("SELECT student_id, semester, amount_due, amount_paid FROM fee_details WHERE fee_id = %s FOR UPDATE", (fee_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return False
+                student_id = row['student_id']
+                # pay the outstanding amount; the payment entry also moves fee_balance
+                outstanding = (row['amount_due'] or 0) - (row['amount_paid'] or 0)
+                if outstanding > 0:
+                    ledger.post(cursor, student_id, row['semester'], 'payment', outstanding, fee_id=fee_id, memo='marked paid')
+                else:
+                    cursor.execute(query, (fee_id,))
+            versions.bump('fee_details', 'students', versions.student(student_id))
             return True
         except Exception as e:
             print(f"Mark fee paid error: {e}")
@@ -411,6 +373,7 @@ class DepartmentModel:
         
         try:
             execute_query(query, values, fetch=False)
+            versions.bump('students', versions.student(student_id))
             return True
         except Exception as e:
             print(f"Update student error: {e}")
@@ -465,10 +428,12 @@ class UserModel:
                 if cnt > 0:
                     print('Create user error: only one admin allowed')
                     return None
-            execute_query(query, (username, password_hash, email, role), fetch=False)
-            # return last inserted id
-            res = execute_query("SELECT LAST_INSERT_ID() as id")
-            return res[0]['id'] if res else None
+            # lastrowid of the same connection (LAST_INSERT_ID() is per connection)
+            with transaction() as (conn, cursor):
+                cursor.execute(query, (username, password_hash, email, role))
+                user_id = cursor.lastrowid
+            versions.bump('users')
+            return user_id
         except Exception as e:
             print(f"Create user error: {e}")
             return None
@@ -502,6 +467,7 @@ class UserModel:
         query = "UPDATE users SET password_hash = %s WHERE user_id = %s"
         try:
             execute_query(query, (new_password, user_id), fetch=False)
+            versions.bump('users')
             return True
         except Exception as e:
             print(f"Update password error: {e}")
@@ -514,6 +480,7 @@ class UserModel:
         query = "UPDATE users SET password_hash = %s WHERE user_id = %s"
         try:
             execute_query(query, (new_password, user_id), fetch=False)
+            versions.bump('users')
             return new_password
         except Exception as e:
             print(f"Reset password error: {e}")
@@ -579,6 +546,7 @@ class UserModel:
                     result = {'user_id': user_id, 'faculty_id': profile_id, 'username': username, 'faculty_code': faculty_code, 'password': password}
                 else:
                     result = {'user_id': user_id}
+            versions.bump('users', {'student': 'students', 'faculty': 'faculty'}.get(role))
             return True, result
         except Exception as e:
             print(f"Create user/profile error: {e}")
@@ -586,6 +554,21 @@ class UserModel:
 
 
 # ========== COURSE MODEL ==========
+def _enrollment_failure_reason(exc):
+    """Map an enroll/drop exception to a low-cardinality metrics label"""
+    kind = metrics.lock_error_kind(exc)
+    if kind:
+        return kind
+    message = str(exc).lower()
+    if 'full' in message:
+        return 'full'
+    if 'already enrolled' in message:
+        return 'duplicate'
+    if 'not found' in message:
+        return 'not_found'
+    return 'error'
+
+
 class CourseModel:
     """Course helper operations"""
     @staticmethod
@@ -594,16 +577,31 @@ class CourseModel:
         res = execute_query(query, (section_id,))
         return res[0]['course_id'] if res else None
 
+    STUDENT_ENROLLMENTS_SQL = """
+        SELECT e.enrollment_id, e.section_id, cs.section_code, cs.semester, cs.year, c.course_code, c.course_name, c.credits, cs.room, cs.schedule, e.status
+        FROM enrollments e
+        JOIN course_sections cs ON e.section_id = cs.section_id
+        JOIN courses c ON cs.course_id = c.course_id
+        WHERE e.student_id = %s
+    """
+
     @staticmethod
     def get_student_enrollments(student_id):
+        return execute_query(CourseModel.STUDENT_ENROLLMENTS_SQL, (student_id,))
+
+    @staticmethod
+    def get_enrollments_by_student():
+        """All enrollments in one query, grouped as {student_id: [enrollment, ...]}"""
         query = """
-            SELECT e.enrollment_id, e.section_id, cs.section_code, cs.semester, cs.year, c.course_code, c.course_name, c.credits, cs.room, cs.schedule, e.status
+            SELECT e.student_id, e.enrollment_id, e.section_id, cs.section_code, cs.semester, cs.year, c.course_code, c.course_name, c.credits, cs.room, cs.schedule, e.status
             FROM enrollments e
             JOIN course_sections cs ON e.section_id = cs.section_id
             JOIN courses c ON cs.course_id = c.course_id
-            WHERE e.student_id = %s
         """
-        return execute_query(query, (student_id,))
+        grouped = {}
+        for row in execute_query(query):
+            grouped.setdefault(row.pop('student_id'), []).append(row)
+        return grouped
 
     @staticmethod
     def check_seats_available(section_id):
@@ -639,15 +637,14 @@ class CourseModel:
                     raise ValueError("Student already enrolled in this section")
                 # insert enrollment
                 cursor.execute("INSERT INTO enrollments (student_id, section_id, enrollment_date, status) VALUES (%s, %s, CURDATE(), 'enrolled')", (student_id, section_id))
-                # Capture semester to recompute fees after commit
-                cursor.execute("SELECT semester FROM course_sections WHERE section_id = %s", (section_id,))
-                sec = cursor.fetchone()
-                semester = sec['semester'] if sec else None
-            # After transaction commit, recompute fees
-            if semester:
-                StudentModel.compute_and_update_fee_for_semester(student_id, semester)
+                # one tuition charge in the same transaction
+                ledger.charge_enrollment(cursor, student_id, section_id, cursor.lastrowid)
+            versions.bump('enrollments', 'fee_details', 'students', versions.section(section_id), versions.student(student_id))
+            events.publish_seats(section_id)
+            metrics.ENROLLMENT_ATTEMPTS.inc(operation='enroll', outcome='success')
             return True
         except Exception as e:
+            metrics.ENROLLMENT_ATTEMPTS.inc(operation='enroll', outcome=_enrollment_failure_reason(e))
             print(f"Enroll student error: {e}")
             return False
 
@@ -661,14 +658,13 @@ class CourseModel:
                     raise ValueError("Enrollment not found")
                 enrollment_id = row['enrollment_id']
                 cursor.execute("UPDATE enrollments SET status = 'dropped' WHERE enrollment_id = %s", (enrollment_id,))
-                # Recompute student's fee for semester
-                cursor.execute("SELECT semester FROM course_sections WHERE section_id = %s", (section_id,))
-                sec = cursor.fetchone()
-                semester = sec['semester'] if sec else None
-                if semester:
-                    StudentModel.compute_and_update_fee_for_semester(student_id, semester)
+                ledger.credit_enrollment(cursor, student_id, section_id, enrollment_id)
+            versions.bump('enrollments', 'fee_details', 'students', versions.section(section_id), versions.student(student_id))
+            events.publish_seats(section_id)
+            metrics.ENROLLMENT_ATTEMPTS.inc(operation='drop', outcome='success')
             return True
         except Exception as e:
+            metrics.ENROLLMENT_ATTEMPTS.inc(operation='drop', outcome=_enrollment_failure_reason(e))
             print(f"Drop course error: {e}")
             return False
 
@@ -698,11 +694,31 @@ class CourseModel:
         query = "INSERT INTO courses (course_code, course_name, credits, fee_per_credit, department_id) VALUES (%s, %s, %s, %s, %s)"
         try:
             execute_query(query, (course_code, course_name, credits, fee_per_credit, department_id), fetch=False)
+            versions.bump('courses')
             return True
         except Exception as e:
             print(f"Create course error: {e}")
             return False
 
+    UPDATABLE_COLUMNS = ('course_code', 'course_name', 'credits', 'fee_per_credit', 'department_id')
+
+    @staticmethod
+    def update_course(course_id, **fields):
+        """Update course columns; credits/fee_per_credit changes recompute the salaries of its teachers"""
+        fields = {k: v for k, v in fields.items() if k in CourseModel.UPDATABLE_COLUMNS}
+        if not fields:
+            return False
+        set_clause = ", ".join(f"{key} = %s" for key in fields)
+        try:
+            execute_query(f"UPDATE courses SET {set_clause} WHERE course_id = %s", (*fields.values(), course_id), fetch=False)
+            versions.bump('courses')
+            if {'credits', 'fee_per_credit'} & set(fields):
+                salaries.touch(course_ids=[course_id])
+            return True
+        except Exception as e:
+            print(f"Update course error: {e}")
+            return False
+
 
 # ========== STUDENT MODEL ==========
 class StudentModel:
@@ -748,22 +764,24 @@ class StudentModel:
                     (user_id, student_code, first_name, last_name, date_of_birth, phone, cnic, enrollment_date, major_dept_id, current_semester, status)
                 )
                 student_id = cursor.lastrowid
-                return student_id
+            versions.bump('users', 'students')
+            return student_id
         except Exception as e:
             print(f"Create student error: {e}")
             return None
 
+    PROFILE_SQL = """
+        SELECT s.*, d.dept_name, u.email, u.username
+        FROM students s
+        JOIN departments d ON s.major_dept_id = d.dept_id
+        JOIN users u ON s.user_id = u.user_id
+        WHERE s.user_id = %s
+    """
+
     @staticmethod
     def get_student_by_user_id(user_id):
         """Get student details by user_id"""
-        query = """
-            SELECT s.*, d.dept_name, u.email, u.username
-            FROM students s
-            JOIN departments d ON s.major_dept_id = d.dept_id
-            JOIN users u ON s.user_id = u.user_id
-            WHERE s.user_id = %s
-        """
-        result = execute_query(query, (user_id,))
+        result = execute_query(StudentModel.PROFILE_SQL, (user_id,))
         return result[0] if result else None
 
     @staticmethod
@@ -784,24 +802,13 @@ class StudentModel:
         # Use CourseModel helper or run the SQL directly
         return CourseModel.get_student_enrollments(student_id)
 
+    # running counts kept by every attendance write (app/database/attendance_rollups.py)
+    ATTENDANCE_SUMMARY_SQL = attendance_rollups.STUDENT_SUMMARY_SQL
+
     @staticmethod
     def get_attendance_summary(student_id):
         """Get attendance summary for all enrolled courses"""
-        query = """
-            SELECT 
-                c.course_code,
-                c.course_name,
-                COUNT(a.attendance_id) as total_classes,
-                SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present,
-                SUM(CASE WHEN a.status = 'absent' THEN 1 ELSE 0 END) as absent,
-                ROUND((SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) / COUNT(a.attendance_id)) * 100, 2) as attendance_percentage
-            FROM attendance a
-            JOIN course_sections cs ON a.section_id = cs.section_id
-            JOIN courses c ON cs.course_id = c.course_id
-            WHERE a.student_id = %s
-            GROUP BY c.course_id, c.course_code, c.course_name
-        """
-        return execute_query(query, (student_id,))
+        return execute_query(StudentModel.ATTENDANCE_SUMMARY_SQL, (student_id,))
 
     @staticmethod
     def get_all_marks(student_id):
@@ -862,12 +869,36 @@ class StudentModel:
             result = execute_query(query, (student_id,))
         return result[0]['gpa'] if result and result[0] and result[0].get('gpa') else 0.0
 
+    @staticmethod
+    def get_semester_gpas(student_id):
+        """SGPA of every semester in one query: {semester: gpa} (same rounding as calculate_gpa)"""
+        query = """
+            SELECT semester, ROUND(SUM(grade_points * credits) / SUM(credits), 2) as gpa
+            FROM transcript
+            WHERE student_id = %s
+            GROUP BY semester
+        """
+        return {row['semester']: row['gpa'] or 0.0 for row in execute_query(query, (student_id,))}
+
     @staticmethod
     def get_fee_details(student_id):
         """Get fee details for a student"""
         query = "SELECT * FROM fee_details WHERE student_id = %s ORDER BY semester DESC"
         return execute_query(query, (student_id,))
 
+    SECTION_ANNOUNCEMENTS_SQL = """
+        SELECT a.*, f.faculty_code, CONCAT(f.first_name, ' ', f.last_name) as faculty_name,
+               cs.section_code, c.course_code, c.course_name
+        FROM announcements a
+        JOIN course_sections cs ON a.section_id = cs.section_id
+        JOIN courses c ON cs.course_id = c.course_id
+        JOIN faculty f ON a.faculty_id = f.faculty_id
+        WHERE a.section_id IN (
+            SELECT section_id FROM enrollments WHERE student_id = %s AND status = 'enrolled'
+        )
+        ORDER BY a.created_at DESC
+    """
+
     @staticmethod
     def get_student_announcements(student_id):
         """Return announcements relevant to a student: admin announcements + faculty announcements for sections the student is enrolled in."""
@@ -876,19 +907,7 @@ class StudentModel:
             admin_announcements = AdminModel.get_all_announcements()
 
             # Faculty announcements for student's enrolled sections
-            query = """
-                SELECT a.*, f.faculty_code, CONCAT(f.first_name, ' ', f.last_name) as faculty_name,
-                       cs.section_code, c.course_code, c.course_name
-                FROM announcements a
-                JOIN course_sections cs ON a.section_id = cs.section_id
-                JOIN courses c ON cs.course_id = c.course_id
-                JOIN faculty f ON a.faculty_id = f.faculty_id
-                WHERE a.section_id IN (
-                    SELECT section_id FROM enrollments WHERE student_id = %s AND status = 'enrolled'
-                )
-                ORDER BY a.created_at DESC
-            """
-            faculty_announcements = execute_query(query, (student_id,))
+            faculty_announcements = execute_query(StudentModel.SECTION_ANNOUNCEMENTS_SQL, (student_id,))
             # Merge and return
             return {
                 'admin': admin_announcements,
@@ -917,12 +936,8 @@ class StudentModel:
 
     @staticmethod
     def add_fee_record(student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, due_date):
-        """Add a fee record and update student's fee balance"""
-        res = DepartmentModel.add_fee_record(student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, due_date)
-        if res:
-            StudentModel.compute_and_update_fee_for_semester(student_id, semester)
-            return True
-        return False
+        """Add a fee record; the ledger entries also update the student's fee balance"""
+        return DepartmentModel.add_fee_record(student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, due_date)
 
     @staticmethod
     def get_all_fee_details():
@@ -951,13 +966,9 @@ class StudentModel:
             with transaction() as (conn, cursor):
                 cursor.execute("INSERT INTO enrollments (student_id, section_id, enrollment_date, status) VALUES (%s, %s, %s, 'enrolled')", (student_id, section_id, enrollment_date or datetime.date.today()))
                 enrollment_id = cursor.lastrowid
-                # fetch semester for this section
-                cursor.execute("SELECT semester FROM course_sections WHERE section_id = %s", (section_id,))
-                sec = cursor.fetchone()
-                semester = sec['semester'] if sec else None
-            if semester:
-                # update fee record for that semester
-                StudentModel.compute_and_update_fee_for_semester(student_id, semester)
+                ledger.charge_enrollment(cursor, student_id, section_id, enrollment_id)
+            versions.bump('enrollments', 'fee_details', 'students', versions.section(section_id), versions.student(student_id))
+            events.publish_seats(section_id)
             return True
         except Exception as e:
             print(f"Enroll error: {e}")
@@ -975,11 +986,9 @@ class StudentModel:
                 student_id = row['student_id']
                 section_id = row['section_id']
                 cursor.execute("UPDATE enrollments SET status = 'dropped' WHERE enrollment_id = %s", (enrollment_id,))
-                cursor.execute("SELECT semester FROM course_sections WHERE section_id = %s", (section_id,))
-                sec = cursor.fetchone()
-                semester = sec['semester'] if sec else None
-            if semester:
-                StudentModel.compute_and_update_fee_for_semester(student_id, semester)
+                ledger.credit_enrollment(cursor, student_id, section_id, enrollment_id)
+            versions.bump('enrollments', 'fee_details', 'students', versions.section(section_id), versions.student(student_id))
+            events.publish_seats(section_id)
             return True
         except Exception as e:
             print(f"Drop enrollment error: {e}")
@@ -987,7 +996,11 @@ class StudentModel:
 
     @staticmethod
     def compute_and_update_fee_for_semester(student_id, semester, year=None):
-        """Compute tuition based on enrollments and update fee_details and student's fee_balance"""
+        """
+        Full recomputation of a semester's tuition from the enrollments; the
+        difference to the recorded tuition is posted as one ledger correction.
+        Enroll/drop/payments keep the totals current on their own (app/database/ledger.py).
+        """
         try:
             with transaction() as (conn, cursor):
                 # compute tuition_fee from enrolled courses
@@ -1002,26 +1015,16 @@ class StudentModel:
                 """
                 cursor.execute(query, args)
                 row = cursor.fetchone()
-                tuition_fee = float(row['tuition']) if row and row['tuition'] is not None else 0.00
+                tuition_fee = row['tuition'] if row and row['tuition'] is not None else 0
 
                 # find fee_details record for this student & semester
-                cursor.execute("SELECT fee_id, tuition_fee, lab_fee, miscellaneous_fee, amount_paid FROM fee_details WHERE student_id = %s AND semester = %s FOR UPDATE", (student_id, semester))
+                cursor.execute("SELECT fee_id, tuition_fee FROM fee_details WHERE student_id = %s AND semester = %s ORDER BY fee_id LIMIT 1 FOR UPDATE", (student_id, semester))
                 fd = cursor.fetchone()
-                if fd:
-                    lab_fee = fd.get('lab_fee', 0.00) or 0.00
-                    misc = fd.get('miscellaneous_fee', 0.00) or 0.00
-                    amount_due = tuition_fee + lab_fee + misc
-                    cursor.execute("UPDATE fee_details SET tuition_fee = %s, amount_due = %s WHERE fee_id = %s", (tuition_fee, amount_due, fd['fee_id']))
-                else:
-                    # Insert new fee_details record with computed tuition
-                    amount_due = tuition_fee
-                    cursor.execute("INSERT INTO fee_details (student_id, semester, tuition_fee, lab_fee, miscellaneous_fee, amount_due, status) VALUES (%s, %s, %s, 0.00, 0.00, %s, 'pending')", (student_id, semester, tuition_fee, amount_due))
-
-                # compute total outstanding by subtracting amount_paid
-                cursor.execute("SELECT IFNULL(SUM(amount_due - amount_paid), 0) as balance FROM fee_details WHERE student_id = %s", (student_id,))
-                total_row = cursor.fetchone()
-                balance = float(total_row['balance']) if total_row and total_row['balance'] is not None else 0.00
-                cursor.execute("UPDATE students SET fee_balance = %s WHERE student_id = %s", (balance, student_id))
+                difference = tuition_fee - ((fd['tuition_fee'] or 0) if fd else 0)
+                if difference or not fd:
+                    ledger.post(cursor, student_id, semester, 'charge' if difference >= 0 else 'credit', abs(difference),
+                                fee_id=fd['fee_id'] if fd else None, memo='tuition recomputation')
+            versions.bump('fee_details', 'students', versions.student(student_id))
             return True
         except Exception as e:
             print(f"Compute and update fee error: {e}")
@@ -1040,6 +1043,7 @@ class StudentModel:
             else:
                 query = "INSERT INTO transcript (student_id, course_code, course_name, credits, semester, final_grade, grade_points) VALUES (%s, %s, %s, %s, %s, %s, %s)"
                 execute_query(query, (student_id, course_code, course_name, credits, semester, final_grade, grade_points), fetch=False)
+            versions.bump(versions.student(student_id))
             return True
         except Exception as e:
             print(f"Update transcript error: {e}")
@@ -1080,12 +1084,8 @@ class FacultyModel:
                 cursor.execute("INSERT INTO faculty (user_id, faculty_code, first_name, last_name, department_id, phone, hire_date, status, salary, email) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0.00, %s)",
                                (user_id, faculty_code, first_name, last_name, department_id, phone, hire_date or datetime.date.today(), status, email))
                 faculty_id = cursor.lastrowid
-                # Recompute implemented salary if any sections were pre-assigned
-                try:
-                    FacultyModel.compute_and_update_salary(faculty_id)
-                except Exception:
-                    pass
-                return faculty_id
+            versions.bump('users', 'faculty')
+            return faculty_id
         except Exception as e:
             print(f"Create faculty error: {e}")
             return None
@@ -1093,16 +1093,7 @@ class FacultyModel:
     @staticmethod
     def compute_and_update_salary(faculty_id):
         """Compute salary based on currently active sections assigned and set in faculty table"""
-        try:
-            with transaction() as (conn, cursor):
-                cursor.execute("SELECT IFNULL(SUM(c.credits * c.fee_per_credit), 0) as salary FROM course_sections cs JOIN courses c ON cs.course_id = c.course_id WHERE cs.faculty_id = %s AND cs.is_active = TRUE", (faculty_id,))
-                row = cursor.fetchone()
-                salary = float(row['salary']) if row and row['salary'] is not None else 0.00
-                cursor.execute("UPDATE faculty SET salary = %s WHERE faculty_id = %s", (salary, faculty_id))
-            return True
-        except Exception as e:
-            print(f"Compute and update salary error: {e}")
-            return False
+        return salaries.recompute(faculty_ids=[faculty_id]) is not None
 
     @staticmethod
     def apply_for_leave(faculty_id, leave_date, reason):
@@ -1127,15 +1118,16 @@ class FacultyModel:
         """
         return execute_query(query, (faculty_id,))
 
+    TEACHING_COURSES_SQL = """
+        SELECT cs.section_id, cs.section_code, cs.semester, cs.year, cs.schedule, cs.room, cs.max_capacity, c.course_code, c.course_name, c.credits
+        FROM course_sections cs
+        JOIN courses c ON cs.course_id = c.course_id
+        WHERE cs.faculty_id = %s
+    """
+
     @staticmethod
     def get_teaching_courses(faculty_id):
-        query = """
-            SELECT cs.section_id, cs.section_code, cs.semester, cs.year, cs.schedule, cs.room, cs.max_capacity, c.course_code, c.course_name, c.credits
-            FROM course_sections cs
-            JOIN courses c ON cs.course_id = c.course_id
-            WHERE cs.faculty_id = %s
-        """
-        return execute_query(query, (faculty_id,))
+        return execute_query(FacultyModel.TEACHING_COURSES_SQL, (faculty_id,))
 
     @staticmethod
     def get_course_students(section_id):
@@ -1150,6 +1142,8 @@ class FacultyModel:
 
     @staticmethod
     def get_course_attendance(section_id, date=None):
+        if date and attendance_store.reads_bitmaps():
+            return attendance_store.section_day(section_id, date)
         if date:
             query = """
                 SELECT s.student_id, s.student_code, s.first_name, s.last_name, a.attendance_id, a.status, a.attendance_date
@@ -1160,31 +1154,28 @@ class FacultyModel:
                 ORDER BY s.first_name, s.last_name
             """
             return execute_query(query, (section_id, date, section_id))
-        else:
-            query = """
-                SELECT s.student_id, s.student_code, s.first_name, s.last_name, COUNT(a.attendance_id) as total_classes,
-                    SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present_count
-                FROM enrollments e
-                JOIN students s ON e.student_id = s.student_id
-                LEFT JOIN attendance a ON a.student_id = e.student_id AND a.section_id = %s
-                WHERE e.section_id = %s AND e.status = 'enrolled'
-                GROUP BY s.student_id
-            """
-            return execute_query(query, (section_id, section_id))
+        # per-student totals from the rollups, one key lookup per enrolled student
+        return execute_query(attendance_rollups.SECTION_SUMMARY_SQL, (section_id,))
+
+    @staticmethod
+    def get_attendance_grid(section_id, date_from=None, date_to=None, encoding='string'):
+        """Roster x date attendance sheet of a section in one query (see attendance_store.grid)"""
+        return attendance_store.grid(section_id, date_from or datetime.date.min, date_to or datetime.date.max, encoding)
+
+    OWN_ANNOUNCEMENTS_SQL = """
+        SELECT a.announcement_id, a.faculty_id, a.section_id, a.title, a.message, a.created_at,
+               cs.section_code, c.course_code, c.course_name
+        FROM announcements a
+        LEFT JOIN course_sections cs ON a.section_id = cs.section_id
+        LEFT JOIN courses c ON cs.course_id = c.course_id
+        WHERE a.faculty_id = %s
+        ORDER BY a.created_at DESC
+    """
 
     @staticmethod
     def get_faculty_announcements(faculty_id):
         """Get announcements created by a faculty member (with section & course info)"""
-        query = """
-            SELECT a.announcement_id, a.faculty_id, a.section_id, a.title, a.message, a.created_at,
-                   cs.section_code, c.course_code, c.course_name
-            FROM announcements a
-            LEFT JOIN course_sections cs ON a.section_id = cs.section_id
-            LEFT JOIN courses c ON cs.course_id = c.course_id
-            WHERE a.faculty_id = %s
-            ORDER BY a.created_at DESC
-        """
-        return execute_query(query, (faculty_id,))
+        return execute_query(FacultyModel.OWN_ANNOUNCEMENTS_SQL, (faculty_id,))
 
     @staticmethod
     def create_announcement(faculty_id, section_id, title, message):
@@ -1192,11 +1183,27 @@ class FacultyModel:
         query = "INSERT INTO announcements (faculty_id, section_id, title, message) VALUES (%s, %s, %s, %s)"
         try:
             execute_query(query, (faculty_id, section_id, title, message), fetch=False)
+            versions.bump('announcements', versions.section(section_id))
+            events.publish('announcements', {'scope': 'section', 'section_id': int(section_id), 'title': title})
             return True
         except Exception as e:
             print(f"Create faculty announcement error: {e}")
             return False
 
+    @staticmethod
+    def delete_announcement(faculty_id, announcement_id):
+        """Delete one of the faculty member's own announcements"""
+        try:
+            rows = execute_query("SELECT section_id FROM announcements WHERE announcement_id = %s AND faculty_id = %s", (announcement_id, faculty_id))
+            if not rows:
+                return False
+            execute_query("DELETE FROM announcements WHERE announcement_id = %s AND faculty_id = %s", (announcement_id, faculty_id), fetch=False)
+            versions.bump('announcements', versions.section(rows[0]['section_id']))
+            return True
+        except Exception as e:
+            print(f"Delete faculty announcement error: {e}")
+            return False
+
     @staticmethod
     def get_all_faculty_for_admin():
         """Return all faculty rows for admin management"""
@@ -1233,27 +1240,27 @@ class FacultyModel:
         query = f"UPDATE faculty SET {set_clause} WHERE faculty_id = %s"
         try:
             execute_query(query, values, fetch=False)
-            # recompute salary to keep things consistent (salary depends on assignments & fee_per_credit)
-            try:
-                FacultyModel.compute_and_update_salary(faculty_id)
-            except Exception:
-                pass
+            versions.bump('faculty')
+            # salary is derived from the teaching load; a manual value does not stick
+            if 'salary' in update_data:
+                salaries.touch(faculty_ids=[faculty_id])
             return True
         except Exception as e:
             print(f"Update faculty error: {e}")
             return False
 
+    PROFILE_SQL = """
+        SELECT f.*, d.dept_name, u.email, u.username
+        FROM faculty f
+        LEFT JOIN departments d ON f.department_id = d.dept_id
+        LEFT JOIN users u ON f.user_id = u.user_id
+        WHERE f.user_id = %s
+    """
+
     @staticmethod
     def get_faculty_by_user_id(user_id):
         """Return faculty by user_id"""
-        query = """
-            SELECT f.*, d.dept_name, u.email, u.username
-            FROM faculty f
-            LEFT JOIN departments d ON f.department_id = d.dept_id
-            LEFT JOIN users u ON f.user_id = u.user_id
-            WHERE f.user_id = %s
-        """
-        res = execute_query(query, (user_id,))
+        res = execute_query(FacultyModel.PROFILE_SQL, (user_id,))
         return res[0] if res else None
 
     @staticmethod
@@ -1268,14 +1275,8 @@ class FacultyModel:
 
     @staticmethod
     def mark_attendance(student_id, section_id, date, status):
-        query = """
-            INSERT INTO attendance (student_id, section_id, attendance_date, status)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE status = %s
-        """
         try:
-            execute_query(query, (student_id, section_id, date, status, status), fetch=False)
-            return True
+            return attendance_store.mark(student_id, section_id, date, status)
         except Exception as e:
             print(f"Mark attendance error: {e}")
             return False
@@ -1283,18 +1284,8 @@ class FacultyModel:
     @staticmethod
     def mark_multiple_attendance(attendance_data):
         try:
-            for record in attendance_data:
-                student_id = record['student_id']
-                section_id = record['section_id']
-                date = record['date']
-                status = record['status']
-                query = """
-                    INSERT INTO attendance (student_id, section_id, attendance_date, status)
-                    VALUES (%s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE status = %s
-                """
-                execute_query(query, (student_id, section_id, date, status, status), fetch=False)
-            return True
+            # one transaction for the whole batch
+            return attendance_store.mark_many(attendance_data)
         except Exception as e:
             print(f"Mark multiple attendance error: {e}")
             return False
@@ -1355,7 +1346,7 @@ class FacultyModel:
                 final_grade, grade_points = 'F', 0.0
 
             course_query = """
-                SELECT c.course_code, c.course_name, c.credits, cs.semester, e.student_id
+                SELECT c.course_code, c.course_name, c.credits, cs.semester, e.student_id, e.section_id
                 FROM enrollments e
                 JOIN course_sections cs ON e.section_id = cs.section_id
                 JOIN courses c ON cs.course_id = c.course_id
@@ -1373,6 +1364,7 @@ class FacultyModel:
                     final_grade,
                     grade_points
                 )
+                versions.bump(versions.marks(course['section_id']))
             return True
         except Exception as e:
             print(f"Marks upload error: {e}")
@@ -0,0 +1,107 @@
+"""
+Monitoring routes and request instrumentation (/metrics, slow query log)
+"""
+import os
+import time
+
+from flask import Blueprint, Response, g, request, jsonify
+
+from app import metrics
+from app.database import slow_queries
+from .auth import token_required
+
+monitoring = Blueprint('monitoring', __name__)
+
+# Static bearer token for the scraper; without one /metrics only answers local
+# scrapes (loopback, not relayed by a proxy)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+_LOOPBACK = ('127.0.0.1', '::1')
+
+
+def _metrics_allowed():
+    if METRICS_TOKEN:
+        return request.headers.get('Authorization') == f'Bearer {METRICS_TOKEN}'
+    return request.remote_addr in _LOOPBACK and 'X-Forwarded-For' not in request.headers
+
+
+def _route_labels():
+    """Label a request by blueprint and route template (bounded cardinality)"""
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    return request.blueprint or 'app', rule
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is not None:
+        blueprint, endpoint = _route_labels()
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, blueprint=blueprint, endpoint=endpoint)
+        metrics.HTTP_REQUESTS.inc(blueprint=blueprint, endpoint=endpoint, method=request.method, status=response.status_code)
+        if response.status_code >= 500:
+            metrics.HTTP_ERRORS.inc(blueprint=blueprint, endpoint=endpoint)
+        metrics.REGISTRY.flush()
+    return response
+
+
+def _teardown_request(exc):
+    # after_request is skipped for unhandled exceptions; count them here
+    start = g.pop('_metrics_start', None)
+    if exc is not None and start is not None:
+        blueprint, endpoint = _route_labels()
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, blueprint=blueprint, endpoint=endpoint)
+        metrics.HTTP_REQUESTS.inc(blueprint=blueprint, endpoint=endpoint, method=request.method, status=500)
+        metrics.HTTP_ERRORS.inc(blueprint=blueprint, endpoint=endpoint)
+
+
+def init_app(app):
+    """Register request timing hooks and the /metrics blueprint"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.register_blueprint(monitoring, url_prefix='/')
+
+
+@monitoring.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    if not _metrics_allowed():
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@monitoring.route('/api/admin/slow-queries', methods=['GET'])
+@token_required
+def get_slow_queries(current_user):
+    """Slow statements of this worker: ?view=summary (default) or ?view=recent&limit=50"""
+    if current_user['role'] != 'admin':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        view = request.args.get('view', 'summary')
+        if view == 'recent':
+            limit = request.args.get('limit', 50, type=int)
+            data = slow_queries.get_entries(limit)
+        else:
+            data = slow_queries.get_summary()
+        return jsonify({
+            'success': True,
+            'data': {
+                'threshold_ms': slow_queries.SLOW_QUERY_MS,
+                'pid': os.getpid(),
+                'queries': data
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
+@monitoring.route('/api/admin/slow-queries', methods=['DELETE'])
+@token_required
+def clear_slow_queries(current_user):
+    """Empty the slow query buffer (and captured plans) of this worker"""
+    if current_user['role'] != 'admin':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    slow_queries.clear()
+    return jsonify({'success': True, 'message': 'Slow query log cleared'}), 200
@@ -2,13 +2,59 @@
 COMPLETE VIEWS.PY - ALL ROUTES FIXED
 """
 
+import datetime
+
 from flask import Blueprint, request, jsonify
 from .models import StudentModel,UserModel, CourseModel, FacultyModel,AdminModel,DepartmentModel
 from .auth import token_required
-from app.database.connection import execute_query
+from .json_provider import json_exclude
+from .http_cache import etag
+from .announcements import AnnouncementFeed
+from .faculty_dashboard import FacultyDashboard
+from app.database.connection import execute_query, transaction
+from app.database import versions, events, ledger, payments, salaries, attendance_risk
 
 views = Blueprint('views', __name__)
 
+
+# Dashboard payload helpers, shared with the async routes in async_views.py
+def student_profile(student):
+    return {
+        'name': f"{student['first_name']} {student['last_name']}",
+        'roll_no': student['student_code'],
+        'department': student['dept_name'],
+        'year': f"{student['current_semester']} Semester",
+        'email': student['email'],
+        'phone': student['phone'],
+        'status': student['status']
+    }
+
+
+def faculty_profile(faculty):
+    return {
+        'name': f"{faculty['first_name']} {faculty['last_name']}",
+        'employee_id': faculty['faculty_code'],
+        'department': faculty['dept_name'],
+        'email': faculty['email'],
+        'phone': faculty['phone'],
+        'status': faculty['status']
+    }
+
+
+def attach_attendance(courses, attendance):
+    """Add attendance_left / attendance_percentage to each enrolled course"""
+    for course in courses:
+        att = next((a for a in attendance if a['course_code'] == course['course_code']), None)
+        if att:
+            leaves_left = attendance_risk.allowed_absences(att['total_classes'], att['present'])
+            course['attendance_left'] = max(0, leaves_left)
+            course['attendance_percentage'] = att['attendance_percentage']
+        else:
+            course['attendance_left'] = 0
+            course['attendance_percentage'] = 0
+    return courses
+
+
 # ==================== STUDENT ROUTES ====================
 
 @views.route('/api/student/dashboard', methods=['GET'])
@@ -33,37 +79,18 @@ def get_student_dashboard(current_user):
         attendance = StudentModel.get_attendance_summary(student_id)
         
         # Add attendance info to courses
-        for course in courses:
-            att = next((a for a in attendance if a['course_code'] == course['course_code']), None)
-            if att:
-                total = att['total_classes']
-                present = att['present']
-                min_required = total * 0.75
-                leaves_left = int(float(present) - min_required)
-                course['attendance_left'] = max(0, leaves_left)
-                course['attendance_percentage'] = att['attendance_percentage']
-            else:
-                course['attendance_left'] = 0
-                course['attendance_percentage'] = 0
+        attach_attendance(courses, attendance)
         
         # compute CGPA (use transcript when available, fallback to student_grades view)
         cgpa = StudentModel.compute_current_gpa(student_id)
 
         # get announcements for this student (admin + faculty)
-        announcements = StudentModel.get_student_announcements(student_id)
+        announcements = AnnouncementFeed.for_student(student_id)
 
         return jsonify({
             'success': True,
             'data': {
-                'student': {
-                    'name': f"{student['first_name']} {student['last_name']}",
-                    'roll_no': student['student_code'],
-                    'department': student['dept_name'],
-                    'year': f"{student['current_semester']} Semester",
-                    'email': student['email'],
-                    'phone': student['phone'],
-                    'status': student['status']
-                },
+                'student': student_profile(student),
                 'enrolled_courses': courses,
                 'announcements': announcements
             }
@@ -95,7 +122,8 @@ def get_student_transcript(current_user):
         # Calculate CGPA (prefer transcript; fallback):
         cgpa = StudentModel.compute_current_gpa(student_id)
         
-        # Group by semester
+        # Group by semester (all SGPAs in one query)
+        sgpas = StudentModel.get_semester_gpas(student_id)
         semesters = {}
         for record in transcript:
             sem = record['semester']
@@ -103,7 +131,7 @@ def get_student_transcript(current_user):
                 semesters[sem] = {
                     'semester': sem,
                     'courses': [],
-                    'sgpa': StudentModel.calculate_gpa(student_id, sem)
+                    'sgpa': sgpas.get(sem, 0.0)
                 }
             semesters[sem]['courses'].append(record)
         
@@ -197,6 +225,21 @@ def get_student_attendance(current_user):
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 
+@views.route('/api/student/attendance/risk', methods=['GET'])
+@token_required
+def get_student_attendance_risk(current_user):
+    """Allowed absences and shortage status per course, as of the last attendance_risk run"""
+    if current_user['role'] != 'student':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        student = StudentModel.get_student_by_user_id(current_user['user_id'])
+        if not student:
+            return jsonify({'success': False, 'message': 'Student not found'}), 404
+        return jsonify({'success': True, 'data': {'courses': attendance_risk.for_student(student['student_id'])}}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
 @views.route('/api/student/fees', methods=['GET'])
 @token_required
 def get_student_fees(current_user):
@@ -261,7 +304,7 @@ def get_student_announcements_route(current_user):
         student = StudentModel.get_student_by_user_id(current_user['user_id'])
         if not student:
             return jsonify({'success': False, 'message': 'Student not found'}), 404
-        ann = StudentModel.get_student_announcements(student['student_id'])
+        ann = AnnouncementFeed.for_student(student['student_id'])
         return jsonify({'success': True, 'data': {'announcements': ann}}), 200
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
@@ -342,27 +385,16 @@ def get_faculty_dashboard(current_user):
         
         faculty_id = faculty['faculty_id']  # Use this instead of current_user.get('faculty_id')
         
-        # Get teaching courses
-        courses = FacultyModel.get_teaching_courses(faculty_id)
-        
-        admin_announcements = AdminModel.get_all_announcements()
+        # active sections with live counts, pending work and announcements (cached per faculty)
+        dashboard = FacultyDashboard.load(faculty_id)
 
         return jsonify({
             'success': True,
             'data': {
-                'faculty': {
-                    'name': f"{faculty['first_name']} {faculty['last_name']}",
-                    'employee_id': faculty['faculty_code'],
-                    'department': faculty['dept_name'],
-                    'email': faculty['email'],
-                    'phone': faculty['phone'],
-                    'status': faculty['status']
-                },
-                'teaching_courses': courses,
-                'announcements': {
-                    'admin': admin_announcements,
-                    'faculty': FacultyModel.get_faculty_announcements(faculty_id)
-                }
+                'faculty': faculty_profile(faculty),
+                'teaching_courses': dashboard['teaching_courses'],
+                'pending': dashboard['pending'],
+                'announcements': dashboard['announcements']
             }
         }), 200
         
@@ -436,7 +468,7 @@ def get_faculty_announcements_route(current_user):
         faculty = FacultyModel.get_faculty_by_user_id(current_user['user_id'])
         if not faculty:
             return jsonify({'success': False, 'message': 'Faculty not found'}), 404
-        announcements = FacultyModel.get_faculty_announcements(faculty['faculty_id'])
+        announcements = AnnouncementFeed.for_faculty(faculty['faculty_id'])
         return jsonify({'success': True, 'data': {'announcements': announcements}}), 200
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
@@ -466,6 +498,48 @@ def create_faculty_announcement_route(current_user):
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
+
+@views.route('/api/faculty/announcements/<int:announcement_id>', methods=['DELETE'])
+@token_required
+def delete_faculty_announcement_route(current_user, announcement_id):
+    """Faculty delete one of their own announcements"""
+    if current_user['role'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        faculty = FacultyModel.get_faculty_by_user_id(current_user['user_id'])
+        if not faculty:
+            return jsonify({'success': False, 'message': 'Faculty profile not found'}), 404
+        if FacultyModel.delete_announcement(faculty['faculty_id'], announcement_id):
+            return jsonify({'success': True, 'message': 'Announcement deleted successfully'}), 200
+        return jsonify({'success': False, 'message': 'Announcement not found'}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
+@views.route('/api/announcements/history', methods=['GET'])
+@token_required
+def get_announcement_history(current_user):
+    """Paginated announcements: ?section_id=<id> for a section, admin ones otherwise; ?cursor=&limit="""
+    try:
+        section_id = request.args.get('section_id', type=int)
+        if section_id is not None and current_user['role'] != 'admin':
+            # students see sections they are enrolled in, faculty the ones they teach
+            if current_user['role'] == 'student':
+                student = StudentModel.get_student_by_user_id(current_user['user_id'])
+                allowed = student and section_id in AnnouncementFeed.student_section_ids(student['student_id'])
+            else:
+                faculty = FacultyModel.get_faculty_by_user_id(current_user['user_id'])
+                allowed = faculty and execute_query("SELECT 1 FROM course_sections WHERE section_id = %s AND faculty_id = %s", (section_id, faculty['faculty_id']))
+            if not allowed:
+                return jsonify({'success': False, 'message': 'Access denied'}), 403
+        try:
+            rows, next_cursor = AnnouncementFeed.history(section_id, request.args.get('cursor'), request.args.get('limit', 20, type=int))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        return jsonify({'success': True, 'data': {'announcements': rows, 'next_cursor': next_cursor}}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
 @views.route('/api/faculty/courses/<int:section_id>/students', methods=['GET'])
 @token_required
 def get_course_students(current_user, section_id):
@@ -511,6 +585,39 @@ def get_course_attendance(current_user, section_id):
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 
+@views.route('/api/faculty/courses/<int:section_id>/attendance/grid', methods=['GET'])
+@token_required
+@etag(lambda current_user, section_id: versions.token(versions.attendance(section_id), versions.section(section_id), 'students'))
+def get_course_attendance_grid(current_user, section_id):
+    """Attendance sheet for a date range: one status string per student (?from=&to=YYYY-MM-DD, ?encoding=rle)"""
+    if current_user['role'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        encoding = request.args.get('encoding', 'string')
+        if encoding not in ('string', 'rle'):
+            return jsonify({'success': False, 'message': 'encoding must be string or rle'}), 400
+        try:
+            date_from = datetime.date.fromisoformat(date_from) if date_from else None
+            date_to = datetime.date.fromisoformat(date_to) if date_to else None
+        except ValueError:
+            return jsonify({'success': False, 'message': 'from/to must be YYYY-MM-DD'}), 400
+        dates, students = FacultyModel.get_attendance_grid(section_id, date_from, date_to, encoding)
+        return jsonify({
+            'success': True,
+            'data': {
+                'section_id': section_id,
+                'dates': dates,
+                'codes': {'P': 'present', 'A': 'absent', '-': 'not marked'},
+                'encoding': encoding,
+                'students': students
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
 @views.route('/api/faculty/attendance/mark', methods=['POST'])
 @token_required
 def mark_attendance(current_user):
@@ -596,6 +703,7 @@ def upload_marks(current_user):
 
 @views.route('/api/courses/available', methods=['GET'])
 @token_required
+@etag(lambda current_user: versions.token('courses', 'course_sections', 'enrollments'))
 def get_available_courses(current_user):
     """Get Available Courses for Registration"""
     try:
@@ -755,6 +863,8 @@ def get_admin_dashboard(current_user):
 
 @views.route('/api/admin/users', methods=['GET'])
 @token_required
+@json_exclude('password_hash')
+@etag(lambda current_user: versions.token('users', 'students', 'faculty'))
 def get_all_users(current_user):
     """Get all users for admin"""
     if current_user['role'] != 'admin':
@@ -796,6 +906,7 @@ def delete_user(current_user, user_id):
         
         delete_query = "DELETE FROM users WHERE user_id = %s"
         execute_query(delete_query, (user_id,), fetch=False)
+        versions.bump_all()  # cascades into profiles, sections, enrollments, fees
         
         return jsonify({
             'success': True,
@@ -821,6 +932,7 @@ def toggle_user_status(current_user, user_id):
         new_status = not current_status
         update_query = "UPDATE users SET is_active = %s WHERE user_id = %s"
         execute_query(update_query, (new_status, user_id), fetch=False)
+        versions.bump('users')
         
         return jsonify({
             'success': True,
@@ -835,6 +947,7 @@ def toggle_user_status(current_user, user_id):
 
 @views.route('/api/admin/fees', methods=['GET'])
 @token_required
+@etag(lambda current_user: versions.token('fee_details', 'students'))
 def get_all_fees(current_user):
     """Get all fee details for admin"""
     if current_user['role'] != 'admin':
@@ -893,11 +1006,11 @@ def add_fee_record(current_user):
         if not all([student_id, semester, amount_due, due_date]):
             return jsonify({'success': False, 'message': 'All fields are required'}), 400
         
-        query = """
-            INSERT INTO fee_details (student_id, semester, amount_due, due_date, status)
-            VALUES (%s, %s, %s, %s, 'pending')
-        """
-        execute_query(query, (student_id, semester, amount_due, due_date), fetch=False)
+        # amount without a breakdown: moves amount_due (and the balance) only
+        with transaction() as (conn, cursor):
+            ledger.post(cursor, student_id, semester, 'charge', amount_due, component=None,
+                        due_date=due_date, memo='fee record')
+        versions.bump('fee_details', 'students', versions.student(student_id))
         
         return jsonify({
             'success': True,
@@ -1034,12 +1147,8 @@ def mark_faculty_attendance(current_user):
         if not all([faculty_id, date, session, status]):
             return jsonify({'success': False, 'message': 'All fields are required'}), 400
         
-        query = """
-            INSERT INTO faculty_attendance (faculty_id, attendance_date, session, status, marked_by)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE status = %s, marked_by = %s
-        """
-        execute_query(query, (faculty_id, date, session, status, current_user['user_id'], status, current_user['user_id']), fetch=False)
+        if not AdminModel.mark_faculty_attendance(faculty_id, date, session, status, current_user['user_id']):
+            return jsonify({'success': False, 'message': 'Failed to mark faculty attendance'}), 500
         
         return jsonify({
             'success': True,
@@ -1066,16 +1175,10 @@ def mark_bulk_faculty_attendance(current_user):
         if not attendance_date or not session:
             return jsonify({'success': False, 'message': 'Date and session are required'}), 400
         
-        for record in attendance_data:
-            faculty_id = record['faculty_id']
-            status = record['status']
-            
-            query = """
-                INSERT INTO faculty_attendance (faculty_id, attendance_date, session, status, marked_by)
-                VALUES (%s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE status = %s, marked_by = %s
-            """
-            execute_query(query, (faculty_id, attendance_date, session, status, current_user['user_id'], status, current_user['user_id']), fetch=False)
+        records = [{'faculty_id': record['faculty_id'], 'date': attendance_date, 'session': session, 'status': record['status']}
+                   for record in attendance_data]
+        if not AdminModel.mark_multiple_faculty_attendance(records, current_user['user_id']):
+            return jsonify({'success': False, 'message': 'Failed to mark faculty attendance'}), 500
         
         return jsonify({
             'success': True,
@@ -1119,7 +1222,7 @@ def get_faculty_attendance(current_user, date):
 def get_admin_announcements(current_user):
     """Get all admin announcements"""
     try:
-        announcements = AdminModel.get_all_announcements()
+        announcements = AnnouncementFeed.admin()
         
         return jsonify({
             'success': True,
@@ -1167,6 +1270,7 @@ def delete_admin_announcement(current_user, announcement_id):
     try:
         query = "DELETE FROM admin_announcements WHERE announcement_id = %s"
         execute_query(query, (announcement_id,), fetch=False)
+        versions.bump('admin_announcements')
         
         return jsonify({
             'success': True,
@@ -1243,6 +1347,24 @@ def create_course_admin(current_user):
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 
+@views.route('/api/admin/courses/<int:course_id>', methods=['PUT'])
+@token_required
+def update_course_admin(current_user, course_id):
+    """Update a course (Admin only); a new credits/fee_per_credit recomputes its teachers' salaries"""
+    if current_user['role'] != 'admin':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        data = request.get_json() or {}
+        fields = {k: v for k, v in data.items() if k in CourseModel.UPDATABLE_COLUMNS}
+        success = CourseModel.update_course(course_id, **fields)
+        if success:
+            return jsonify({'success': True, 'message': 'Course updated successfully'}), 200
+        else:
+            return jsonify({'success': False, 'message': 'Failed to update course'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
 @views.route('/api/admin/course_sections', methods=['GET'])
 @token_required
 def get_all_course_sections_admin(current_user):
@@ -1281,6 +1403,34 @@ def create_course_section_admin(current_user):
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 
+@views.route('/api/admin/course_sections/bulk', methods=['POST'])
+@token_required
+def create_course_sections_bulk_admin(current_user):
+    """Create many sections at once (term setup); salaries are recomputed once at the end"""
+    if current_user['role'] != 'admin':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        data = request.get_json() or {}
+        sections = data.get('sections') or []
+        required = ('course_id', 'faculty_id', 'section_code', 'semester', 'year')
+        created, failed = 0, []
+        with salaries.deferred():
+            for i, section in enumerate(sections):
+                if not all(section.get(key) for key in required):
+                    failed.append({'index': i, 'message': 'Missing required fields'})
+                    continue
+                success = AdminModel.create_course_section(
+                    section['course_id'], section['faculty_id'], section['section_code'], section['semester'],
+                    section['year'], section.get('schedule'), section.get('room'), section.get('max_capacity', 30))
+                if success:
+                    created += 1
+                else:
+                    failed.append({'index': i, 'message': 'Failed to create course section'})
+        return jsonify({'success': not failed, 'data': {'created': created, 'failed': failed}}), 200 if created or not failed else 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
 @views.route('/api/admin/course_sections/<int:section_id>', methods=['PUT'])
 @token_required
 def update_course_section_admin(current_user, section_id):
@@ -1833,6 +1983,7 @@ def delete_student_admin(current_user, student_id):
         # Delete user (cascade delete will handle student record)
         delete_query = "DELETE FROM users WHERE user_id = %s"
         execute_query(delete_query, (student['user_id'],), fetch=False)
+        versions.bump_all()
         
         return jsonify({
             'success': True,
@@ -2100,6 +2251,7 @@ def delete_faculty_admin(current_user, faculty_id):
         # Delete user (cascade delete will handle faculty record)
         delete_query = "DELETE FROM users WHERE user_id = %s"
         execute_query(delete_query, (faculty['user_id'],), fetch=False)
+        versions.bump_all()
         
         return jsonify({
             'success': True,
@@ -2190,6 +2342,7 @@ def change_faculty_password(current_user, faculty_id):
         # Delete user (cascade delete will handle faculty record)
         delete_query = "DELETE FROM users WHERE user_id = %s"
         execute_query(delete_query, (faculty['user_id'],), fetch=False)
+        versions.bump_all()
         
         return jsonify({
             'success': True,
@@ -2372,6 +2525,53 @@ def add_fee_record_admin(current_user):
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
+@views.route('/api/admin/attendance/at-risk', methods=['GET'])
+@token_required
+@etag(lambda current_user: versions.token('attendance_risk'))
+def get_attendance_at_risk(current_user):
+    """Enrollments short of attendance or close to it (?department_id=&status=short,warning&limit=&offset=)"""
+    if current_user['role'] != 'admin':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+    try:
+        department_id = request.args.get('department_id', type=int)
+        statuses = (request.args.get('status') or 'short,warning').split(',')
+        try:
+            limit = max(1, min(int(request.args.get('limit', 100)), attendance_risk.REPORT_PAGE_MAX))
+            offset = max(0, int(request.args.get('offset', 0)))
+        except ValueError:
+            return jsonify({'success': False, 'message': 'limit and offset must be integers'}), 400
+        rows = attendance_risk.report(department_id, statuses, limit, offset)
+        return jsonify({'success': True, 'data': {'enrollments': rows, 'limit': limit, 'offset': offset}}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+
+@views.route('/api/admin/fees/import', methods=['POST'])
+@token_required
+def import_fee_payments(current_user):
+    """Apply a bank statement CSV (multipart 'file' or a text/csv body); ?dry_run=1 only reports"""
+    if current_user['role'] != 'admin':
+        return jsonify({'success': False, 'message': 'Access denied'}), 403
+
+    try:
+        upload = request.files.get('file')
+        raw = upload.read() if upload else request.get_data()
+        if not raw:
+            return jsonify({'success': False, 'message': 'CSV file is required'}), 400
+        try:
+            text = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            return jsonify({'success': False, 'message': 'CSV must be UTF-8 encoded'}), 400
+
+        dry_run = request.args.get('dry_run') in ('1', 'true')
+        report = payments.import_payments(text, dry_run=dry_run, log=lambda *a: None)
+        return jsonify({'success': True, 'dry_run': dry_run, 'data': report}), 200
+
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
 # New route to get fee breakdown
 @views.route('/api/admin/fees/breakdown', methods=['GET'])
 @token_required
@@ -2405,10 +2605,10 @@ def get_all_students_courses_admin(current_user):
         # Get all students
         students = StudentModel.get_all_students_for_admin()
         
-        # Add course enrollments for each student
+        # Attach course enrollments (one query for all students)
+        enrollments = CourseModel.get_enrollments_by_student()
         for student in students:
-            enrollments = CourseModel.get_student_enrollments(student['student_id'])
-            student['enrollments'] = enrollments
+            student['enrollments'] = enrollments.get(student['student_id'], [])
         
         return jsonify({
             'success': True,
@@ -2452,7 +2652,11 @@ def admin_enroll_student_course(current_user):
             INSERT INTO enrollments (student_id, section_id, enrollment_date, status)
             VALUES (%s, %s, CURDATE(), 'enrolled')
         """
-        execute_query(enroll_query, (student_id, section_id), fetch=False)
+        with transaction() as (conn, cursor):
+            cursor.execute(enroll_query, (student_id, section_id))
+            ledger.charge_enrollment(cursor, student_id, section_id, cursor.lastrowid)
+        versions.bump('enrollments', 'fee_details', 'students', versions.section(section_id), versions.student(student_id))
+        events.publish_seats(section_id)
         
         return jsonify({
             'success': True,
@@ -2477,7 +2681,17 @@ def admin_drop_student_course(current_user):
             return jsonify({'success': False, 'message': 'Enrollment ID is required'}), 400
         
         drop_query = "UPDATE enrollments SET status = 'dropped' WHERE enrollment_id = %s"
-        execute_query(drop_query, (enrollment_id,), fetch=False)
+        with transaction() as (conn, cursor):
+            cursor.execute("SELECT student_id, section_id, status FROM enrollments WHERE enrollment_id = %s FOR UPDATE", (enrollment_id,))
+            enrollment = cursor.fetchall()
+            cursor.execute(drop_query, (enrollment_id,))
+            if enrollment and enrollment[0]['status'] == 'enrolled':
+                ledger.credit_enrollment(cursor, enrollment[0]['student_id'], enrollment[0]['section_id'], enrollment_id)
+        if enrollment:
+            versions.bump('enrollments', 'fee_details', 'students', versions.section(enrollment[0]['section_id']), versions.student(enrollment[0]['student_id']))
+            events.publish_seats(enrollment[0]['section_id'])
+        else:
+            versions.bump('enrollments')
         
         return jsonify({
             'success': True,
@@ -0,0 +1,149 @@
+"""
+Async serving mode: uvicorn asgi:app --workers 4
+(or gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app)
+
+The read endpoints in app/website/async_views.py run natively on the event
+loop with aiomysql and issue their independent queries concurrently.
+Every other route is the regular Flask app behind asgiref's WsgiToAsgi, which
+runs it in a thread pool with the sync models and connection pool.
+The server-sent events stream (/api/events) is served natively as well: an
+open stream is a parked coroutine instead of a blocked worker thread.
+"""
+import os
+import time
+import asyncio
+from urllib.parse import parse_qs
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import metrics
+from app.database import aio
+from app.database.connection import init_db, POOL
+from app.website import create_app, CORS_ORIGINS
+from app.website.auth import decode_token
+from app.website.async_views import ROUTES
+from app.website import events
+from app.database.events import BROKER
+
+flask_app = create_app()
+
+if os.getenv('MIGRATE_ON_START', '1') == '1':
+    with flask_app.app_context():
+        init_db()
+POOL.clear()
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _cors_headers(scope):
+    origin = _header(scope, b'origin')
+    if origin in CORS_ORIGINS:
+        return [(b'access-control-allow-origin', origin.encode('latin-1')),
+                (b'access-control-allow-credentials', b'true'),
+                (b'vary', b'Origin')]
+    return []
+
+
+async def _respond(scope, send, payload, status):
+    body = flask_app.json.dumps(payload).encode('utf-8')
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    headers += _cors_headers(scope)
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _serve(handler, scope, send):
+    start = time.perf_counter()
+    current_user, error = decode_token(_header(scope, b'authorization'))
+    if error:
+        message, error_code = error
+        payload, status = {'success': False, 'message': message, 'error_code': error_code}, 401
+    else:
+        payload, status = await handler(current_user)
+    await _respond(scope, send, payload, status)
+
+    endpoint = scope['path']
+    metrics.HTTP_LATENCY.observe(time.perf_counter() - start, blueprint='async', endpoint=endpoint)
+    metrics.HTTP_REQUESTS.inc(blueprint='async', endpoint=endpoint, method=scope['method'], status=status)
+    if status >= 500:
+        metrics.HTTP_ERRORS.inc(blueprint='async', endpoint=endpoint)
+    metrics.REGISTRY.flush()
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _serve_events(scope, receive, send):
+    """GET /api/events without a thread per client (see app/website/events.py)"""
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    arg = lambda name: query.get(name, [None])[0]
+    sub, error = await aio.run_sync(
+        events.open_stream, _header(scope, b'authorization'), arg('token'), arg('topics'),
+        _header(scope, b'last-event-id') or arg('last_event_id'),
+        lambda: loop.call_soon_threadsafe(ready.set))
+    if error:
+        payload, status = error
+        return await _respond(scope, send, payload, status)
+
+    headers = [(b'content-type', b'text/event-stream; charset=utf-8')]
+    headers += [(k.lower().encode(), v.encode()) for k, v in events.STREAM_HEADERS.items()]
+    headers += _cors_headers(scope)
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': f"retry: {events.EVENT_RETRY_MS}\n\n".encode(), 'more_body': True})
+        deadline = loop.time() + events.EVENT_STREAM_MAX_SECONDS
+        while not disconnected.done() and loop.time() < deadline:
+            timeout = min(events.EVENT_HEARTBEAT, max(deadline - loop.time(), 0))
+            try:
+                await asyncio.wait_for(ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                chunk = events.heartbeat()
+            else:
+                ready.clear()
+                chunk = ''.join(events.format_event(event) for event in sub.drain())
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+        BROKER.unsubscribe(sub)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await aio.close_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] == 'http':
+        if scope['method'] == 'GET' and scope['path'] == '/api/events':
+            return await _serve_events(scope, receive, send)
+        handler = ROUTES.get((scope['method'], scope['path']))
+        if handler is not None:
+            return await _serve(handler, scope, send)
+    return await wsgi_app(scope, receive, send)
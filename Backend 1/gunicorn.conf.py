@@ -0,0 +1,57 @@
+"""
+gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+Worker/thread counts are derived from the machine and the database budget
+unless set explicitly:
+  workers  = GUNICORN_WORKERS or number of CPUs (at least 2)
+  threads  = GUNICORN_THREADS or the per-worker share of DB_MAX_CONNECTIONS, at most 16
+  DB_POOL_SIZE defaults to threads, so a request thread never waits for a connection
+  and workers * DB_POOL_SIZE stays under the server's max_connections.
+
+Reloads: `kill -HUP <master>` re-reads this file and replaces the workers
+gracefully. Because the app is preloaded, new code needs a binary upgrade:
+`kill -USR2 <master>`, then `kill -WINCH` and `kill -QUIT` on the old master.
+"""
+import os
+import multiprocessing
+from dotenv import load_dotenv
+
+# read app/.env before deriving anything: wsgi.py loads it only after this file,
+# and load_dotenv never overrides a variable that is already set
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+worker_class = 'gthread'
+workers = _env_int('GUNICORN_WORKERS', max(2, multiprocessing.cpu_count()))
+
+# keep some connections back for migrations, tools and the mysql client
+_db_budget = max(workers, _env_int('DB_MAX_CONNECTIONS', 150) - _env_int('DB_RESERVED_CONNECTIONS', 10))
+threads = _env_int('GUNICORN_THREADS', max(2, min(16, _db_budget // workers)))
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+
+preload_app = True
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = 5
+# recycle workers now and then; jitter keeps them from restarting together
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 5000)
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # os.register_at_fork already does this; kept explicit for older runtimes
+    from app.database.connection import reset_pool
+    from app import metrics
+    reset_pool()
+    metrics.REGISTRY.reset()
+    server.log.info(f"worker {worker.pid}: {threads} threads, DB pool {os.environ['DB_POOL_SIZE']}")
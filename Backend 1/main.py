@@ -15,11 +15,11 @@ from app.database.connection import init_db
 # Create Flask app instance
 app = create_app()
 
-# Initialize database (creates tables if they don't exist)
+# Bring the schema to head; a no-op (one query) when it already is.
+# Run `python -m app.database.migrate` to migrate ahead of deploys.
 with app.app_context():
-    print(" Initializing database...")
-    init_db()
-    print(" Database ready!")
+    if init_db():
+        print(" Database ready!")
 
 if __name__ == '__main__':
     print("=" * 50)
@@ -29,9 +29,9 @@ if __name__ == '__main__':
     print(" React frontend should run at: http://localhost:5173")
     print("=" * 50)
 
-    # Run the Flask development server
+    # Run the Flask development server (production: gunicorn -c gunicorn.conf.py wsgi:app)
     app.run(
-        debug=True,          # Auto reload
+        debug=os.getenv('FLASK_DEBUG', '1') == '1',  # Auto reload
         host='0.0.0.0',      # Accessible on LAN
         port=5000
     )
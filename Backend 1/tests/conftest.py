@@ -5,3 +5,48 @@ import sys
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
+
+import contextlib
+import pytest
+
+from app.database.connection import track_queries
+
+
+@pytest.fixture
+def query_budget():
+    """Fail when a block runs more SQL statements or opens more connections than allowed
+
+        def test_x(query_budget, client):
+            with query_budget(queries=3, connections=3):
+                client.get('/api/...')
+    """
+    @contextlib.contextmanager
+    def budget(queries, connections=None):
+        with track_queries() as log:
+            yield log
+        statements = '\n'.join(' '.join(str(q).split())[:160] for q, _ in log)
+        assert len(log) <= queries, f"{len(log)} statements, budget is {queries}:\n{statements}"
+        if connections is not None:
+            assert log.connections <= connections, f"{log.connections} connections, budget is {connections}"
+    return budget
+
+
+@pytest.fixture
+def fake_transaction(monkeypatch):
+    """Run a module's transaction() on a fake cursor and record its version bumps
+
+        def test_x(fake_transaction):
+            bumped = fake_transaction(billing, cursor)  # billing.transaction() yields ('conn', cursor)
+            ...
+            assert bumped == [('fee_details', 'students')]
+    """
+    def install(module, cursor):
+        bumped = []
+
+        @contextlib.contextmanager
+        def transaction():
+            yield 'conn', cursor
+        monkeypatch.setattr(module, 'transaction', transaction)
+        monkeypatch.setattr(module.versions, 'bump', lambda *scopes: bumped.append(scopes))
+        return bumped
+    return install
@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+
+from app.website import announcements
+from app.website.announcements import AnnouncementFeed, encode_cursor, decode_cursor
+from app.website.cache import VersionedCache
+
+
+def test_versioned_cache_reloads_on_new_version():
+    cache, loads = VersionedCache('test', maxsize=2), []
+    load = lambda: loads.append(1) or len(loads)
+    assert cache.get('a', 'v1', load) == 1
+    assert cache.get('a', 'v1', load) == 1
+    assert cache.get('a', 'v2', load) == 2
+    assert cache.get('a', None, load) == 3  # versions unavailable: never cached
+    cache.get('b', 'v1', load), cache.get('c', 'v1', load)
+    assert cache.get('a', 'v2', load) == 6  # evicted (LRU, maxsize 2)
+
+
+def test_get_many_loads_misses_in_one_call():
+    cache, calls = VersionedCache('test'), []
+    loader = lambda keys: calls.append(sorted(keys)) or {k: k * 10 for k in keys}
+    assert cache.get_many({1: 'a', 2: 'a'}, loader) == {1: 10, 2: 20}
+    assert cache.get_many({1: 'a', 2: 'b', 3: 'a'}, loader) == {1: 10, 2: 20, 3: 30}
+    assert calls == [[1, 2], [2, 3]]
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    state = {'versions': {}, 'queries': []}
+    rows = {
+        1: [{'announcement_id': 1, 'section_id': 1, 'created_at': datetime.datetime(2025, 9, 1)}],
+        2: [{'announcement_id': 2, 'section_id': 2, 'created_at': datetime.datetime(2025, 9, 2)}],
+    }
+
+    def fake_get(*scopes):
+        return {s: state['versions'].get(s, 0) for s in scopes}
+
+    def fake_execute(query, params=None, fetch=True):
+        state['queries'].append(query)
+        if 'FROM enrollments' in query:
+            return [{'section_id': 1}, {'section_id': 2}]
+        return [dict(r) for s in params for r in rows.get(s, [])]
+
+    monkeypatch.setattr(announcements.versions, 'get', fake_get)
+    monkeypatch.setattr(announcements.versions, 'token', lambda *s: str(fake_get(*s)))
+    monkeypatch.setattr(announcements, 'execute_query', fake_execute)
+    monkeypatch.setattr(announcements.AdminModel, 'get_all_announcements', staticmethod(lambda: []))
+    AnnouncementFeed.clear()
+    yield state
+    AnnouncementFeed.clear()
+
+
+def test_student_feed_is_cached_until_a_section_changes(feed):
+    first = AnnouncementFeed.for_student(7)
+    assert [a['announcement_id'] for a in first['faculty']] == [2, 1]
+    assert len(feed['queries']) == 2  # section list + one batched section load
+    AnnouncementFeed.for_student(7)
+    assert len(feed['queries']) == 2
+    feed['versions']['section:1'] = 1
+    AnnouncementFeed.for_student(7)
+    assert len(feed['queries']) == 3 and 'IN (%s)' in feed['queries'][-1]
+
+
+def test_cursor_round_trip():
+    row = {'created_at': datetime.datetime(2025, 9, 1, 8, 30), 'announcement_id': 42}
+    assert decode_cursor(encode_cursor(row)) == (row['created_at'], 42)
+    assert decode_cursor('garbage') is None
@@ -0,0 +1,127 @@
+import types
+import asyncio
+import datetime
+import contextlib
+
+from app.database import aio
+from app.database.connection import track_queries
+from app.website import async_views
+from app.website.announcements import AnnouncementFeed
+from app.website.auth import decode_token, generate_token
+from app.website.models import StudentModel, CourseModel
+
+
+def test_decode_token():
+    user, error = decode_token(f"Bearer {generate_token(7, 'ali', 'student')}")
+    assert error is None and user == {'user_id': 7, 'username': 'ali', 'role': 'student'}
+    assert decode_token(None) == (None, ('Token is missing!', 'TOKEN_MISSING'))
+    assert decode_token('Bearer nope')[1][1] == 'TOKEN_INVALID'
+
+
+def test_student_dashboard_runs_independent_reads_concurrently(monkeypatch):
+    student = {'student_id': 3, 'first_name': 'A', 'last_name': 'B', 'student_code': 'S1', 'dept_name': 'CS',
+               'current_semester': 2, 'email': 'a@b', 'phone': '1', 'status': 'active'}
+    results = {
+        StudentModel.PROFILE_SQL: [student],
+        CourseModel.STUDENT_ENROLLMENTS_SQL: [{'course_code': 'CS101'}],
+        StudentModel.ATTENDANCE_SUMMARY_SQL: [{'course_code': 'CS101', 'total_classes': 8, 'present': 8,
+                                               'attendance_percentage': 100}],
+    }
+    running, peak = 0, 0
+
+    async def fake_execute(query, params=None, fetch=True):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [dict(r) for r in results[query]]
+
+    async def fake_run_sync(fn, *args):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return fn(*args)
+
+    monkeypatch.setattr(aio, 'execute_query', fake_execute)
+    monkeypatch.setattr(aio, 'run_sync', fake_run_sync)
+    monkeypatch.setattr(AnnouncementFeed, 'for_student', staticmethod(
+        lambda student_id: {'admin': [{'title': 'hi', 'created_at': datetime.datetime(2025, 9, 1)}], 'faculty': []}))
+    payload, status = asyncio.run(async_views.student_dashboard({'user_id': 1, 'role': 'student'}))
+    assert status == 200
+    assert peak == 3  # everything after the profile lookup at once
+    assert payload['data']['enrolled_courses'][0]['attendance_left'] == 2
+    assert payload['data']['student']['roll_no'] == 'S1'
+    assert payload['data']['announcements']['admin'][0]['title'] == 'hi'
+
+
+def test_async_routes_check_role():
+    payload, status = asyncio.run(async_views.faculty_dashboard({'user_id': 1, 'role': 'student'}))
+    assert status == 403 and not payload['success']
+
+
+class FakeAioPool:
+    def __init__(self):
+        self.closed = False
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @contextlib.asynccontextmanager
+    async def cursor(self):
+        yield self
+
+    async def execute(self, query, params):
+        await asyncio.sleep(0.01)
+        self.rowcount = 0
+
+    async def fetchall(self):
+        return []
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def test_concurrent_requests_track_their_own_queries(monkeypatch):
+    pool = FakeAioPool()
+
+    async def get_pool():
+        return pool
+    monkeypatch.setattr(aio, 'get_pool', get_pool)
+
+    async def request(query):
+        with track_queries() as queries:
+            await aio.execute_query(query)
+            await aio.execute_query(query)
+        return queries
+
+    async def main():
+        return await asyncio.gather(request('SELECT 1'), request('SELECT 2'))
+    first, second = asyncio.run(main())
+    assert [q for q, _ in first] == ['SELECT 1', 'SELECT 1'] and first.connections == 2
+    assert [q for q, _ in second] == ['SELECT 2', 'SELECT 2']
+
+
+def test_pool_of_a_previous_loop_is_closed(monkeypatch):
+    pools = []
+
+    async def create_pool(**kwargs):
+        pools.append(FakeAioPool())
+        return pools[-1]
+    monkeypatch.setattr(aio, 'aiomysql', types.SimpleNamespace(create_pool=create_pool, DictCursor=object))
+    monkeypatch.setattr(aio, '_pool_loop', None)
+
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(aio.get_pool())
+        second = asyncio.run(aio.get_pool())
+    finally:
+        loop.close()
+    assert first is not second and first.closed and not second.closed
+    asyncio.run(aio.close_pool())
@@ -0,0 +1,71 @@
+from app.database import attendance_risk
+from app.website import create_app
+from app.website.auth import generate_token
+from app.website.views import attach_attendance
+
+
+class RiskCursor:
+    def __init__(self):
+        self.queries = []
+        self.rowcount = 2
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        self._rows = [{'status': 'short', 'n': 3}, {'status': 'ok', 'n': 40}] if 'GROUP BY status' in query else []
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_allowed_absences_matches_dashboard():
+    assert attendance_risk.allowed_absences(20, 18) == 3
+    assert attendance_risk.allowed_absences(20, 15) == 0
+    assert attendance_risk.allowed_absences(20, 14) == -1
+    assert attendance_risk.allowed_absences(0, 0) == 0
+    courses = attach_attendance([{'course_code': 'CS101'}], [{'course_code': 'CS101', 'total_classes': 20, 'present': 14,
+                                                               'attendance_percentage': 70}])
+    assert courses[0]['attendance_left'] == 0
+
+
+def test_compute_is_one_statement_and_drops_stale_rows(fake_transaction):
+    cursor = RiskCursor()
+    bumped = fake_transaction(attendance_risk, cursor)
+    summary = attendance_risk.compute(log=lambda *a: None)
+    (compute, params), (delete, delete_params), _ = cursor.queries
+    assert compute is attendance_risk.COMPUTE_SQL and params['ratio'] == 0.75
+    assert delete_params == (params['computed_at'],)
+    assert (summary['enrollments'], summary['short'], summary['warning'], summary['removed']) == (43, 3, 0, 2)
+    assert bumped == [('attendance_risk',)]
+
+
+def test_report_filters_status_and_department(monkeypatch):
+    calls = []
+    monkeypatch.setattr(attendance_risk, 'execute_query', lambda q, p=None: calls.append((q, p)) or [])
+    attendance_risk.report(department_id=3, statuses=['short', 'bogus'], limit=10)
+    attendance_risk.report()
+    assert 'ar.status IN (%s)' in calls[0][0] and calls[0][1] == ('short', 3, 10, 0)
+    assert 'department_id = %s' not in calls[1][0] and calls[1][1] == ('short', 'warning', 100, 0)
+    attendance_risk.report(limit=-5, offset=-10)
+    attendance_risk.report(limit=10 ** 6)
+    assert calls[2][1][-2:] == (1, 0) and calls[3][1][-2:] == (1000, 0)
+
+
+def test_at_risk_report_validates_paging(monkeypatch):
+    from app.website import views
+    monkeypatch.setattr(views.versions, 'token', lambda *scopes: None)
+    calls = []
+    monkeypatch.setattr(attendance_risk, 'execute_query', lambda q, p=None: calls.append(p) or [])
+    client = create_app().test_client()
+    headers = {'Authorization': f"Bearer {generate_token(1, 'admin', 'admin')}"}
+    assert client.get('/api/admin/attendance/at-risk?limit=ten', headers=headers).status_code == 400
+    assert client.get('/api/admin/attendance/at-risk?offset=1.5', headers=headers).status_code == 400
+    res = client.get('/api/admin/attendance/at-risk?limit=-3&offset=-1', headers=headers)
+    assert res.status_code == 200 and (res.get_json()['data']['limit'], res.get_json()['data']['offset']) == (1, 0)
+    assert calls == [('short', 'warning', 1, 0)]
+
+
+def test_at_risk_report_is_admin_only():
+    client = create_app().test_client()
+    headers = {'Authorization': f"Bearer {generate_token(5, 'student', 'student')}"}
+    assert client.get('/api/admin/attendance/at-risk', headers=headers).status_code == 403
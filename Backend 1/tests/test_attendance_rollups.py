@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+
+from app.database import attendance_rollups
+from app.website.models import AdminModel, StudentModel
+
+D1, D2 = datetime.date(2025, 9, 1), datetime.date(2025, 9, 2)
+
+
+class FacultyCursor:
+    def __init__(self, previous=()):
+        self.previous = list(previous)
+        self.queries = []
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        self._rows = self.previous if 'FOR UPDATE' in query else []
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_student_deltas_count_new_marks_and_flips():
+    previous = {(1, 5, D1): 'present', (2, 5, D1): 'absent', (3, 5, D1): 'present'}
+    final = {(1, 5, D1): 'absent', (2, 5, D1): 'absent', (3, 5, D1): 'present',
+             (1, 5, D2): 'present', (4, 5, D2): 'absent'}
+    assert attendance_rollups.student_deltas(previous, final) == {
+        (1, 5): (1, 0),     # flip to absent and a new present
+        (4, 5): (1, 0),
+    }
+
+
+def test_mark_faculty_upserts_and_moves_rollups():
+    cursor = FacultyCursor(previous=[{'faculty_id': 7, 'attendance_date': D1, 'session': 'Morning', 'status': 'absent'}])
+    records = [
+        {'faculty_id': 7, 'date': '2025-09-01', 'session': 'Morning', 'status': 'present'},
+        {'faculty_id': 7, 'date': '2025-09-01', 'session': 'Evening', 'status': 'absent'},
+        {'faculty_id': 8, 'date': '2025-09-01', 'session': 'Morning', 'status': 'present'},
+        {'faculty_id': 8, 'date': '2025-09-01', 'session': 'Morning', 'status': 'absent'},
+    ]
+    assert attendance_rollups.mark_faculty(cursor, records, marked_by=1) == 3
+    (lock, lock_params), (upsert, upsert_params), (rollup, rollup_params) = cursor.queries
+    assert lock_params == [7, '2025-09-01', 'Evening', 7, '2025-09-01', 'Morning', 8, '2025-09-01', 'Morning']
+    assert 'marked_at = CURRENT_TIMESTAMP' in upsert and len(upsert_params) == 15
+    # 7: one new absent session, one absent -> present flip; 8: one new absent session
+    assert rollup_params == [7, 1, 1, 0, 8, 1, 0, 1]
+
+
+def test_mark_faculty_matches_sessions_and_statuses_case_insensitively():
+    cursor = FacultyCursor(previous=[{'faculty_id': 7, 'attendance_date': D1, 'session': 'Morning', 'status': 'Present'}])
+    records = [
+        {'faculty_id': 7, 'date': '2025-09-01', 'session': ' MORNING ', 'status': 'PRESENT'},
+        {'faculty_id': 7, 'date': '2025-09-01', 'session': 'evening', 'status': 'Absent'},
+        {'faculty_id': 7, 'date': '2025-09-01', 'session': 'Evening', 'status': 'present'},
+    ]
+    assert attendance_rollups.mark_faculty(cursor, records, marked_by=1) == 2
+    (_, lock_params), (_, upsert_params), (_, rollup_params) = cursor.queries
+    assert lock_params == [7, '2025-09-01', 'Evening', 7, '2025-09-01', 'Morning']
+    assert upsert_params[:5] == [7, '2025-09-01', 'Evening', 'present', 1]
+    assert upsert_params[5:9] == [7, '2025-09-01', 'Morning', 'present']
+    # the morning mark was already present: only the new evening session counts
+    assert rollup_params == [7, 1, 1, 0]
+
+
+@pytest.mark.parametrize('field, value', [('session', 'Night'), ('status', 'late'), ('status', None)])
+def test_mark_faculty_rejects_unknown_values_before_writing(field, value):
+    cursor = FacultyCursor()
+    record = dict({'faculty_id': 7, 'date': '2025-09-01', 'session': 'Morning', 'status': 'present'}, **{field: value})
+    with pytest.raises(ValueError):
+        attendance_rollups.mark_faculty(cursor, [record], marked_by=1)
+    assert cursor.queries == []
+
+
+def test_summaries_read_rollups(monkeypatch):
+    calls = []
+    monkeypatch.setattr('app.website.models.execute_query', lambda q, p=None: calls.append((q, p)) or [])
+    StudentModel.get_attendance_summary(3)
+    AdminModel.get_faculty_attendance_summary()
+    assert calls == [(attendance_rollups.STUDENT_SUMMARY_SQL, (3,)), (attendance_rollups.FACULTY_SUMMARY_SQL, None)]
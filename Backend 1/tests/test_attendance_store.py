@@ -0,0 +1,159 @@
+import datetime
+
+import pytest
+
+from app.database import attendance_store
+from app.website.models import FacultyModel
+
+D1, D2, D3 = datetime.date(2025, 9, 1), datetime.date(2025, 9, 3), datetime.date(2025, 9, 5)
+
+
+class StoreCursor:
+    def __init__(self, sessions=(), previous=(), bits=()):
+        self.sessions = list(sessions)
+        self.previous = list(previous)
+        self.bits = list(bits)
+        self.queries = []
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if query is attendance_store.SESSIONS_SQL:
+            self._rows = [{'attendance_date': d, 'session_no': n} for d, n in self.sessions]
+        elif 'FROM attendance WHERE' in ' '.join(query.split()):
+            self._rows = self.previous
+        elif 'FROM attendance_bits WHERE' in ' '.join(query.split()):
+            self._rows = self.bits
+        else:
+            self._rows = []
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_pack_sets_marked_and_present_bits_last_mark_wins():
+    sessions = {4: {D1: 0, D2: 1, D3: 65}}
+    records = [(7, 4, D1, 'present'), (7, 4, D2, 'absent'), (7, 4, D3, 'present'), (7, 4, D1, 'absent'), (8, 4, D2, 'present')]
+    words = attendance_store.pack(records, sessions)
+    assert words == {
+        (4, 7, 0): [0b11, 0b00],
+        (4, 7, 1): [0b10, 0b10],
+        (4, 8, 0): [0b10, 0b10],
+    }
+
+
+def test_write_bits_numbers_new_dates_after_existing_sessions():
+    cursor = StoreCursor(sessions=[(D1, 0)])
+    records = attendance_store.normalize([
+        {'student_id': 7, 'section_id': 4, 'date': '2025-09-05', 'status': 'present'},
+        {'student_id': 7, 'section_id': 4, 'date': D1, 'status': 'absent'},
+        {'student_id': 7, 'section_id': 4, 'date': '2025-09-03', 'status': 'present'},
+    ])
+    assert attendance_store.write_bits(cursor, records) == 1
+    (lock, lock_params), (new_sessions, session_params), (bits, bit_params) = cursor.queries
+    assert lock_params == (4,)
+    assert session_params == [4, D2, 1, 4, D3, 2]
+    assert 'ON DUPLICATE KEY UPDATE' in bits
+    assert bit_params == [4, 7, 0, 0b111, 0b110]
+
+
+@pytest.mark.parametrize('mode, tables', [
+    ('rows', ['attendance', 'attendance_rollup']),
+    ('both', ['attendance_sessions', 'attendance', 'attendance_bits', 'attendance_rollup']),
+    ('bitmap', ['attendance_sessions', 'attendance_bits', 'attendance_rollup']),
+])
+def test_storage_mode_selects_written_tables(monkeypatch, fake_transaction, mode, tables):
+    cursor = StoreCursor()
+    fake_transaction(attendance_store, cursor)
+    monkeypatch.setattr(attendance_store, 'ATTENDANCE_STORAGE', mode)
+    assert FacultyModel.mark_multiple_attendance([
+        {'student_id': 1, 'section_id': 2, 'date': '2025-09-01', 'status': 'present'},
+        {'student_id': 3, 'section_id': 2, 'date': '2025-09-01', 'status': 'absent'},
+    ])
+    written = [q.split('INTO ')[1].split()[0] for q, _ in cursor.queries if 'INSERT INTO' in q]
+    assert written == tables
+
+
+def test_invalid_status_is_rejected_before_writing(monkeypatch, fake_transaction):
+    cursor = StoreCursor()
+    fake_transaction(attendance_store, cursor)
+    assert not FacultyModel.mark_attendance(1, 2, '2025-09-01', 'late')
+    assert cursor.queries == []
+
+
+def test_rollups_see_flips_from_rows_and_from_bits(monkeypatch, fake_transaction):
+    records = [{'student_id': 1, 'section_id': 2, 'date': D1, 'status': 'absent'},
+               {'student_id': 3, 'section_id': 2, 'date': D1, 'status': 'present'}]
+
+    monkeypatch.setattr(attendance_store, 'ATTENDANCE_STORAGE', 'rows')
+    cursor = StoreCursor(previous=[{'student_id': 1, 'section_id': 2, 'attendance_date': D1, 'status': 'present'}])
+    fake_transaction(attendance_store, cursor)
+    assert attendance_store.mark_many(records)
+    assert cursor.queries[-1][1] == [1, 2, 0, -1, 3, 2, 1, 1]
+
+    # the same state held in bits: student 1 marked present in session 0, student 3 unmarked
+    monkeypatch.setattr(attendance_store, 'ATTENDANCE_STORAGE', 'bitmap')
+    cursor = StoreCursor(sessions=[(D1, 0)], bits=[{'section_id': 2, 'student_id': 1, 'word': 0, 'marked': 1, 'present': 1}])
+    fake_transaction(attendance_store, cursor)
+    assert attendance_store.mark_many(records)
+    assert cursor.queries[-1][1] == [1, 2, 0, -1, 3, 2, 1, 1]
+
+
+def test_backfill_copies_section_rows_into_bits(fake_transaction):
+    cursor = StoreCursor(sessions=[(D1, 0)], previous=[
+        {'student_id': 7, 'section_id': 4, 'date': D1, 'status': 'present'},
+        {'student_id': 8, 'section_id': 4, 'date': D2, 'status': 'absent'},
+    ])
+    bumped = fake_transaction(attendance_store, cursor)
+    summary = attendance_store.backfill([4], chunk_size=1, log=lambda message: None)
+    assert summary == {'sections': 1, 'rows': 2, 'words': 2}
+    bits = [params for query, params in cursor.queries if 'INTO attendance_bits' in query]
+    assert bits == [[4, 7, 0, 0b1, 0b1], [4, 8, 0, 0b10, 0b00]]
+    assert bumped == [('attendance:4',)]
+
+
+def test_bitmap_storage_reads_dates_from_bits(monkeypatch):
+    calls = []
+    monkeypatch.setattr(attendance_store, 'ATTENDANCE_STORAGE', 'bitmap')
+    monkeypatch.setattr(attendance_store, 'execute_query', lambda q, p=None: calls.append((q, p)) or [])
+    FacultyModel.get_course_attendance(4, '2025-09-01')
+    assert calls == [(attendance_store.BITMAP_SECTION_DAY_SQL, (4, '2025-09-01', 4, 4))]
+
+
+def test_grid_encodes_roster_by_date(monkeypatch):
+    student = {'student_code': 'S', 'first_name': 'F', 'last_name': 'L'}
+    rows = [
+        dict(student, student_id=1, attendance_date=D1, status='present'),
+        dict(student, student_id=1, attendance_date=D3, status='absent'),
+        dict(student, student_id=2, attendance_date=D2, status='present'),
+        dict(student, student_id=2, attendance_date=D3, status='present'),
+        dict(student, student_id=3, attendance_date=None, status=None),
+    ]
+    calls = []
+    monkeypatch.setattr(attendance_store, 'ATTENDANCE_STORAGE', 'rows')
+    monkeypatch.setattr(attendance_store, 'execute_query', lambda q, p=None: calls.append(p) or rows)
+    dates, students = attendance_store.grid(4, D1, D3)
+    assert calls == [(D1, D3, 4)]
+    assert dates == ['2025-09-01', '2025-09-03', '2025-09-05']
+    assert [(s['student_id'], s['attendance'], s['present'], s['absent']) for s in students] == [
+        (1, 'P-A', 1, 1), (2, '-PP', 2, 0), (3, '---', 0, 0)]
+    _, students = attendance_store.grid(4, D1, D3, encoding='rle')
+    assert [s['attendance'] for s in students] == ['1P1-1A', '1-2P', '3-']
+
+
+def test_grid_endpoint_answers_304_without_querying(monkeypatch):
+    from app.website import create_app, views
+    from app.website.auth import generate_token
+    monkeypatch.setattr(views.versions, 'token', lambda *scopes: ';'.join(scopes) + '.1')
+    calls = []
+    monkeypatch.setattr(FacultyModel, 'get_attendance_grid',
+                        staticmethod(lambda *args: calls.append(args) or (['2025-09-01'], [{'student_id': 1, 'attendance': 'P'}])))
+    client = create_app().test_client()
+    headers = {'Authorization': f"Bearer {generate_token(2, 'faculty', 'faculty')}"}
+    res = client.get('/api/faculty/courses/4/attendance/grid?from=2025-09-01&encoding=rle', headers=headers)
+    assert res.status_code == 200 and res.get_json()['data']['dates'] == ['2025-09-01']
+    assert calls == [(4, D1, None, 'rle')]
+    again = client.get('/api/faculty/courses/4/attendance/grid?from=2025-09-01&encoding=rle',
+                       headers=dict(headers, **{'If-None-Match': res.headers['ETag']}))
+    assert again.status_code == 304 and len(calls) == 1
+    assert client.get('/api/faculty/courses/4/attendance/grid?from=09/01', headers=headers).status_code == 400
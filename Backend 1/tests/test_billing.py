@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from app.database import billing
+
+
+class BillingCursor:
+    def __init__(self, assessment, fee_ids):
+        self.assessment = assessment
+        self.fee_ids = fee_ids
+        self.queries = []
+        self.lastrowid = 500
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if query is billing.ASSESSMENT_SQL:
+            self._rows = self.assessment
+        elif 'MIN(fee_id) AS fee_id FROM fee_details' in query:
+            self._rows = [{'student_id': s, 'fee_id': f} for s, f in self.fee_ids.items()]
+        else:
+            self._rows = []
+
+    def fetchall(self):
+        return self._rows
+
+
+def _run(fake_transaction, assessment, fee_ids, **kwargs):
+    cursor = BillingCursor(assessment, fee_ids)
+    bumped = fake_transaction(billing, cursor)
+    summary = billing.assess_semester('Fall', log=lambda *a: None, **kwargs)
+    return summary, cursor, bumped
+
+
+ASSESSMENT = [
+    {'student_id': 1, 'tuition': Decimal('60000'), 'fee_id': None, 'recorded': Decimal('0')},    # new record
+    {'student_id': 2, 'tuition': Decimal('60000'), 'fee_id': 12, 'recorded': Decimal('30000')},  # one more course
+    {'student_id': 3, 'tuition': Decimal('30000'), 'fee_id': 13, 'recorded': Decimal('30000')},  # unchanged
+    {'student_id': 4, 'tuition': Decimal('0'), 'fee_id': 14, 'recorded': Decimal('30000')},      # dropped everything
+]
+
+
+def test_plan_keeps_only_changes():
+    cursor = BillingCursor(ASSESSMENT, {})
+    assert billing.plan(cursor, 'Fall') == [
+        (1, None, Decimal('60000')), (2, 12, Decimal('30000')), (4, 14, Decimal('-30000'))]
+    assert cursor.queries[0][1] == ('Fall', 'Fall', 'Fall', 'Fall')
+
+
+def test_assessment_writes_chunked_multi_row_statements(fake_transaction):
+    summary, cursor, bumped = _run(fake_transaction, ASSESSMENT, {1: 20, 2: 12, 3: 13, 4: 14}, chunk_size=2)
+    assert summary['students'] == 3 and summary['new_records'] == 1
+    assert summary['charged'] == Decimal('90000') and summary['credited'] == Decimal('30000')
+
+    upserts = [p for q, p in cursor.queries if 'ON DUPLICATE KEY UPDATE' in q]
+    assert len(upserts) == 2  # 3 students, 2 rows per statement
+    assert upserts[0][:6] == [None, 1, 'Fall', Decimal('60000'), Decimal('60000'), None]
+
+    ledger_rows = [p for q, p in cursor.queries if q.startswith('INSERT INTO fee_ledger')]
+    assert len(ledger_rows) == 2
+    assert ledger_rows[0][:4] == [1, 20, 'charge', Decimal('60000')]  # the new record's id
+    assert ledger_rows[1][:4] == [4, 14, 'credit', Decimal('30000')]
+
+    balance = [p for q, p in cursor.queries if q is billing.BALANCE_SQL]
+    assert balance == [(500, ledger_rows[0][4])]
+    assert ('fee_details', 'students') in bumped
+
+
+def test_dry_run_writes_nothing(fake_transaction):
+    summary, cursor, bumped = _run(fake_transaction, ASSESSMENT, {}, dry_run=True)
+    assert summary['students'] == 3
+    assert len(cursor.queries) == 1 and bumped == []
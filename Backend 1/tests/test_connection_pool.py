@@ -0,0 +1,93 @@
+import os
+import pathlib
+import runpy
+
+import pytest
+
+from app.database import connection
+from app.database.connection import ConnectionPool, track_queries, chunks, row_placeholders
+
+
+class FakeConnection:
+    opened = 0
+
+    def __init__(self):
+        FakeConnection.opened += 1
+        self.open = True
+        self.pings = 0
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeConnection.opened = 0
+    monkeypatch.setattr(connection, '_connect', lambda *a: FakeConnection())
+    return ConnectionPool(2, timeout=0.05, recycle=300)
+
+
+def test_connections_are_reused(pool):
+    with track_queries() as log:
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+    assert FakeConnection.opened == 1
+    assert log.connections == 2
+
+
+def test_exhausted_pool_times_out(pool):
+    pool.acquire(), pool.acquire()
+    with pytest.raises(connection.Error):
+        pool.acquire()
+
+
+def test_broken_connections_are_not_pooled(pool):
+    conn = pool.acquire()
+    pool.release(conn, broken=True)
+    assert not conn.open
+    assert pool.acquire() is not conn
+
+
+def test_stale_connections_are_pinged(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    pool.recycle = 0
+    assert pool.acquire() is conn
+    assert conn.pings == 1
+
+
+def test_child_process_drops_inherited_connections(pool, monkeypatch):
+    conn = pool.acquire()
+    pool.release(conn)
+    monkeypatch.setattr(connection.os, 'getpid', lambda: pool.pid + 1)
+    assert pool.acquire() is not conn
+    assert conn.open  # the parent's socket is left alone
+
+
+def test_switching_database_drains_the_pool(pool, monkeypatch):
+    conn = pool.acquire()
+    pool.release(conn)
+    monkeypatch.setitem(connection.DB_CONFIG, 'database', 'other_db')
+    assert pool.acquire() is not conn
+    assert not conn.open
+
+
+def test_chunks_and_row_placeholders():
+    assert list(chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunks([], 2)) == []
+    assert row_placeholders('(%s, %s)', 3) == '(%s, %s), (%s, %s), (%s, %s)'
+
+
+def test_gunicorn_sizes_come_from_the_env_file(tmp_path, monkeypatch):
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '.env').write_text('GUNICORN_WORKERS=3\nDB_MAX_CONNECTIONS=40\nDB_POOL_SIZE=6\n')
+    (tmp_path / 'gunicorn.conf.py').write_text((pathlib.Path(__file__).parents[1] / 'gunicorn.conf.py').read_text())
+    names = ('GUNICORN_WORKERS', 'GUNICORN_THREADS', 'DB_MAX_CONNECTIONS', 'DB_RESERVED_CONNECTIONS', 'DB_POOL_SIZE')
+    monkeypatch.setattr(os, 'environ', {k: v for k, v in os.environ.items() if k not in names})
+    config = runpy.run_path(str(tmp_path / 'gunicorn.conf.py'))
+    assert (config['workers'], config['threads']) == (3, 10)
+    assert os.environ['DB_POOL_SIZE'] == '6'
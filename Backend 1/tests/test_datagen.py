@@ -0,0 +1,79 @@
+import re
+import pathlib
+
+from app.database import datagen
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.conn = None
+        self.tables = {}
+        self.columns = {}
+        self.counts = {}
+    def write(self, table, columns, rows):
+        rows = list(rows)
+        self.columns[table] = columns
+        self.tables.setdefault(table, []).extend(rows)
+        self.counts[table] = self.counts.get(table, 0) + len(rows)
+        return len(rows)
+
+
+def _generate(seed=7):
+    scale = {'students': 120, 'departments': 2, 'courses_per_dept': 6, 'faculty_per_dept': 3,
+             'terms': 3, 'courses_per_term': 2, 'section_capacity': 15, 'class_days': 4, 'seed': seed}
+    generator = datagen.DatasetGenerator(scale, ('Fall', 2025), log=lambda *a: None)
+    generator._finish = lambda conn: None
+    writer = RecordingWriter()
+    generator.run(writer)
+    return writer.tables
+
+
+def test_generator_is_deterministic():
+    assert _generate() == _generate()
+    assert _generate(seed=8)['attendance'] != _generate()['attendance']
+
+
+def test_generated_rows_are_consistent():
+    tables = _generate()
+    sections = {row[0]: row for row in tables['course_sections']}
+    enrolled = {}
+    for enrollment_id, student_id, section_id, _, status in tables['enrollments']:
+        enrolled.setdefault(section_id, set()).add(student_id)
+        assert status == ('enrolled' if sections[section_id][4:6] == ('Fall', 2025) else 'completed')
+    assert all(len(students) <= 15 for students in enrolled.values())
+    # attendance only for enrolled students, unique per day
+    keys = [(r[0], r[1], r[2]) for r in tables['attendance']]
+    assert len(keys) == len(set(keys))
+    assert all(r[0] in enrolled[r[1]] for r in tables['attendance'])
+    # transcript only for completed terms
+    assert all(r[4] != 'Fall 2025' for r in tables['transcript'])
+    assert len({r[1] for r in tables['users']}) == len(tables['users'])
+
+
+def _column_widths():
+    """{(table, column): width} of the CHAR/VARCHAR columns after the baseline and every migration"""
+    database = pathlib.Path(datagen.__file__).parent
+    widths, table = {}, None
+    for path in [database / 'schema.sql', database / 'migrate_update_schema.sql', *sorted((database / 'migrations').glob('*.sql'))]:
+        for line in path.read_text().splitlines():
+            line = line.split('--', 1)[0]
+            statement = re.search(r'(?:CREATE TABLE(?: IF NOT EXISTS)?|ALTER TABLE)\s+(\w+)', line, re.I)
+            if statement:
+                table = statement[1]
+            for column, width in re.findall(r'(\w+)\s+(?:VAR)?CHAR\((\d+)\)', line, re.I):
+                widths[(table, column)] = int(width)
+    return widths
+
+
+def test_generated_values_fit_their_columns():
+    widths = _column_widths()
+    writer = RecordingWriter()
+    generator = datagen.DatasetGenerator({'students': 40, 'terms': 3, 'class_days': 2}, ('Fall', 2025), log=lambda *a: None)
+    generator._finish = lambda conn: None
+    generator.run(writer)
+    for table, rows in writer.tables.items():
+        for name, values in zip(writer.columns[table], zip(*rows)):
+            width = widths.get((table, name))
+            if width:
+                too_long = [value for value in values if isinstance(value, str) and len(value) > width]
+                assert not too_long, f"{table}.{name} is VARCHAR({width}): {too_long[:3]}"
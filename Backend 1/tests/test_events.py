@@ -0,0 +1,150 @@
+import time
+import threading
+
+from werkzeug.test import EnvironBuilder
+
+from app.database import events
+from app.website import create_app, events as sse
+from app.website.announcements import AnnouncementFeed
+from app.website.auth import generate_token
+
+
+def _event(event_id, topic='seats', **data):
+    return {'id': event_id, 'topic': topic, 'data': data}
+
+
+def test_subscriber_filters_topics_and_accept():
+    sub = events.Subscriber({'announcements'}, accept=lambda e: e['data'].get('section_id') == 4)
+    sub.push(_event(1, 'seats', section_id=4))
+    sub.push(_event(2, 'announcements', section_id=5))
+    sub.push(_event(3, 'announcements', section_id=4))
+    assert sub.wait(0)
+    assert [e['id'] for e in sub.drain()] == [3]
+    assert not sub.wait(0)
+
+
+def test_full_buffer_is_replaced_by_resync(monkeypatch):
+    monkeypatch.setattr(events, 'EVENT_BUFFER', 3)
+    sub = events.Subscriber({'seats'})
+    for i in range(1, 6):
+        sub.push(_event(i))
+    drained = sub.drain()
+    # 1-3 buffered, 4 overflowed into a resync, 5 queued behind it
+    assert [(e['id'], e['topic']) for e in drained] == [(4, 'resync'), (5, 'seats')]
+    assert sub.dropped == 3
+
+
+def test_broker_replays_missed_events_and_fans_out(monkeypatch):
+    monkeypatch.setattr(events, 'last_event_id', lambda: 10)
+    calls = []
+
+    def fake_read_since(event_id, upto=None, limit=500):
+        calls.append((event_id, upto))
+        if upto is None:
+            return []
+        return [_event(i) for i in range(event_id + 1, upto + 1)]
+    monkeypatch.setattr(events, 'read_since', fake_read_since)
+
+    broker = events.EventBroker(poll_interval=0.01)
+    late = broker.subscribe({'seats'}, last_event_id=8)
+    fresh = broker.subscribe({'seats'})
+    assert [e['id'] for e in late.drain()] == [9, 10]
+    assert fresh.drain() == []
+
+    broker.dispatch([_event(11, section_id=1)])
+    assert [e['id'] for e in late.drain()] == [11]
+    assert [e['id'] for e in fresh.drain()] == [11]
+
+    broker.unsubscribe(late)
+    broker.unsubscribe(fresh)
+    assert broker.subscriber_count() == 0
+    time.sleep(0.05)  # tailer stops once nobody listens
+    assert broker._thread is None
+
+
+def test_publish_appends_to_log(monkeypatch):
+    statements = []
+    monkeypatch.setattr(events, 'execute_query', lambda q, p=None, fetch=True: statements.append((q, p)))
+    assert events.publish('announcements', {'scope': 'admin', 'title': 'Exams'})
+    assert events.publish_seats(12)
+    assert statements[0][1] == ('announcements', '{"scope": "admin", "title": "Exams"}')
+    assert 'JSON_OBJECT' in statements[1][0] and statements[1][1] == (12,)
+
+
+def test_student_filter_limits_section_announcements(monkeypatch):
+    monkeypatch.setattr(sse, 'execute_query', lambda q, p=None: [{'student_id': 3}])
+    monkeypatch.setattr(AnnouncementFeed, 'student_section_ids', staticmethod(lambda student_id: (4, 6)))
+    accept = sse.section_filter({'user_id': 1, 'role': 'student'})
+    assert accept(_event(1, 'announcements', scope='admin'))
+    assert accept(_event(2, 'announcements', scope='section', section_id=6))
+    assert not accept(_event(3, 'announcements', scope='section', section_id=5))
+    assert accept(_event(4, 'seats', section_id=5))
+    assert sse.section_filter({'user_id': 1, 'role': 'admin'}) is None
+
+
+def test_stream_requires_token_and_valid_topics():
+    client = create_app().test_client()
+    assert client.get('/api/events').status_code == 401
+    token = generate_token(1, 'admin', 'admin')
+    assert client.get(f'/api/events?token={token}&topics=grades').status_code == 400
+
+
+def test_stream_sends_events_and_heartbeats(monkeypatch):
+    broker = events.EventBroker(poll_interval=0.01)
+    monkeypatch.setattr(events, 'last_event_id', lambda: 0)
+    monkeypatch.setattr(events, 'read_since', lambda *a, **k: [])
+    monkeypatch.setattr(sse, 'BROKER', broker)
+    monkeypatch.setattr(sse, 'EVENT_HEARTBEAT', 0.01)
+    monkeypatch.setattr(sse, 'EVENT_STREAM_MAX_SECONDS', 0.05)
+
+    real_subscribe = broker.subscribe
+
+    def subscribe(*args, **kwargs):
+        sub = real_subscribe(*args, **kwargs)
+        broker.dispatch([_event(7, section_id=2, seats_available=0)])
+        return sub
+    monkeypatch.setattr(broker, 'subscribe', subscribe)
+
+    client = create_app().test_client()
+    token = generate_token(1, 'admin', 'admin')
+    res = client.get('/api/events', headers={'Authorization': f'Bearer {token}'})
+    body = res.get_data(as_text=True)
+    assert res.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in res.headers
+    assert body.startswith('retry: 3000\n\n')
+    assert 'id: 7\nevent: seats\ndata: {"section_id":2,"seats_available":0}\n\n' in body
+    assert ': heartbeat' in body
+    assert broker.subscriber_count() == 0
+
+
+def test_wsgi_streams_are_capped_per_process(monkeypatch):
+    broker = events.EventBroker(poll_interval=0.01)
+    monkeypatch.setattr(events, 'last_event_id', lambda: 0)
+    monkeypatch.setattr(events, 'read_since', lambda *a, **k: [])
+    monkeypatch.setattr(sse, 'BROKER', broker)
+    monkeypatch.setattr(sse, 'EVENT_STREAM_MAX_SECONDS', 0.01)
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(sse, '_wsgi_streams', slots)
+    client = create_app().test_client()
+    headers = {'Authorization': f"Bearer {generate_token(1, 'admin', 'admin')}"}
+
+    slots.acquire()  # one stream already open
+    res = client.get('/api/events', headers=headers)
+    assert res.status_code == 503 and res.headers['Retry-After'] == '3'
+    assert 'asgi.py' in res.get_json()['message']
+    slots.release()
+
+    assert client.get('/api/events', headers=headers).get_data(as_text=True).startswith('retry:')
+    assert client.get('/api/events').status_code == 401  # rejected streams give their slot back
+    assert slots.acquire(blocking=False)
+    slots.release()
+
+    # the client goes away before the first chunk: the server closes the body without iterating it
+    body = client.application.wsgi_app(EnvironBuilder('/api/events', headers=headers).get_environ(), lambda *a: None)
+    assert broker.subscriber_count() == 1 and not slots.acquire(blocking=False)
+    body.close()
+    assert broker.subscriber_count() == 0 and slots.acquire(blocking=False)
+    slots.release()
+
+    monkeypatch.setattr(sse, '_wsgi_streams', None)  # EVENT_WSGI_MAX_STREAMS=0
+    assert client.get('/api/events', headers=headers).status_code == 503
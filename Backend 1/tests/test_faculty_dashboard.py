@@ -0,0 +1,92 @@
+import datetime
+
+import pytest
+
+from app.website import faculty_dashboard
+from app.website.faculty_dashboard import FacultyDashboard, weekdays
+from app.website.models import FacultyModel
+
+TODAY = datetime.date(2025, 9, 12)  # a Friday
+
+
+@pytest.fixture
+def dashboard(monkeypatch):
+    state = {'versions': {}, 'queries': [], 'marked': {}}
+    sections = [
+        {'section_id': 1, 'section_code': 'A', 'semester': 'Fall', 'year': 2025, 'schedule': 'MWF 09:00-10:00',
+         'room': 'R-1', 'max_capacity': 30, 'course_code': 'CS101', 'course_name': 'Intro', 'credits': 3,
+         'enrolled_students': 20, 'missing_marks': 0},
+        {'section_id': 2, 'section_code': 'B', 'semester': 'Fall', 'year': 2025, 'schedule': 'TTH 10:00-11:30',
+         'room': 'R-2', 'max_capacity': 30, 'course_code': 'CS102', 'course_name': 'Data', 'credits': 3,
+         'enrolled_students': 12, 'missing_marks': 5},
+    ]
+
+    def fake_get(*scopes):
+        return {s: state['versions'].get(s, 0) for s in scopes}
+
+    def fake_execute(query, params=None, fetch=True):
+        state['queries'].append(query)
+        if query is faculty_dashboard.SECTION_IDS_SQL:
+            return [{'section_id': 2}, {'section_id': 1}]
+        return [dict(row) for row in sections if row['section_id'] in params]
+
+    def fake_marked(section_ids, date_from, date_to):
+        state['queries'].append('marked_dates')
+        state['range'] = (date_from, date_to)
+        return {s: set(state['marked'].get(s, ())) for s in section_ids}
+
+    monkeypatch.setattr(faculty_dashboard.versions, 'get', fake_get)
+    monkeypatch.setattr(faculty_dashboard, 'execute_query', fake_execute)
+    monkeypatch.setattr(faculty_dashboard.attendance_store, 'marked_dates', fake_marked)
+    monkeypatch.setattr(faculty_dashboard.AnnouncementFeed, 'admin', staticmethod(lambda current=None: []))
+    monkeypatch.setattr(faculty_dashboard.AnnouncementFeed, 'for_faculty', staticmethod(lambda faculty_id, current=None: []))
+    monkeypatch.setattr(faculty_dashboard, 'FACULTY_PENDING_DAYS', 7)
+    FacultyDashboard.clear()
+    yield state
+    FacultyDashboard.clear()
+
+
+def test_weekdays_from_schedule_day_codes():
+    assert weekdays('MWF 09:00-10:00') == {0, 2, 4}
+    assert weekdays('TTH 10:00-11:30') == {1, 3}
+    assert weekdays('SA 10:00') == {5}
+    assert weekdays(None) == set() and weekdays('') == set()
+
+
+def test_pending_attendance_and_marks(dashboard):
+    dashboard['marked'] = {1: {datetime.date(2025, 9, 8), datetime.date(2025, 9, 10)}}
+    data = FacultyDashboard.load(3, today=TODAY)
+    # yesterday back to a week ago: Fri 5th .. Thu 11th
+    assert dashboard['range'] == (datetime.date(2025, 9, 5), datetime.date(2025, 9, 11))
+    courses = {c['section_id']: c for c in data['teaching_courses']}
+    assert courses[1]['unmarked_dates'] == ['2025-09-05']
+    assert courses[2]['unmarked_dates'] == ['2025-09-09', '2025-09-11']
+    assert courses[2]['enrolled_students'] == 12
+    assert [(p['section_id'], p['missing']) for p in data['pending']['marks']] == [(2, 5)]
+    assert [p['section_id'] for p in data['pending']['attendance']] == [1, 2]
+    assert data['announcements'] == {'admin': [], 'faculty': []}
+
+
+def test_cached_until_a_section_scope_or_the_date_changes(dashboard):
+    FacultyDashboard.load(3, today=TODAY)
+    assert len(dashboard['queries']) == 3  # section list, sections with counts, marked dates
+    FacultyDashboard.load(3, today=TODAY)
+    assert len(dashboard['queries']) == 3
+    dashboard['versions']['marks:2'] = 1
+    FacultyDashboard.load(3, today=TODAY)
+    assert len(dashboard['queries']) == 5  # the section list is still cached
+    FacultyDashboard.load(3, today=TODAY + datetime.timedelta(days=1))
+    assert len(dashboard['queries']) == 7
+    dashboard['versions']['course_sections'] = 1
+    FacultyDashboard.load(3, today=TODAY + datetime.timedelta(days=1))
+    assert len(dashboard['queries']) == 10
+
+
+def test_upload_marks_bumps_the_section_marks_scope(monkeypatch):
+    bumped = []
+    monkeypatch.setattr('app.website.models.execute_query', lambda q, p=None, fetch=True: [
+        {'course_code': 'CS101', 'course_name': 'Intro', 'credits': 3, 'semester': 'Fall', 'student_id': 7, 'section_id': 4}])
+    monkeypatch.setattr('app.website.models.StudentModel.update_transcript', staticmethod(lambda *args: True))
+    monkeypatch.setattr('app.website.models.versions.bump', lambda *scopes: bumped.append(scopes))
+    assert FacultyModel.upload_marks(11, {'quiz_marks': 8})
+    assert bumped == [('marks:4',)]
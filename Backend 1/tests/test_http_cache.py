@@ -0,0 +1,63 @@
+import gzip
+
+import pytest
+from flask import jsonify
+
+from app.website import create_app, http_cache
+from app.website.auth import token_required, generate_token
+from app.website.http_cache import etag
+
+HEADERS = {'Authorization': f"Bearer {generate_token(1, 'admin', 'admin')}"}
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.calls = 0
+    app.version = 'v1'
+
+    @app.route('/_big')
+    @token_required
+    @etag()
+    def big(current_user):
+        app.calls += 1
+        return jsonify({'rows': [{'name': 'row'} for _ in range(500)]})
+
+    @app.route('/_versioned')
+    @token_required
+    @etag(lambda current_user: app.version)
+    def versioned(current_user):
+        app.calls += 1
+        return jsonify({'ok': True})
+
+    return app
+
+
+def test_large_json_is_gzipped(app, monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    res = app.test_client().get('/_big', headers={**HEADERS, 'Accept-Encoding': 'gzip'})
+    assert res.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in res.headers['Vary']
+    assert gzip.decompress(res.data).startswith(b'{"rows"')
+    small = app.test_client().get('/_versioned', headers={**HEADERS, 'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_body_etag_returns_304(app):
+    client = app.test_client()
+    first = client.get('/_big', headers={**HEADERS, 'Accept-Encoding': 'gzip'})
+    tag = first.headers['ETag']
+    assert tag.endswith('-gzip"')
+    second = client.get('/_big', headers={**HEADERS, 'If-None-Match': tag})
+    assert second.status_code == 304 and second.data == b''
+
+
+def test_validator_etag_skips_the_view(app):
+    client = app.test_client()
+    tag = client.get('/_versioned', headers=HEADERS).headers['ETag']
+    assert app.calls == 1
+    assert client.get('/_versioned', headers={**HEADERS, 'If-None-Match': tag}).status_code == 304
+    assert app.calls == 1
+    app.version = 'v2'
+    assert client.get('/_versioned', headers={**HEADERS, 'If-None-Match': tag}).status_code == 200
+    assert app.calls == 2
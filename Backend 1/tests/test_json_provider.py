@@ -0,0 +1,58 @@
+import datetime
+import decimal
+
+import pytest
+from flask import jsonify
+
+from app.website import create_app, json_provider
+from app.website.json_provider import json_exclude
+
+
+ROW = {
+    'amount': decimal.Decimal('1500.50'),
+    'due_date': datetime.date(2025, 9, 1),
+    'created_at': datetime.datetime(2025, 9, 1, 10, 30),
+    'start_time': datetime.timedelta(hours=9, minutes=5),
+    'password_hash': 'secret',
+    'nested': [{'password_hash': 'x', 'gpa': decimal.Decimal('3.25')}],
+}
+EXPECTED = {
+    'amount': 1500.5,
+    'due_date': '2025-09-01',
+    'created_at': '2025-09-01T10:30:00',
+    'start_time': '09:05:00',
+    'password_hash': 'secret',
+    'nested': [{'password_hash': 'x', 'gpa': 3.25}],
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson not installed')
+    app = create_app()
+
+    @app.route('/_rows')
+    def rows():
+        return jsonify({'data': ROW})
+
+    @app.route('/_pruned')
+    @json_exclude('password_hash')
+    def pruned():
+        return jsonify({'data': ROW})
+
+    return app
+
+
+def test_rows_encode_consistently(app):
+    res = app.test_client().get('/_rows')
+    assert res.get_json() == {'data': EXPECTED}
+    assert app.json.loads(app.json.dumps(ROW)) == EXPECTED
+
+
+def test_json_exclude_prunes_at_any_depth(app):
+    data = app.test_client().get('/_pruned').get_json()['data']
+    assert 'password_hash' not in data
+    assert data['nested'] == [{'gpa': 3.25}]
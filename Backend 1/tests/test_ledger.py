@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+import pytest
+
+from app.database import ledger
+
+
+class LedgerCursor:
+    """Cursor that records statements and answers the ledger's lookups"""
+
+    def __init__(self, fee_row=None, section=None, charged=None):
+        self.fee_row = fee_row
+        self.section = section or {'semester': 'Fall', 'fee': Decimal('30000.00')}
+        self.charged = charged or {'entries': 0, 'net': 0}
+        self.queries = []
+        self.lastrowid = 77
+        self._next = None
+
+    def execute(self, query, params=None):
+        self.queries.append((' '.join(query.split()), params))
+        if 'FROM fee_details' in query and query.lstrip().startswith('SELECT'):
+            self._next = self.fee_row
+        elif 'FROM course_sections' in query:
+            self._next = self.section
+        elif 'FROM fee_ledger' in query:
+            self._next = self.charged
+        else:
+            self._next = None
+
+    def fetchone(self):
+        return self._next
+
+    def statements(self, prefix):
+        return [(q, p) for q, p in self.queries if q.startswith(prefix)]
+
+
+def test_charge_creates_missing_fee_row_and_moves_totals():
+    cursor = LedgerCursor(fee_row=None)
+    fee_id = ledger.post(cursor, 5, 'Fall', 'charge', '30000', enrollment_id=12)
+    assert fee_id == 77
+    assert len(cursor.statements('INSERT INTO fee_details')) == 1
+    (insert, params), = cursor.statements('INSERT INTO fee_ledger')
+    assert params == (5, 77, 'charge', 'tuition', Decimal('30000'), 12, None)
+    (update, params), = cursor.statements('UPDATE fee_details')
+    assert 'tuition_fee = IFNULL(tuition_fee, 0) + %s' in update and params[:2] == (Decimal('30000'), Decimal('30000'))
+    (balance, params), = cursor.statements('UPDATE students')
+    assert params == (Decimal('30000'), 5)
+    # no aggregation over the student's fee history
+    assert not [q for q, _ in cursor.queries if 'SUM(' in q]
+
+
+def test_payment_and_credit_reduce_the_balance():
+    cursor = LedgerCursor(fee_row={'fee_id': 3})
+    ledger.post(cursor, 5, 'Fall', 'payment', 1000, component='lab')
+    assert cursor.statements('INSERT INTO fee_ledger')[0][1][3] is None  # payments have no component
+    assert 'amount_paid = amount_paid + %s' in cursor.statements('UPDATE fee_details')[0][0]
+    ledger.post(cursor, 5, 'Fall', 'credit', 500, component=None)
+    assert [p for _, p in cursor.statements('UPDATE students')] == [(Decimal('-1000'), 5), (Decimal('-500'), 5)]
+    assert 'tuition_fee' not in cursor.statements('UPDATE fee_details')[1][0]
+
+
+def test_post_rejects_bad_entries():
+    with pytest.raises(ValueError):
+        ledger.post(LedgerCursor(), 1, 'Fall', 'refund', 10)
+    with pytest.raises(ValueError):
+        ledger.post(LedgerCursor(), 1, 'Fall', 'charge', -10)
+    with pytest.raises(ValueError):
+        ledger.post(LedgerCursor(), 1, 'Fall', 'charge', 10, component='parking')
+
+
+def test_credit_enrollment_reverses_what_was_charged():
+    cursor = LedgerCursor(fee_row={'fee_id': 3}, charged={'entries': 1, 'net': Decimal('25000.00')})
+    assert ledger.credit_enrollment(cursor, 5, 9, 12) == 'Fall'
+    (_, params), = cursor.statements('INSERT INTO fee_ledger')
+    assert params[2:6] == ('credit', 'tuition', Decimal('25000.00'), 12)
+
+    # already credited: nothing to post
+    cursor = LedgerCursor(fee_row={'fee_id': 3}, charged={'entries': 2, 'net': Decimal('0.00')})
+    ledger.credit_enrollment(cursor, 5, 9, 12)
+    assert cursor.statements('INSERT INTO fee_ledger') == []
+
+    # enrolled before the ledger: credit the course fee once, linked to the enrollment
+    cursor = LedgerCursor(fee_row={'fee_id': 3})
+    ledger.credit_enrollment(cursor, 5, 9, 12)
+    (_, params), = cursor.statements('INSERT INTO fee_ledger')
+    assert params[2:6] == ('credit', 'tuition', Decimal('30000.00'), 12)
+
+
+def test_reconcile_fix_rewrites_totals_from_ledger(monkeypatch, fake_transaction):
+    mismatch = {'student_id': 5, 'stored': Decimal('10'), 'expected': Decimal('0')}
+    monkeypatch.setattr(ledger, 'execute_query', lambda q, p=None: [mismatch] if q is ledger.BALANCE_CHECK_SQL else [])
+    cursor = LedgerCursor()
+    bumped = fake_transaction(ledger, cursor)
+    result = ledger.reconcile(fix=True)
+    assert result == {'balances': [mismatch], 'fees': [], 'enrollments': []}
+    assert [query for query, _ in cursor.queries] == [' '.join(q.split()) for q in (ledger.FIX_FEES_SQL, ledger.FIX_BALANCES_SQL)]
+    assert any('student:5' in scopes for scopes in bumped)
@@ -0,0 +1,56 @@
+from app import metrics
+from app.website import create_app
+
+
+def test_counter_and_histogram_render():
+    registry = metrics.Registry()
+    requests_total = registry.counter('demo_requests_total', 'Demo requests', ('route',))
+    latency = registry.histogram('demo_latency_seconds', 'Demo latency', buckets=(0.1, 1.0))
+    requests_total.inc(route='/a')
+    requests_total.inc(2, route='/a')
+    latency.observe(0.05)
+    latency.observe(5.0)
+    text = registry.render()
+    assert 'demo_requests_total{route="/a"} 3' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'demo_latency_seconds_count 2' in text
+
+
+def test_cache_hit_ratio_is_derived():
+    metrics.REGISTRY.reset()
+    metrics.record_cache_lookup('demo', True)
+    metrics.record_cache_lookup('demo', True)
+    metrics.record_cache_lookup('demo', False)
+    assert 'cache_hit_ratio{cache="demo"} 0.666667' in metrics.REGISTRY.render()
+
+
+def test_lock_error_kind():
+    assert metrics.lock_error_kind(Exception(1205, 'Lock wait timeout exceeded')) == 'lock_wait_timeout'
+    assert metrics.lock_error_kind(Exception(1213, 'Deadlock found')) == 'deadlock'
+    assert metrics.lock_error_kind(ValueError('Course section is full')) is None
+
+
+def test_metrics_endpoint_counts_requests():
+    metrics.REGISTRY.reset()
+    client = create_app().test_client()
+    assert client.get('/api/health').status_code == 200
+    res = client.get('/metrics')
+    assert res.status_code == 200
+    body = res.get_data(as_text=True)
+    assert 'http_requests_total{blueprint="views",endpoint="/api/health",method="GET",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{blueprint="views",endpoint="/api/health"} 1' in body
+
+
+def test_metrics_endpoint_is_local_only_without_a_token(monkeypatch):
+    from app.website import monitoring
+    client = create_app().test_client()
+    assert client.get('/metrics').status_code == 200  # test client: 127.0.0.1
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.5'}).status_code == 403
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.9'}).status_code == 403
+
+    monkeypatch.setattr(monitoring, 'METRICS_TOKEN', 's3cret')
+    remote = {'REMOTE_ADDR': '10.0.0.5'}
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', environ_base=remote, headers={'Authorization': 'Bearer s3cret'}).status_code == 200
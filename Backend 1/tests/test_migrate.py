@@ -0,0 +1,46 @@
+from app.database import migrate
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def execute(self, query, params=None):
+        self.queries.append(query)
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+    def cursor(self):
+        return self.cursor_obj
+    def commit(self):
+        pass
+    def close(self):
+        pass
+
+
+def test_discover_orders_baseline_first():
+    migrations = migrate.discover()
+    versions = [m['version'] for m in migrations]
+    assert versions[0] == '000'
+    assert versions == sorted(versions)
+    assert '001' in versions
+    assert all(len(m['checksum']) == 64 for m in migrations)
+
+
+def test_is_at_head_uses_a_single_query(monkeypatch):
+    migrations = migrate.discover()
+    rows = [{'version': m['version'], 'checksum': m['checksum']} for m in migrations]
+    conn = FakeConnection(rows)
+    monkeypatch.setattr(migrate, 'get_connection', lambda: conn)
+    assert migrate.is_at_head(migrations)
+    assert len(conn.cursor_obj.queries) == 1
+    conn.cursor_obj.rows = rows[:-1]
+    assert not migrate.is_at_head(migrations)
@@ -0,0 +1,137 @@
+import re
+from decimal import Decimal
+
+import pytest
+
+from app.database import payments
+from app.website import create_app
+from app.website.auth import generate_token
+
+CSV = """student_code,semester,amount,reference
+25-0001,Fall,30000,TRX-1
+25-0001,,45000,TRX-2
+25-0002,Spring,abc,TRX-3
+25-0003,Fall,100,TRX-4
+25-0002,Spring,5000,TRX-5
+"""
+
+
+def _fee(fee_id, student_id, code, semester, due, paid=0):
+    return {'fee_id': fee_id, 'student_id': student_id, 'student_code': code, 'semester': semester,
+            'amount_due': Decimal(due), 'amount_paid': Decimal(paid)}
+
+
+FEES = [
+    _fee(1, 10, '25-0001', 'Spring', '20000', '20000'),
+    _fee(2, 10, '25-0001', 'Fall', '60000'),
+    _fee(3, 11, '25-0002', 'Spring', '10000', '8000'),
+]
+
+
+def test_parse_csv_reports_bad_rows():
+    transactions, invalid = payments.parse_csv(CSV)
+    assert [t['line'] for t in transactions] == [2, 3, 5, 6]
+    assert invalid == [{'line': 4, 'reason': "invalid amount 'abc'"}]
+    with pytest.raises(ValueError):
+        payments.parse_csv("code,sum\n1,2\n")
+
+
+def test_parse_csv_rejects_non_finite_and_out_of_range_amounts():
+    transactions, invalid = payments.parse_csv(
+        "student_code,amount\n25-0001,NaN\n25-0001,Infinity\n25-0001,-inf\n25-0001,1e9\n"
+        "25-0001,99999999.99\n25-0001,12.345\n25-0001,0.001\n")
+    assert [row['line'] for row in invalid] == [2, 3, 4, 5, 8]
+    assert [t['amount'] for t in transactions] == [Decimal('99999999.99'), Decimal('12.35')]
+
+
+def _apply_set(sql, fee, paid):
+    """Apply the SET list of sql to fee left to right, the way MySQL does for a single-table UPDATE"""
+    assignments = re.split(r',\s*(?=f\.\w+ =)', ' '.join(sql.split(' SET ', 1)[1].split()))
+
+    def evaluate(expr):
+        case = re.fullmatch(r'CASE (.*) ELSE (.*) END', expr)
+        if case:
+            for condition, value in re.findall(r'WHEN (.+?) THEN (\S+)', case[1]):
+                if evaluate(condition):
+                    return evaluate(value)
+            return evaluate(case[2])
+        expr = re.sub(r'IFNULL\((f\.\w+), 0\)', r'(\1 or 0)', expr).replace('CURDATE()', "'today'")
+        expr = re.sub(r'(?<![<>!])=', '==', re.sub(r'f\.(\w+)', r'fee["\1"]', expr).replace('p.paid', 'paid'))
+        return eval(expr, {'fee': fee, 'paid': paid})
+
+    for assignment in assignments:
+        column, expr = assignment.split(' = ', 1)
+        fee[column[2:]] = evaluate(expr)
+    return fee
+
+
+def test_partial_payment_leaves_the_fee_pending():
+    fee = _apply_set(payments.APPLY_FEES_SQL, {'amount_due': Decimal('60000'), 'amount_paid': Decimal('20000'),
+                                               'status': 'pending', 'payment_date': None}, Decimal('30000'))
+    assert fee['amount_paid'] == Decimal('50000') and fee['status'] == 'pending'
+    fee = _apply_set(payments.APPLY_FEES_SQL, fee, Decimal('10000'))
+    assert fee['amount_paid'] == Decimal('60000') and fee['status'] == 'paid'
+
+
+class IndexCursor:
+    def __init__(self, fees, seen=()):
+        self.fees = fees
+        self.seen = seen
+        self.queries = []
+        self.lastrowid = 900
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if 'FROM fee_details f' in query:
+            self._rows = [dict(f) for f in self.fees if f['student_code'] in params]
+        elif 'SELECT DISTINCT reference' in query:
+            self._rows = [{'reference': r} for r in self.seen if r in params]
+        else:
+            self._rows = []
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_allocate_partial_full_and_overpayments():
+    transactions, _ = payments.parse_csv(CSV)
+    index = payments.build_index(IndexCursor(FEES), [t['student_code'] for t in transactions])
+    entries, unmatched, overpaid = payments.allocate(transactions, index)
+    assert entries == [
+        (10, 2, Decimal('30000'), 'TRX-1'),   # partial payment of the Fall record
+        (10, 2, Decimal('45000'), 'TRX-2'),   # no semester: Spring is settled, the rest of Fall + 15000 credit
+        (11, 3, Decimal('5000'), 'TRX-5'),
+    ]
+    assert unmatched[0]['student_code'] == '25-0003'
+    assert [(o['line'], o['amount']) for o in overpaid] == [(3, Decimal('15000')), (6, Decimal('3000'))]
+
+
+def test_import_is_set_based_and_skips_known_references(fake_transaction):
+    cursor = IndexCursor(FEES, seen=('TRX-1',))
+    bumped = fake_transaction(payments, cursor)
+    report = payments.import_payments(CSV, log=lambda *a: None)
+
+    assert report['duplicates'] == [{'line': 2, 'reference': 'TRX-1'}]
+    assert report['entries'] == 2 and report['students'] == 2
+    assert report['amount'] == Decimal('50000')
+    inserts = [q for q, _ in cursor.queries if q.startswith('INSERT INTO fee_ledger')]
+    assert len(inserts) == 1  # one multi-row statement
+    assert [q for q, _ in cursor.queries].count(payments.APPLY_FEES_SQL) == 1
+    assert [q for q, _ in cursor.queries].count(payments.APPLY_BALANCES_SQL) == 1
+    assert ('student:10', 'student:11') in bumped
+
+
+def test_import_route(monkeypatch):
+    client = create_app().test_client()
+    admin = {'Authorization': f"Bearer {generate_token(1, 'admin', 'admin')}"}
+    student = {'Authorization': f"Bearer {generate_token(2, 'ali', 'student')}"}
+    assert client.post('/api/admin/fees/import', headers=student).status_code == 403
+    assert client.post('/api/admin/fees/import', headers=admin).status_code == 400
+
+    calls = []
+    monkeypatch.setattr(payments, 'import_payments',
+                        lambda text, dry_run=False, log=None: calls.append((text, dry_run)) or {'entries': 0})
+    res = client.post('/api/admin/fees/import?dry_run=1', headers=admin, data=CSV.encode(), content_type='text/csv')
+    assert res.status_code == 200 and res.get_json()['dry_run'] is True
+    assert calls == [(CSV, True)]
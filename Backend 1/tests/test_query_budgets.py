@@ -0,0 +1,110 @@
+"""
+Statement/connection budgets for the hot endpoints.
+
+Runs against TEST_DB_NAME (default student_portal_test), which is migrated
+and filled with a small synthetic dataset on first use, so the N+1 shapes
+that only show with many rows (students x enrollments, semesters) are
+exercised. Raise a budget only together with a reason in the commit.
+"""
+import os
+import pytest
+
+from app.database.connection import DB_CONFIG, get_connection, execute_query
+from app.website import create_app
+from app.website.auth import generate_token
+
+TEST_DB_NAME = os.getenv('TEST_DB_NAME', 'student_portal_test')
+
+
+def is_mysql_available():
+    try:
+        conn = get_connection()
+        conn.close()
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not is_mysql_available(), reason='MySQL not available')
+
+
+@pytest.fixture(scope='module')
+def seeded():
+    from app.database import datagen
+    from app.database.migrate import migrate
+    original = DB_CONFIG['database']
+    DB_CONFIG['database'] = TEST_DB_NAME
+    try:
+        migrate()
+        if not execute_query("SELECT 1 FROM users LIMIT 1"):
+            datagen.generate({'students': 400, 'faculty_per_dept': 4, 'courses_per_dept': 8, 'class_days': 10},
+                             ('Fall', 2025), log=lambda *a: None)
+        student = execute_query("""
+            SELECT s.student_id, s.user_id, u.username FROM students s JOIN users u ON u.user_id = s.user_id
+            WHERE EXISTS (SELECT 1 FROM transcript t WHERE t.student_id = s.student_id)
+              AND EXISTS (SELECT 1 FROM enrollments e WHERE e.student_id = s.student_id AND e.status = 'enrolled')
+            ORDER BY s.student_id LIMIT 1
+        """)[0]
+        section = execute_query("""
+            SELECT cs.section_id, f.user_id, u.username FROM course_sections cs
+            JOIN faculty f ON f.faculty_id = cs.faculty_id JOIN users u ON u.user_id = f.user_id
+            WHERE cs.is_active = TRUE AND EXISTS (SELECT 1 FROM enrollments e WHERE e.section_id = cs.section_id)
+            ORDER BY cs.section_id LIMIT 1
+        """)[0]
+        admin = execute_query("SELECT user_id, username FROM users WHERE role = 'admin' LIMIT 1")[0]
+        yield {
+            'student': {'Authorization': f"Bearer {generate_token(student['user_id'], student['username'], 'student')}"},
+            'faculty': {'Authorization': f"Bearer {generate_token(section['user_id'], section['username'], 'faculty')}"},
+            'admin': {'Authorization': f"Bearer {generate_token(admin['user_id'], admin['username'], 'admin')}"},
+            'section_id': section['section_id'],
+        }
+    finally:
+        DB_CONFIG['database'] = original
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+def test_student_dashboard_budget(seeded, client, query_budget):
+    # warm: announcements cost two version lookups once the feed cache is filled
+    client.get('/api/student/dashboard', headers=seeded['student'])
+    with query_budget(queries=7, connections=7):
+        res = client.get('/api/student/dashboard', headers=seeded['student'])
+    assert res.status_code == 200
+
+
+def test_student_transcript_budget(seeded, client, query_budget):
+    # SGPAs come from one GROUP BY, not one query per semester
+    with query_budget(queries=5, connections=5):
+        res = client.get('/api/student/transcript', headers=seeded['student'])
+    assert res.status_code == 200
+    assert len(res.get_json()['data']['semesters']) > 1
+
+
+def test_admin_course_management_budget(seeded, client, query_budget):
+    # constant in the number of students (was one enrollment query per student)
+    with query_budget(queries=2, connections=2):
+        res = client.get('/api/admin/course-management/students', headers=seeded['admin'])
+    assert res.status_code == 200
+    students = res.get_json()['data']['students']
+    assert len(students) >= 400
+    assert any(s['enrollments'] for s in students)
+
+
+def test_faculty_course_attendance_budget(seeded, client, query_budget):
+    url = f"/api/faculty/courses/{seeded['section_id']}/attendance"
+    with query_budget(queries=1, connections=1):
+        assert client.get(url, headers=seeded['faculty']).status_code == 200
+    with query_budget(queries=1, connections=1):
+        assert client.get(url + '?date=2025-09-01', headers=seeded['faculty']).status_code == 200
+
+
+def test_faculty_dashboard_budget(seeded, client, query_budget):
+    # warm: profile + two version lookups, however many sections are taught
+    client.get('/api/faculty/dashboard', headers=seeded['faculty'])
+    with query_budget(queries=3, connections=3):
+        res = client.get('/api/faculty/dashboard', headers=seeded['faculty'])
+    assert res.status_code == 200
+    assert all('enrolled_students' in c for c in res.get_json()['data']['teaching_courses'])
@@ -0,0 +1,62 @@
+from app.database import salaries
+from app.website.models import AdminModel, CourseModel
+
+
+class SalaryCursor:
+    def __init__(self, rowcount=1):
+        self.queries = []
+        self.rowcount = rowcount
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+
+
+def test_recompute_is_one_statement_for_all_affected(fake_transaction):
+    cursor = SalaryCursor(rowcount=2)
+    bumped = fake_transaction(salaries, cursor)
+    assert salaries.recompute(faculty_ids=[3, None, 1, 3], course_ids=[9]) == 2
+    assert len(cursor.queries) == 1
+    query, params = cursor.queries[0]
+    assert query.strip().startswith('UPDATE faculty f')
+    # faculty ids and course ids, once for the aggregation and once for the updated rows
+    assert params == (1, 3, 9, 1, 3, 9)
+    assert query.count('SELECT faculty_id FROM course_sections WHERE course_id IN (%s)') == 2
+    assert bumped == [('faculty',)]
+
+
+def test_recompute_without_changes_does_nothing(fake_transaction):
+    cursor = SalaryCursor(rowcount=0)
+    bumped = fake_transaction(salaries, cursor)
+    assert salaries.recompute() == 0
+    assert cursor.queries == []
+    assert salaries.recompute(faculty_ids=[5]) == 0
+    assert bumped == []
+
+
+def test_deferred_batches_touches_into_one_statement(fake_transaction):
+    cursor = SalaryCursor()
+    fake_transaction(salaries, cursor)
+    with salaries.deferred():
+        for faculty_id in (4, 2, 4):
+            salaries.touch(faculty_ids=[faculty_id])
+        with salaries.deferred():
+            salaries.touch(course_ids=[7])
+        assert cursor.queries == []
+    assert len(cursor.queries) == 1
+    assert cursor.queries[0][1] == (2, 4, 7, 2, 4, 7)
+    salaries.touch(faculty_ids=[8])
+    assert cursor.queries[1][1] == (8, 8)
+
+
+def test_section_setup_and_course_fee_changes_touch_salaries(monkeypatch):
+    touched = []
+    monkeypatch.setattr(salaries, 'touch', lambda faculty_ids=(), course_ids=(): touched.append((list(faculty_ids), list(course_ids))))
+    monkeypatch.setattr('app.website.models.execute_query', lambda q, p=None, fetch=True: [{'faculty_id': 2}])
+    monkeypatch.setattr('app.website.models.versions.bump', lambda *scopes: None)
+
+    assert AdminModel.update_course_section(10, room='B-12')
+    assert AdminModel.update_course_section(10, faculty_id=5)
+    assert CourseModel.update_course(7, course_name='Algorithms')
+    assert CourseModel.update_course(7, fee_per_credit=12000)
+    assert not CourseModel.update_course(7, seats=8)
+    assert touched == [([2, 5], []), ([], [7])]
@@ -0,0 +1,72 @@
+from app.database import slow_queries
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def execute(self, query, params=None):
+        self.log.append(query)
+    def fetchall(self):
+        return [{'table': 'attendance', 'type': 'ALL'}]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+    def cursor(self, cursorclass=None):
+        return FakeCursor(self.log)
+
+
+def test_normalize_sql_collapses_literals_and_in_lists():
+    sql = """
+        SELECT * FROM attendance  -- per section
+        WHERE section_id = %s AND status = 'present' AND student_id IN (1, 2, 3) LIMIT 10
+    """
+    assert slow_queries.normalize_sql(sql) == (
+        "SELECT * FROM attendance WHERE section_id = ? AND status = ? AND student_id IN (?+) LIMIT ?"
+    )
+
+
+def test_params_fingerprint_hides_values():
+    fp = slow_queries.params_fingerprint((42, 'Fall'))
+    assert fp['count'] == 2
+    assert fp['types'] == ['int', 'str']
+    assert 'Fall' not in str(fp)
+
+
+def test_record_explains_once_per_fingerprint(monkeypatch):
+    monkeypatch.setattr(slow_queries, 'SLOW_QUERY_MS', 10)
+    slow_queries.clear()
+    conn = FakeConnection()
+    query = "SELECT COUNT(*) FROM attendance WHERE section_id = %s"
+    assert not slow_queries.record(query, (1,), 0.001, conn)
+    assert slow_queries.record(query, (1,), 0.5, conn)
+    assert slow_queries.record(query, (2,), 0.7, conn)
+    assert conn.log == ['EXPLAIN ' + query]
+    summary = slow_queries.get_summary()
+    assert len(summary) == 1
+    assert summary[0]['count'] == 2
+    assert summary[0]['max_ms'] == 700.0
+    assert summary[0]['plan'][0]['type'] == 'ALL'
+    slow_queries.clear()
+
+
+def test_plan_cache_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(slow_queries, 'SLOW_QUERY_MS', 10)
+    monkeypatch.setattr(slow_queries, 'SLOW_QUERY_PLANS', 2)
+    slow_queries.clear()
+    conn = FakeConnection()
+    queries = [f"SELECT * FROM t{n} WHERE id = %s" for n in ('a', 'b', 'c')]
+    slow_queries.record(queries[0], (1,), 0.5, conn)
+    slow_queries.record(queries[1], (1,), 0.5, conn)
+    slow_queries.record(queries[0], (1,), 0.5, conn)  # seen again: most recent
+    slow_queries.record(queries[2], (1,), 0.5, conn)  # evicts queries[1]
+    fingerprints = [slow_queries.fingerprint(slow_queries.normalize_sql(q)) for q in queries]
+    assert list(slow_queries._plans) == [fingerprints[0], fingerprints[2]]
+    slow_queries.record(queries[1], (1,), 0.5, conn)  # explained again after eviction
+    assert len(conn.log) == 4 and len(slow_queries._plans) == 2
+    slow_queries.clear()
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from app.database import sql_script, migrate
+
+
+class FakeCursor:
+    """Runs ';\\n'-joined batches; statements containing FAIL raise like the server"""
+    def __init__(self, log):
+        self.log = log
+        self.pending = []
+    def execute(self, sql):
+        self.log.append(sql)
+        self.pending = sql.split(';\n')
+        self._next()
+    def nextset(self):
+        if not self.pending:
+            return None
+        self._next()
+        return True
+    def _next(self):
+        statement = self.pending.pop(0)
+        if 'FAIL' in statement:
+            self.pending = []
+            raise Exception(1050, f"Table '{statement.split()[-1]}' already exists" if 'EXISTS' in statement else 'syntax error')
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+        self.commits = 0
+    def cursor(self, cursorclass=None):
+        return FakeCursor(self.log)
+    def commit(self):
+        self.commits += 1
+    def rollback(self):
+        pass
+
+
+def test_iter_statements_respects_strings_and_comments():
+    script = """
+    -- leading comment; not a statement
+    INSERT INTO announcements (title, content) VALUES ('a;b', 'This week''s lab; moved');
+    /* block; comment */ INSERT INTO t VALUES ("x\\";y"); # trailing; comment
+    SELECT `odd;name` FROM t;
+    SELECT 1 --not-a-comment
+    ;
+    """
+    assert list(sql_script.iter_statements(script)) == [
+        "INSERT INTO announcements (title, content) VALUES ('a;b', 'This week''s lab; moved')",
+        'INSERT INTO t VALUES ("x\\";y")',
+        'SELECT `odd;name` FROM t',
+        'SELECT 1 --not-a-comment',
+    ]
+
+
+def test_iter_statements_handles_delimiter_blocks():
+    script = """CREATE TABLE t (id INT);
+DELIMITER $$
+CREATE TRIGGER trg BEFORE INSERT ON t FOR EACH ROW
+BEGIN
+    SET NEW.id = NEW.id + 1;
+END$$
+DELIMITER ;
+INSERT INTO t VALUES (1);
+"""
+    statements = list(sql_script.iter_statements(script))
+    assert len(statements) == 3
+    assert statements[1].startswith('CREATE TRIGGER') and statements[1].endswith('END')
+    assert statements[2] == 'INSERT INTO t VALUES (1)'
+
+
+def test_execute_script_batches_and_resumes_after_ignored_error():
+    conn = FakeConnection()
+    script = "INSERT 1; CREATE FAIL EXISTS t1; INSERT 2; INSERT 3;"
+    stats = sql_script.execute_script(script, conn=conn, ignore=('already exists',), batch_statements=10)
+    assert stats == {'statements': 3, 'batches': 2, 'ignored': 1, 'failed': 0}
+    assert conn.log == ['INSERT 1;\nCREATE FAIL EXISTS t1;\nINSERT 2;\nINSERT 3', 'INSERT 2;\nINSERT 3']
+
+
+def test_execute_script_strict_mode_fails_fast():
+    conn = FakeConnection()
+    with pytest.raises(sql_script.ScriptError) as err:
+        sql_script.execute_script("INSERT 1; SELECT FAIL; INSERT 2;", conn=conn)
+    assert err.value.number == 2
+
+
+@pytest.mark.parametrize('filename', migrate.BASELINE_FILES)
+def test_baseline_scripts_tokenize_without_comment_text(filename):
+    path = os.path.join(migrate.DATABASE_DIR, filename)
+    with open(path, encoding='utf-8') as f:
+        statements = list(sql_script.iter_statements(f, legacy_comments=True))
+    ddl = [s for s in statements if s.upper().startswith(('CREATE TABLE', 'ALTER'))]
+    assert ddl
+    for statement in statements:
+        assert '--' not in statement, statement
+        assert statement.split()[0].upper() in ('CREATE', 'ALTER', 'INSERT', 'UPDATE', 'DROP', 'SET', 'USE', 'DELETE'), statement
+    assert migrate.discover()[0]['legacy_comments'] and not any(m['legacy_comments'] for m in migrate.discover()[1:])
+
+
+def test_ignore_matches_error_codes_not_similar_messages():
+    class CodedCursor(FakeCursor):
+        def _next(self):
+            statement = self.pending.pop(0)
+            if 'DUP' in statement:
+                self.pending = []
+                code = 1061 if 'KEY' in statement else 1062
+                raise Exception(code, f"Duplicate {'key name' if code == 1061 else 'entry'} 'x'")
+
+    class CodedConnection(FakeConnection):
+        def cursor(self, cursorclass=None):
+            return CodedCursor(self.log)
+
+    stats = sql_script.execute_script("CREATE DUP KEY; INSERT 1;", conn=CodedConnection(), ignore=migrate._ALREADY_APPLIED)
+    assert stats['ignored'] == 1
+    with pytest.raises(sql_script.ScriptError) as err:
+        sql_script.execute_script("INSERT DUP ROW; INSERT 1;", conn=CodedConnection(), ignore=migrate._ALREADY_APPLIED)
+    assert err.value.number == 1
@@ -79,20 +79,45 @@ def test_generate_student_code_for_year_basic():
     assert code.endswith('-001')
 
 
-def test_mark_fee_paid_recomputes(monkeypatch):
-    called = {'recomputed': False}
+def test_mark_fee_paid_posts_payment(monkeypatch):
+    posted = []
+
+    class Cur:
+        def execute(self, *args, **kwargs):
+            return None
+        def fetchone(self):
+            return {'student_id': 99, 'semester': 'Fall', 'amount_due': 60000, 'amount_paid': 20000}
+
+    class DummyCtxMgr:
+        def __enter__(self):
+            return ('conn', Cur())
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+    monkeypatch.setattr('app.website.models.transaction', lambda: DummyCtxMgr())
+    monkeypatch.setattr('app.website.models.versions.bump', lambda *scopes: True)
+    monkeypatch.setattr('app.website.models.ledger.post', lambda cursor, *args, **kwargs: posted.append((args, kwargs)))
+    monkeypatch.setattr('app.website.models.StudentModel.compute_and_update_fee_for_semester',
+                        lambda *a: pytest.fail('payments must not recompute fees'))
+    from app.website.models import DepartmentModel
+    assert DepartmentModel.mark_fee_paid(1)
+    assert posted == [((99, 'Fall', 'payment', 40000), {'fee_id': 1, 'memo': 'marked paid'})]
+
+
+def test_get_enrollments_by_student_groups_one_query(monkeypatch):
+    calls = []
 
     def fake_execute(query, *args, **kwargs):
-        if 'SELECT student_id, semester FROM fee_details' in query:
-            return [{'student_id': 99, 'semester': 'Fall'}]
-        return []
+        calls.append(query)
+        return [
+            {'student_id': 1, 'enrollment_id': 10, 'course_code': 'CS101'},
+            {'student_id': 2, 'enrollment_id': 11, 'course_code': 'CS101'},
+            {'student_id': 1, 'enrollment_id': 12, 'course_code': 'CS201'},
+        ]
 
     monkeypatch.setattr('app.website.models.execute_query', fake_execute)
-    def fake_compute(student_id, semester):
-        called['recomputed'] = True
-        return True
-    monkeypatch.setattr('app.website.models.StudentModel.compute_and_update_fee_for_semester', fake_compute)
-    from app.website.models import DepartmentModel
-    res = DepartmentModel.mark_fee_paid(1)
-    assert res
-    assert called['recomputed']
+    from app.website.models import CourseModel
+    grouped = CourseModel.get_enrollments_by_student()
+    assert len(calls) == 1
+    assert [e['enrollment_id'] for e in grouped[1]] == [10, 12]
+    assert 'student_id' not in grouped[2][0]
@@ -0,0 +1,50 @@
+import pytest
+
+from app.database import versions
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """In-memory table_versions behind versions.execute_query"""
+    data, calls = {}, []
+
+    def fake_execute(query, params=None, fetch=True):
+        calls.append(query)
+        if query.startswith('INSERT INTO table_versions'):
+            for scope in params:
+                data[scope] = data.get(scope, 0) + 1
+            return None
+        return [{'scope': s, 'version': data[s]} for s in params if s in data]
+
+    monkeypatch.setattr(versions, 'execute_query', fake_execute)
+    monkeypatch.setattr(versions, 'VERSION_CACHE_TTL', 0)
+    versions.clear_cache()
+    yield data, calls
+    versions.clear_cache()
+
+
+def test_bump_and_token(store):
+    data, calls = store
+    assert versions.token('enrollments', 'section:3') == 'enrollments.0;section:3.0'
+    versions.bump('enrollments', versions.section(3), versions.section(3), None)
+    assert data == {'enrollments': 1, 'section:3': 1}
+    assert versions.token('enrollments', 'section:3') == 'enrollments.1;section:3.1'
+
+
+def test_reads_are_cached_until_a_local_bump(store, monkeypatch):
+    data, calls = store
+    monkeypatch.setattr(versions, 'VERSION_CACHE_TTL', 60)
+    versions.get('courses')
+    versions.get('courses')
+    assert len(calls) == 1
+    versions.bump('courses')
+    assert versions.get('courses') == {'courses': 1}
+
+
+def test_unavailable_table_gives_no_token(monkeypatch):
+    def broken(*a, **k):
+        raise RuntimeError("Table 'table_versions' doesn't exist")
+    monkeypatch.setattr(versions, 'execute_query', broken)
+    versions.clear_cache()
+    assert versions.token('courses') is None
+    assert versions.bump('courses') is False
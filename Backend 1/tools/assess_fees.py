@@ -0,0 +1,44 @@
+"""
+Assess tuition for a whole semester in one batch
+Runs with: python tools/assess_fees.py --semester Fall [--due-date 2025-10-01] [--chunk-size 1000] [--dry-run]
+
+Computes every enrolled student's tuition for the semester with one grouped
+query and posts only the differences to fee_details, the fee ledger and
+students.fee_balance (app/database/billing.py). --dry-run prints what would
+change without writing. Safe to re-run.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+import datetime
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import billing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch tuition assessment for one semester')
+    parser.add_argument('--semester', required=True, choices=['Fall', 'Spring', 'Summer'])
+    parser.add_argument('--due-date', type=datetime.date.fromisoformat, help='due date for fee records created by this run (YYYY-MM-DD)')
+    parser.add_argument('--chunk-size', type=int, default=billing.CHUNK_SIZE, help='rows per multi-row statement')
+    parser.add_argument('--dry-run', action='store_true', help='report the changes without writing them')
+    args = parser.parse_args()
+
+    try:
+        summary = billing.assess_semester(args.semester, due_date=args.due_date, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Assessment failed: {e}")
+        return 1
+    if args.dry_run:
+        print(f"Dry run: {summary['students']:,} students would change; nothing was written")
+    else:
+        print(f"✅ {summary['students']:,} students assessed in {summary['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
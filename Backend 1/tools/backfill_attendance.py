@@ -0,0 +1,47 @@
+"""
+Copy attendance rows into the packed attendance bitsets
+Runs with: python tools/backfill_attendance.py [--section 12 ...] [--verify]
+
+Rollout of ATTENDANCE_STORAGE=bitmap (app/database/attendance_store.py):
+1. apply migration 007 and run the app with ATTENDANCE_STORAGE=both
+2. run this tool; it rebuilds the bitsets from the rows, one transaction per
+   section, and can be re-run at any time
+3. --verify lists students whose bitsets disagree with their rows (exit 1)
+4. switch to ATTENDANCE_STORAGE=bitmap
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import attendance_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill attendance bitsets from attendance rows')
+    parser.add_argument('--section', type=int, action='append', dest='sections', help='only these section ids (repeatable)')
+    parser.add_argument('--chunk-size', type=int, default=attendance_store.CHUNK_SIZE, help='bitset rows per multi-row statement')
+    parser.add_argument('--verify', action='store_true', help='only compare the bitsets with the rows')
+    parser.add_argument('--limit', type=int, default=20, help='mismatches listed with --verify')
+    args = parser.parse_args()
+
+    try:
+        if args.verify:
+            rows = attendance_store.verify()
+            print(f"{len(rows)} mismatch(es)")
+            for row in rows[:args.limit]:
+                print('  ', ', '.join(f"{k}={v}" for k, v in row.items()))
+            return 1 if rows else 0
+        attendance_store.backfill(args.sections, chunk_size=args.chunk_size)
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
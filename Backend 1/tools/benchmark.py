@@ -0,0 +1,391 @@
+"""
+Endpoint benchmark - latency percentiles and query counts for every route
+
+Boots the app with create_app() and drives it through Flask's test client
+(no HTTP server, no network noise) against a dedicated database filled by
+app/database/datagen.py. Every GET route of the views/auth blueprints is
+measured; write routes with a safe, repeatable scenario are measured with
+--writes. Results are stored as JSON and can be compared with a baseline.
+
+Database:
+- default: the server from app/.env, database --database (student_portal_bench)
+- --spawn: start a throwaway mariadbd/mysqld with a temporary datadir
+  (must be installed locally, no container needed) and remove it afterwards
+
+Run: python tools/benchmark.py --spawn --students 2000 --output bench.json
+     python tools/benchmark.py --skip-seed --compare bench.json
+Exit status is 1 when --compare finds a regression.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import re
+import json
+import time
+import shutil
+import socket
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+import pymysql
+
+from app.database.connection import DB_CONFIG, execute_query, track_queries
+
+BENCH_BLUEPRINTS = ('views', 'auth')
+
+
+class LocalMySQL:
+    """A throwaway MariaDB/MySQL server in a temporary datadir"""
+
+    SERVERS = ('mariadbd', 'mysqld')
+    INSTALLERS = ('mariadb-install-db', 'mysql_install_db')
+
+    def __init__(self, port=None):
+        self.port = port or self._free_port()
+        self.datadir = None
+        self.process = None
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()[1]
+
+    @staticmethod
+    def _find(names):
+        for name in names:
+            path = shutil.which(name) or next((p for p in (f'/usr/sbin/{name}', f'/usr/libexec/{name}') if os.path.exists(p)), None)
+            if path:
+                return path
+        return None
+
+    def start(self, timeout=60):
+        server = self._find(self.SERVERS)
+        if not server:
+            raise RuntimeError("No mariadbd/mysqld binary found; install MariaDB or MySQL server, or run without --spawn")
+        self.datadir = tempfile.mkdtemp(prefix='portal-bench-')
+        user = ['--user=root'] if hasattr(os, 'geteuid') and os.geteuid() == 0 else []
+        installer = self._find(self.INSTALLERS)
+        if installer and 'mariadb' in os.path.basename(server):
+            init = [installer, '--no-defaults', f'--datadir={self.datadir}', '--auth-root-authentication-method=normal', '--skip-test-db'] + user
+        else:
+            init = [server, '--no-defaults', '--initialize-insecure', f'--datadir={self.datadir}'] + user
+        subprocess.run(init, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.process = subprocess.Popen(
+            [server, '--no-defaults', f'--datadir={self.datadir}', f'--port={self.port}', '--bind-address=127.0.0.1',
+             f'--socket={os.path.join(self.datadir, "mysqld.sock")}', '--local-infile=1',
+             '--innodb-buffer-pool-size=512M', '--innodb-flush-log-at-trx-commit=2', '--skip-log-bin'] + user,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{server} exited with code {self.process.returncode}")
+            try:
+                pymysql.connect(host='127.0.0.1', port=self.port, user='root', password='').close()
+                return self
+            except pymysql.err.OperationalError:
+                time.sleep(0.5)
+        raise RuntimeError(f"{server} did not accept connections within {timeout}s")
+
+    def configure(self, database):
+        DB_CONFIG.update(host='127.0.0.1', port=self.port, user='root', password='', database=database)
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.datadir:
+            shutil.rmtree(self.datadir, ignore_errors=True)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _one(query, params=()):
+    rows = execute_query(query, params)
+    return rows[0] if rows else None
+
+
+def load_context():
+    """Sample users and ids from the benchmark database"""
+    section = _one("""
+        SELECT cs.section_id, cs.faculty_id, cs.semester, cs.year, f.user_id AS faculty_user_id, f.faculty_code
+        FROM course_sections cs
+        JOIN faculty f ON f.faculty_id = cs.faculty_id
+        JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+        WHERE cs.is_active = TRUE
+        GROUP BY cs.section_id, cs.faculty_id, cs.semester, cs.year, f.user_id, f.faculty_code
+        ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    if not section:
+        raise RuntimeError("No active section with enrollments - seed the database first")
+    student = _one("""
+        SELECT s.student_id, s.user_id, s.student_code FROM enrollments e JOIN students s ON s.student_id = e.student_id
+        WHERE e.section_id = %s AND e.status = 'enrolled' ORDER BY s.student_id LIMIT 1
+    """, (section['section_id'],))
+    admin = _one("SELECT user_id, username FROM users WHERE role = 'admin' ORDER BY user_id LIMIT 1")
+    fa_date = _one("SELECT attendance_date FROM faculty_attendance ORDER BY attendance_date DESC LIMIT 1")
+    # an open section plus students of its department who are not in it, for enroll/drop
+    open_section = _one("""
+        SELECT cs.section_id, c.department_id FROM course_sections cs JOIN courses c ON c.course_id = cs.course_id
+        LEFT JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+        WHERE cs.is_active = TRUE GROUP BY cs.section_id, c.department_id, cs.max_capacity
+        HAVING COUNT(e.enrollment_id) < cs.max_capacity ORDER BY COUNT(e.enrollment_id) LIMIT 1
+    """)
+    movers = []
+    if open_section:
+        movers = execute_query("""
+            SELECT s.student_id, s.user_id, s.student_code FROM students s
+            WHERE s.major_dept_id = %s AND NOT EXISTS (
+                SELECT 1 FROM enrollments e WHERE e.student_id = s.student_id AND e.section_id = %s)
+            ORDER BY s.student_id LIMIT 500
+        """, (open_section['department_id'], open_section['section_id']))
+    return {
+        'section_id': section['section_id'],
+        'faculty_id': section['faculty_id'],
+        'semester': section['semester'],
+        'year': section['year'],
+        'student_id': student['student_id'],
+        'date': (fa_date['attendance_date'] if fa_date else datetime.date.today()).isoformat(),
+        'users': {
+            'admin': (admin['user_id'], admin['username'], 'admin'),
+            'faculty': (section['faculty_user_id'], section['faculty_code'], 'faculty'),
+            'student': (student['user_id'], student['student_code'], 'student'),
+        },
+        'open_section_id': open_section['section_id'] if open_section else None,
+        'movers': [(m['user_id'], m['student_code'], 'student') for m in movers],
+    }
+
+
+def role_for(rule):
+    if rule.startswith(('/api/admin', '/api/debug')):
+        return 'admin'
+    if rule.startswith('/api/faculty'):
+        return 'faculty'
+    if rule.startswith('/api/health'):
+        return None
+    return 'student'
+
+
+def query_args(rule, ctx):
+    if rule == '/api/courses/check-seats':
+        return {'section_id': ctx['section_id']}
+    if rule == '/api/courses/available':
+        return {'semester': ctx['semester'], 'year': ctx['year']}
+    return {}
+
+
+def write_cases(ctx):
+    """(method, rule) -> function(i) returning (user, url, json body) for iteration i"""
+    student = ctx['users']['student']
+    cases = {
+        ('POST', '/api/auth/login'): lambda i: (None, '/api/auth/login', {'username': student[1], 'password': 'password123'}),
+        ('POST', '/api/faculty/attendance/mark'): lambda i: (ctx['users']['faculty'], '/api/faculty/attendance/mark', {
+            'student_id': ctx['student_id'], 'section_id': ctx['section_id'], 'date': ctx['date'],
+            'status': 'present' if i % 2 == 0 else 'absent'}),
+    }
+    if ctx['open_section_id'] and ctx['movers']:
+        # each iteration uses a different student, so enroll/drop never collide with a previous run
+        movers = ctx['movers']
+        cases[('POST', '/api/courses/enroll')] = lambda i: (movers[i % len(movers)], '/api/courses/enroll', {'section_id': ctx['open_section_id']})
+        cases[('POST', '/api/courses/drop')] = lambda i: (movers[i % len(movers)], '/api/courses/drop', {'section_id': ctx['open_section_id']})
+    return cases
+
+
+def discover_routes(app):
+    routes = []
+    for rule in app.url_map.iter_rules():
+        blueprint = rule.endpoint.split('.')[0] if '.' in rule.endpoint else None
+        if blueprint not in BENCH_BLUEPRINTS:
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            routes.append((method, rule))
+    # enroll must run before drop for the enroll/drop scenario
+    routes.sort(key=lambda r: (r[1].rule.endswith('/drop'), r[1].rule, r[0]))
+    return routes
+
+
+def build_url(rule, ctx):
+    values = {}
+    for arg in rule.arguments:
+        if arg not in ctx:
+            return None
+        values[arg] = ctx[arg]
+    path = rule.rule
+    for arg, value in values.items():
+        path = re.sub(r'<(?:[^:<>]+:)?%s>' % arg, str(value), path)
+    return path
+
+
+def measure(client, method, url, headers, body, iterations, warmup):
+    timings, counts, db_times, statuses = [], [], [], {}
+    for i in range(warmup + iterations):
+        with track_queries() as queries:
+            start = time.perf_counter()
+            response = client.open(url(i) if callable(url) else url, method=method, headers=headers(i) if callable(headers) else headers,
+                                   json=body(i) if callable(body) else body)
+            elapsed = time.perf_counter() - start
+        if i < warmup:
+            continue
+        timings.append(elapsed * 1000.0)
+        counts.append(len(queries))
+        db_times.append(sum(t for _, t in queries) * 1000.0)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': percentile(counts, 50),
+        'max_queries': max(counts),
+        'db_ms_p50': round(percentile(db_times, 50), 3),
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'iterations': iterations,
+    }
+
+
+def run(iterations, warmup, include_writes, route_filter=None):
+    from app.website import create_app
+    from app.website.auth import generate_token
+
+    app = create_app()
+    app.testing = True
+    client = app.test_client()
+    ctx = load_context()
+    tokens = {}
+
+    def auth_headers(user):
+        if user is None:
+            return {}
+        if user not in tokens:
+            tokens[user] = generate_token(*user)
+        return {'Authorization': f'Bearer {tokens[user]}'}
+
+    cases = write_cases(ctx)
+    results, skipped = {}, {}
+    for method, rule in discover_routes(app):
+        key = f'{method} {rule.rule}'
+        if route_filter and not re.search(route_filter, key):
+            continue
+        if method != 'GET':
+            case = cases.get((method, rule.rule))
+            if not include_writes or case is None:
+                skipped[key] = 'write route' if case else 'write route without a benchmark scenario'
+                continue
+            print(f"  {key}")
+            results[key] = measure(client, method, lambda i: case(i)[1], lambda i: auth_headers(case(i)[0]),
+                                   lambda i: case(i)[2], iterations, warmup)
+            continue
+        url = build_url(rule, ctx)
+        if url is None:
+            skipped[key] = f'no sample value for {sorted(rule.arguments)}'
+            continue
+        args = query_args(rule.rule, ctx)
+        if args:
+            url += '?' + '&'.join(f'{k}={v}' for k, v in args.items())
+        print(f"  {key}")
+        results[key] = measure(client, method, url, auth_headers(ctx['users'].get(role_for(rule.rule))), None, iterations, warmup)
+    return results, skipped
+
+
+def compare(current, baseline, threshold):
+    """Print a diff table; returns the list of regressions"""
+    regressions = []
+    print(f"\n{'route':<70} {'p95 base':>9} {'p95 now':>9} {'change':>8} {'queries':>9}")
+    for key, now in sorted(current.items()):
+        base = baseline.get(key)
+        if not base:
+            print(f"{key:<70} {'-':>9} {now['p95_ms']:>9.2f} {'new':>8} {now['queries']:>9}")
+            continue
+        change = (now['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0.0
+        queries = f"{base['queries']}->{now['queries']}" if base['queries'] != now['queries'] else str(now['queries'])
+        flag = ''
+        if change > threshold or now['queries'] > base['queries']:
+            flag = '  <-- regression'
+            regressions.append(key)
+        print(f"{key:<70} {base['p95_ms']:>9.2f} {now['p95_ms']:>9.2f} {change:>+7.0%} {queries:>9}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every route of the API against a synthetic dataset')
+    parser.add_argument('--database', default='student_portal_bench')
+    parser.add_argument('--spawn', action='store_true', help='start a temporary local mariadbd/mysqld')
+    parser.add_argument('--students', type=int, default=2000, help='dataset size when seeding')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse the data already in --database')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--writes', action='store_true', help='also run write routes that have a scenario')
+    parser.add_argument('--routes', help='regex filter on "METHOD /rule"')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON')
+    parser.add_argument('--threshold', type=float, default=0.20, help='allowed p95 slowdown for --compare')
+    args = parser.parse_args()
+
+    server = None
+    try:
+        if args.spawn:
+            print("Starting local database server...")
+            server = LocalMySQL().start()
+            server.configure(args.database)
+        else:
+            DB_CONFIG['database'] = args.database
+        if not args.skip_seed:
+            from app.database import datagen
+            from app.database.migrate import migrate
+            migrate()
+            datagen.generate({'students': args.students, 'seed': args.seed}, method='infile' if args.spawn else 'insert', replace=True)
+
+        print(f"Benchmarking ({args.iterations} iterations, {args.warmup} warm-up)...")
+        results, skipped = run(args.iterations, args.warmup, args.writes, args.routes)
+        report = {
+            'meta': {
+                'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': args.database,
+                'students': args.students,
+                'seed': args.seed,
+                'iterations': args.iterations,
+            },
+            'routes': results,
+            'skipped': skipped,
+        }
+        print(f"\n{'route':<70} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+        for key, r in sorted(results.items()):
+            print(f"{key:<70} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['queries']:>8}")
+        print(f"\n{len(results)} routes measured, {len(skipped)} skipped")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            print(f"Results written to {args.output}")
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)['routes']
+            regressions = compare(results, baseline, args.threshold)
+            if regressions:
+                print(f"\n{len(regressions)} regressions")
+                return 1
+        return 0
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,7 @@ expected_columns = {
     'fee_details': ['tuition_fee', 'lab_fee', 'miscellaneous_fee', 'amount_due'],
     'course_sections': ['is_active'],
 }
-expected_tables = ['student_code_seq', 'faculty_code_seq', 'admin_info']
+expected_tables = ['student_code_seq', 'faculty_code_seq', 'admin_info', 'fee_ledger', 'attendance_bits', 'attendance_rollup', 'faculty_attendance_rollup', 'attendance_risk']
 
 missing = []
 print('Checking tables...')
@@ -0,0 +1,46 @@
+"""
+Compute attendance shortage warnings for every active enrollment
+Runs with: python tools/compute_attendance_risk.py [--list] [--department 3]
+
+One pass over the attendance rollups stores allowed absences and a
+short/warning/ok status per enrollment in attendance_risk
+(app/database/attendance_risk.py), which GET /api/admin/attendance/at-risk
+and GET /api/student/attendance/risk read. Schedule it, e.g. nightly:
+
+    15 1 * * *  cd /srv/portal && python tools/compute_attendance_risk.py
+
+--list prints the at-risk enrollments afterwards.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import attendance_risk
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute attendance shortage warnings')
+    parser.add_argument('--list', action='store_true', help='print the at-risk enrollments')
+    parser.add_argument('--department', type=int, help='with --list: only this department id')
+    parser.add_argument('--limit', type=int, default=50, help='rows printed with --list')
+    args = parser.parse_args()
+
+    try:
+        attendance_risk.compute()
+        if args.list:
+            for row in attendance_risk.report(args.department, limit=args.limit):
+                print(f"   {row['status']:<8} {row['student_code']:<10} {row['course_code']:<10} {row['section_code']:<6} "
+                      f"{row['present']}/{row['total']} present, {row['allowed_absences']} absence(s) left")
+    except Exception as e:
+        print(f"❌ Attendance risk computation failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Generate a large synthetic dataset for load testing
+Runs with: python tools/generate_dataset.py --database student_portal_load [--students 40000] [--method infile]
+
+The target database is created and migrated to head first. It must be empty
+unless --truncate is given (which wipes every generated table). The
+application database (DB_NAME) is always refused, --truncate or not.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database.connection import DB_CONFIG
+from app.database import datagen
+from app.database.migrate import migrate
+
+
+def main():
+    defaults = datagen.DEFAULT_SCALE
+    parser = argparse.ArgumentParser(description='Fill a database with a deterministic synthetic dataset')
+    parser.add_argument('--database', required=True, help='target database (created if missing)')
+    parser.add_argument('--students', type=int, default=defaults['students'])
+    parser.add_argument('--departments', type=int, default=defaults['departments'])
+    parser.add_argument('--courses-per-dept', type=int, default=defaults['courses_per_dept'])
+    parser.add_argument('--faculty-per-dept', type=int, default=defaults['faculty_per_dept'])
+    parser.add_argument('--terms', type=int, default=defaults['terms'], help='terms of history including the current one')
+    parser.add_argument('--courses-per-term', type=int, default=defaults['courses_per_term'])
+    parser.add_argument('--section-capacity', type=int, default=defaults['section_capacity'])
+    parser.add_argument('--class-days', type=int, default=defaults['class_days'])
+    parser.add_argument('--seed', type=int, default=defaults['seed'])
+    parser.add_argument('--term', help='current term, e.g. "Fall 2025" (default: from today)')
+    parser.add_argument('--method', choices=['insert', 'infile'], default='insert',
+                        help='multi-row INSERTs or LOAD DATA LOCAL INFILE (needs local_infile=ON on the server)')
+    parser.add_argument('--chunk-rows', type=int, default=5000)
+    parser.add_argument('--truncate', action='store_true', help='wipe generated tables if the database has data')
+    args = parser.parse_args()
+
+    if args.database == os.getenv('DB_NAME', 'student_portal'):
+        print(f"Refusing to write into the application database '{args.database}' (DB_NAME); pick another --database")
+        return 2
+
+    last_term = None
+    if args.term:
+        semester, year = args.term.split()
+        last_term = (semester.capitalize(), int(year))
+
+    DB_CONFIG['database'] = args.database
+    migrate()
+
+    scale = {
+        'students': args.students,
+        'departments': args.departments,
+        'courses_per_dept': args.courses_per_dept,
+        'faculty_per_dept': args.faculty_per_dept,
+        'terms': args.terms,
+        'courses_per_term': args.courses_per_term,
+        'section_capacity': args.section_capacity,
+        'class_days': args.class_days,
+        'seed': args.seed,
+    }
+    try:
+        counts = datagen.generate(scale, last_term, method=args.method, chunk_rows=args.chunk_rows, replace=args.truncate)
+    except Exception as e:
+        print(f"❌ Dataset generation failed: {e}")
+        return 1
+    print(f"✅ {sum(counts.values()):,} rows written to '{args.database}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
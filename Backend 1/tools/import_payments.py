@@ -0,0 +1,47 @@
+"""
+Import bank payments from a CSV statement
+Runs with: python tools/import_payments.py statement.csv [--dry-run] [--chunk-size 1000]
+
+Columns: student_code, amount, and optionally semester and reference (the
+bank transaction id). Payments are matched to fee records by student code and
+semester (oldest outstanding record first when the semester is empty) and
+applied through the fee ledger (app/database/payments.py). Rows whose
+reference was imported before are skipped, so a statement can be re-imported.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import payments
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a bank statement CSV to fee records')
+    parser.add_argument('csv_file')
+    parser.add_argument('--dry-run', action='store_true', help='match and report without writing')
+    parser.add_argument('--chunk-size', type=int, default=payments.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with open(args.csv_file, encoding='utf-8-sig', newline='') as f:
+        text = f.read()
+    try:
+        report = payments.import_payments(text, dry_run=args.dry_run, chunk_size=args.chunk_size)
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        return 1
+
+    for key in ('invalid', 'duplicates', 'unmatched', 'overpaid'):
+        for row in report[key]:
+            print(f"  {key}: " + ', '.join(f"{k}={v}" for k, v in row.items()))
+    verb = 'would be applied' if args.dry_run else 'applied'
+    print(f"✅ {report['entries']:,} payment entries {verb} for {report['students']:,} students ({report['amount']:,.2f})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Index advisor - replays captured queries through EXPLAIN and reports full scans
+
+Sources of statements:
+- a capture file written by the app with QUERY_CAPTURE_FILE=/path/queries.jsonl
+- by default, the hot read paths of the models, run once with sample ids
+  picked from the current database
+
+Every distinct statement is explained once. Access types ALL (full table
+scan) and index (full index scan) on tables with at least --min-rows rows are
+reported as problems; filesort/temporary usage is listed as a note.
+
+Run: python tools/index_advisor.py [--capture queries.jsonl] [--min-rows 100] [--json]
+Exit status is 1 when a full scan was found, so it can gate CI.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+import json
+import tempfile
+
+import pymysql.cursors
+
+from app.database.connection import get_connection, execute_query
+from app.database import slow_queries
+
+
+def _first(query, params=(), key=None):
+    rows = execute_query(query, params)
+    if not rows:
+        return None
+    return rows[0][key] if key else rows[0]
+
+
+def sample_arguments():
+    """Pick representative ids from the database for the built-in workload"""
+    enrolled = _first("SELECT e.student_id, e.section_id, cs.semester, cs.year, cs.faculty_id FROM enrollments e JOIN course_sections cs ON e.section_id = cs.section_id WHERE e.status = 'enrolled' ORDER BY e.enrollment_id DESC LIMIT 1")
+    if not enrolled:
+        return None
+    student_user = _first("SELECT user_id FROM students WHERE student_id = %s", (enrolled['student_id'],), 'user_id')
+    att_date = _first("SELECT attendance_date FROM attendance WHERE section_id = %s ORDER BY attendance_date DESC LIMIT 1", (enrolled['section_id'],), 'attendance_date')
+    fa_date = _first("SELECT attendance_date FROM faculty_attendance ORDER BY attendance_id DESC LIMIT 1", (), 'attendance_date')
+    return dict(enrolled, user_id=student_user, attendance_date=att_date, faculty_attendance_date=fa_date)
+
+
+def run_builtin_workload(capture_path):
+    """Run the hot model reads once so the cursor captures their statements"""
+    from app.website.models import StudentModel, CourseModel, FacultyModel, AdminModel
+    args = sample_arguments()
+    if not args:
+        print('No enrollments found - seed the database first (tools/seed_db.py or a generated dataset).')
+        return False
+    slow_queries.QUERY_CAPTURE_FILE = capture_path
+    student_id, section_id = args['student_id'], args['section_id']
+    workload = [
+        lambda: StudentModel.get_student_by_user_id(args['user_id']),
+        lambda: CourseModel.get_student_enrollments(student_id),
+        lambda: StudentModel.get_attendance_summary(student_id),
+        lambda: StudentModel.get_all_marks(student_id),
+        lambda: StudentModel.get_transcript(student_id),
+        lambda: StudentModel.calculate_gpa(student_id),
+        lambda: StudentModel.calculate_gpa(student_id, args['semester']),
+        lambda: StudentModel.compute_current_gpa(student_id),
+        lambda: StudentModel.get_fee_details(student_id),
+        lambda: StudentModel.get_student_announcements(student_id),
+        lambda: CourseModel.get_available_courses(args['semester'], args['year']),
+        lambda: CourseModel.check_seats_available(section_id),
+        lambda: FacultyModel.get_teaching_courses(args['faculty_id']),
+        lambda: FacultyModel.get_course_students(section_id),
+        lambda: FacultyModel.get_course_attendance(section_id),
+        lambda: FacultyModel.get_course_attendance(section_id, args['attendance_date']),
+        lambda: AdminModel.get_faculty_attendance_by_date(args['faculty_attendance_date']),
+    ]
+    try:
+        for call in workload:
+            try:
+                call()
+            except Exception as e:
+                print(f"Workload step failed: {e}")
+    finally:
+        slow_queries.QUERY_CAPTURE_FILE = None
+    return True
+
+
+def load_captures(path):
+    statements = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            statements.setdefault(item['fingerprint'], item)
+    return list(statements.values())
+
+
+def table_rows(cursor, table, cache):
+    if table not in cache:
+        cursor.execute("SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+        row = cursor.fetchone()
+        cache[table] = (row['table_rows'] or 0) if row else 0
+    return cache[table]
+
+
+def analyze(statements, min_rows):
+    conn = get_connection()
+    report = []
+    size_cache = {}
+    try:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            for item in statements:
+                entry = {'fingerprint': item['fingerprint'], 'caller': item.get('caller'), 'sql': slow_queries.normalize_sql(item['sql']), 'problems': [], 'notes': [], 'plan': []}
+                try:
+                    cursor.execute('EXPLAIN ' + item['sql'], item.get('params'))
+                    plan = cursor.fetchall()
+                except Exception as e:
+                    entry['problems'].append(f"EXPLAIN failed: {e}")
+                    report.append(entry)
+                    continue
+                for row in plan:
+                    table = row.get('table') or ''
+                    access = (row.get('type') or '').lower()
+                    extra = row.get('Extra') or ''
+                    entry['plan'].append({'table': table, 'type': access, 'key': row.get('key'), 'rows': row.get('rows'), 'extra': extra})
+                    base_table = table if not table.startswith('<') else None
+                    size = table_rows(cursor, base_table, size_cache) if base_table else 0
+                    if access == 'all' and size >= min_rows:
+                        entry['problems'].append(f"full table scan on {table} (~{size} rows)")
+                    elif access == 'index' and size >= min_rows:
+                        entry['problems'].append(f"full index scan on {table} via {row.get('key')} (~{size} rows)")
+                    if 'Using filesort' in extra or 'Using temporary' in extra:
+                        entry['notes'].append(f"{table}: {extra}")
+                report.append(entry)
+    finally:
+        conn.close()
+    return report
+
+
+def print_report(report):
+    flagged = [r for r in report if r['problems']]
+    for r in report:
+        status = 'SCAN' if r['problems'] else 'ok  '
+        print(f"[{status}] {r['caller'] or '?'}  {r['sql'][:110]}")
+        for step in r['plan']:
+            print(f"         {step['table']:<22} type={step['type']:<7} key={step['key']} rows={step['rows']}")
+        for p in r['problems']:
+            print(f"         ! {p}")
+        for n in r['notes']:
+            print(f"         ~ {n}")
+    print(f"\n{len(report)} statements analyzed, {len(flagged)} with full scans")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay captured queries against EXPLAIN and report full scans')
+    parser.add_argument('--capture', help='JSON-lines file written with QUERY_CAPTURE_FILE (default: run built-in hot reads)')
+    parser.add_argument('--min-rows', type=int, default=100, help='ignore scans of tables smaller than this')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    if args.capture:
+        statements = load_captures(args.capture)
+    else:
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        try:
+            if not run_builtin_workload(path):
+                return 2
+            statements = load_captures(path)
+        finally:
+            os.remove(path)
+
+    report = analyze(statements, args.min_rows)
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+    return 1 if any(r['problems'] for r in report) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Check or rebuild the attendance rollups
+Runs with: python tools/rebuild_attendance_rollups.py [--check] [--limit 20]
+
+attendance_rollup and faculty_attendance_rollup are running counts that
+every attendance write keeps current (app/database/attendance_rollups.py).
+This recomputes both from the attendance itself in one transaction: the
+attendance rows, or the bitsets when ATTENDANCE_STORAGE=bitmap. --check only
+lists the rollups that disagree and exits 1 when there are any.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+import time
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import attendance_rollups, attendance_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check or rebuild the attendance rollup tables')
+    parser.add_argument('--check', action='store_true', help='only list rollups that disagree with the attendance')
+    parser.add_argument('--limit', type=int, default=20, help='rows listed per table with --check')
+    args = parser.parse_args()
+    source = 'rows' if attendance_store.writes_rows() else 'bits'
+
+    try:
+        if args.check:
+            result = attendance_rollups.check(source)
+            for table, rows in result.items():
+                print(f"{table}: {len(rows)} mismatch(es)")
+                for row in rows[:args.limit]:
+                    print('  ', ', '.join(f"{k}={v}" for k, v in row.items()))
+            return 1 if any(result.values()) else 0
+        start = time.perf_counter()
+        written = attendance_rollups.rebuild(source)
+    except Exception as e:
+        print(f"❌ Attendance rollups failed: {e}")
+        return 2
+    print(f"✓ Rebuilt {written['students']:,} student and {written['faculty']:,} faculty rollups from {source} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
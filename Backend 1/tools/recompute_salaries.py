@@ -0,0 +1,53 @@
+"""
+Recompute every faculty salary from the current course sections
+Runs with: python tools/recompute_salaries.py [--dry-run] [--limit 20]
+
+A salary is the sum of credits x fee_per_credit over the member's active
+sections. Normal writes keep salaries current through the dependency tracker
+in app/database/salaries.py; this is the full batch job for imports, direct
+SQL edits or a check from cron. The update is one set-based statement and
+only rewrites the salaries that differ. --dry-run lists them instead.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+import time
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import salaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute faculty salaries from their active sections')
+    parser.add_argument('--dry-run', action='store_true', help='list the salaries that would change')
+    parser.add_argument('--limit', type=int, default=20, help='rows listed with --dry-run')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        try:
+            rows = salaries.drift()
+        except Exception as e:
+            print(f"❌ Salary check failed: {e}")
+            return 2
+        print(f"{len(rows)} salary(ies) out of date")
+        for row in rows[:args.limit]:
+            print(f"   {row['faculty_code']}: {row['stored']} -> {row['expected']}")
+        if len(rows) > args.limit:
+            print(f"   ... {len(rows) - args.limit} more")
+        return 0
+
+    start = time.perf_counter()
+    changed = salaries.recompute_all()
+    if changed is None:
+        print("❌ Salary recompute failed")
+        return 2
+    print(f"✓ {changed} salary(ies) updated in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Reconcile fee totals against the fee ledger
+Runs with: python tools/reconcile_fees.py [--fix] [--limit 20] [--json]
+
+Recomputes every student's balance and every fee record (amount due, amount
+paid, tuition/lab/miscellaneous) from fee_ledger and lists the rows whose
+running totals disagree, plus ledger-charged enrollments whose charge does
+not match their status (enrolled: not credited, dropped: fully credited).
+--fix rewrites the totals from the ledger; the ledger itself is never changed.
+Exit status is 1 when a mismatch was found (before fixing), so it can run
+from cron or CI.
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import argparse
+import json
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database import ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check fee_details and fee balances against the fee ledger')
+    parser.add_argument('--fix', action='store_true', help='rewrite mismatching totals from the ledger')
+    parser.add_argument('--limit', type=int, default=20, help='rows listed per check')
+    parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = parser.parse_args()
+
+    try:
+        result = ledger.reconcile(fix=args.fix)
+    except Exception as e:
+        print(f"❌ Reconciliation failed: {e}")
+        return 2
+
+    if args.json:
+        print(json.dumps(result, default=str, indent=2))
+    else:
+        for check, rows in result.items():
+            print(f"{check}: {len(rows)} mismatch(es)")
+            for row in rows[:args.limit]:
+                print('  ', ', '.join(f"{k}={v}" for k, v in row.items()))
+            if len(rows) > args.limit:
+                print(f"   ... {len(rows) - args.limit} more")
+        if args.fix and (result['balances'] or result['fees']):
+            print("✓ Totals rewritten from the ledger")
+    return 1 if any(result.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Registration-day simulator - a thundering herd of virtual students
+
+Every virtual student waits for the registration "opening" (a shared start
+barrier with a little jitter), logs in, lists the available courses and then
+tries to get seats in a handful of hot sections: check-seats -> enroll, with
+occasional drops, separated by exponential think times. A few virtual admins
+enroll students into the same sections at the same time through
+/api/admin/enroll-student (CourseModel.enroll_student) and
+/api/admin/course-management/enroll.
+
+Reported: throughput, p50/p95/p99 per endpoint, status codes, deadlocks and
+lock-wait timeouts (from the /metrics delta when the server exposes it, and
+from error messages), and overbooking: sections whose enrolled count exceeds
+max_capacity after the run, read straight from the database.
+
+Run against a server started on a load-test database (see
+tools/generate_dataset.py), e.g.:
+    python tools/registration_sim.py --base-url http://localhost:5000 --students 2000 --hot-sections 5
+"""
+import os, sys
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+import re
+import time
+import random
+import argparse
+import threading
+
+import requests
+from dotenv import load_dotenv
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.database.connection import DB_CONFIG, execute_query
+
+LOCK_MARKERS = {'deadlock': ('deadlock',), 'lock_wait_timeout': ('lock wait timeout',)}
+_LOCK_METRIC_RE = re.compile(r'^db_lock_errors_total\{kind="(\w+)"\} (\S+)$', re.M)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Stats:
+    """Thread-safe latency/status collector"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.lock_errors = {'deadlock': 0, 'lock_wait_timeout': 0}
+        self.enrolled = 0
+        self.dropped = 0
+
+    def add(self, name, elapsed, status, text=''):
+        lowered = text.lower()
+        with self.lock:
+            self.latencies.setdefault(name, []).append(elapsed * 1000.0)
+            per = self.statuses.setdefault(name, {})
+            per[status] = per.get(status, 0) + 1
+            for kind, markers in LOCK_MARKERS.items():
+                if any(m in lowered for m in markers):
+                    self.lock_errors[kind] += 1
+
+
+class Client:
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.stats = stats
+        self.timeout = timeout
+
+    def call(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            status, text = response.status_code, response.text
+        except requests.RequestException as e:
+            response, status, text = None, 'error', str(e)
+        self.stats.add(name, time.perf_counter() - start, status, text)
+        return response
+
+    def login(self, username, password):
+        r = self.call('login', 'POST', '/api/auth/login', json={'username': username, 'password': password})
+        if r is not None and r.ok:
+            self.session.headers['Authorization'] = f"Bearer {r.json()['data']['token']}"
+            return True
+        return False
+
+
+def virtual_student(args, stats, user, hot_sections, term, barrier, rng):
+    client = Client(args.base_url, stats, args.timeout)
+    barrier.wait()
+    time.sleep(rng.uniform(0, args.ramp))
+    if not client.login(user['username'], args.password):
+        return
+    client.call('available', 'GET', '/api/courses/available', params={'semester': term[0], 'year': term[1]})
+    mine = []
+    wanted = rng.sample(hot_sections, min(args.courses, len(hot_sections)))
+    for section_id in wanted:
+        time.sleep(rng.expovariate(1.0 / args.think))
+        r = client.call('check-seats', 'GET', '/api/courses/check-seats', params={'section_id': section_id})
+        if r is None or not r.ok or (r.json().get('data') or {}).get('seats_available', 0) <= 0:
+            continue
+        time.sleep(rng.expovariate(1.0 / args.think))
+        r = client.call('enroll', 'POST', '/api/courses/enroll', json={'section_id': section_id})
+        if r is not None and r.ok:
+            mine.append(section_id)
+            with stats.lock:
+                stats.enrolled += 1
+    if mine and rng.random() < args.drop_rate:
+        time.sleep(rng.expovariate(1.0 / args.think))
+        r = client.call('drop', 'POST', '/api/courses/drop', json={'section_id': rng.choice(mine)})
+        if r is not None and r.ok:
+            with stats.lock:
+                stats.dropped += 1
+
+
+def virtual_admin(args, stats, admin, student_ids, hot_sections, barrier, rng):
+    client = Client(args.base_url, stats, args.timeout)
+    if not client.login(admin['username'], args.admin_password):
+        barrier.wait()
+        return
+    barrier.wait()
+    for i in range(args.admin_ops):
+        time.sleep(rng.expovariate(1.0 / args.think))
+        body = {'student_id': rng.choice(student_ids), 'section_id': rng.choice(hot_sections)}
+        if i % 2 == 0:
+            r = client.call('admin-enroll', 'POST', '/api/admin/enroll-student', json=body)
+        else:
+            r = client.call('admin-course-mgmt-enroll', 'POST', '/api/admin/course-management/enroll', json=body)
+        if r is not None and r.ok:
+            with stats.lock:
+                stats.enrolled += 1
+
+
+def lock_metrics(base_url, token=None):
+    """{kind: count} from /metrics, or None when it is not reachable"""
+    try:
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        r = requests.get(base_url.rstrip('/') + '/metrics', headers=headers, timeout=5)
+        if not r.ok:
+            return None
+    except requests.RequestException:
+        return None
+    return {kind: float(value) for kind, value in _LOCK_METRIC_RE.findall(r.text)}
+
+
+def pick_hot_sections(count):
+    """Current-term sections with the fewest free seats: maximum contention"""
+    rows = execute_query("""
+        SELECT cs.section_id, cs.semester, cs.year, cs.max_capacity, COUNT(e.enrollment_id) AS enrolled
+        FROM course_sections cs
+        LEFT JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+        WHERE cs.is_active = TRUE
+        GROUP BY cs.section_id, cs.semester, cs.year, cs.max_capacity
+        HAVING enrolled < cs.max_capacity
+        ORDER BY cs.max_capacity - enrolled, cs.section_id
+        LIMIT %s
+    """, (count,))
+    return rows
+
+
+def seat_report(section_ids):
+    placeholders = ', '.join(['%s'] * len(section_ids))
+    return execute_query(f"""
+        SELECT cs.section_id, cs.max_capacity, COUNT(e.enrollment_id) AS enrolled
+        FROM course_sections cs
+        LEFT JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+        WHERE cs.section_id IN ({placeholders})
+        GROUP BY cs.section_id, cs.max_capacity
+        ORDER BY cs.section_id
+    """, tuple(section_ids))
+
+
+def overbooked_sections():
+    return execute_query("""
+        SELECT cs.section_id, cs.max_capacity, COUNT(e.enrollment_id) AS enrolled
+        FROM course_sections cs
+        JOIN enrollments e ON e.section_id = cs.section_id AND e.status = 'enrolled'
+        GROUP BY cs.section_id, cs.max_capacity
+        HAVING enrolled > cs.max_capacity
+    """)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate registration opening with many concurrent students')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--database', help='database the server uses (default: DB_NAME)')
+    parser.add_argument('--students', type=int, default=1000, help='virtual students (one thread each)')
+    parser.add_argument('--admins', type=int, default=2, help='virtual admins using the admin enroll paths')
+    parser.add_argument('--admin-ops', type=int, default=50, help='enrollments per virtual admin')
+    parser.add_argument('--hot-sections', type=int, default=5, help='sections everybody competes for')
+    parser.add_argument('--courses', type=int, default=3, help='sections each student tries to get')
+    parser.add_argument('--drop-rate', type=float, default=0.1, help='share of students who drop one course')
+    parser.add_argument('--think', type=float, default=0.5, help='mean think time in seconds')
+    parser.add_argument('--ramp', type=float, default=1.0, help='start jitter after opening, seconds')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--admin-password', default='password123')
+    parser.add_argument('--metrics-token', default=os.getenv('METRICS_TOKEN'))
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.database:
+        DB_CONFIG['database'] = args.database
+    rng = random.Random(args.seed)
+    hot = pick_hot_sections(args.hot_sections)
+    if not hot:
+        print("No open current-term sections found - generate a dataset first")
+        return 2
+    hot_ids = [row['section_id'] for row in hot]
+    term = (hot[0]['semester'], hot[0]['year'])
+    placeholders = ', '.join(['%s'] * len(hot_ids))
+    students = execute_query(f"""
+        SELECT s.student_id, u.username FROM students s JOIN users u ON u.user_id = s.user_id
+        WHERE u.is_active = TRUE AND s.student_id NOT IN (
+            SELECT student_id FROM enrollments WHERE section_id IN ({placeholders}) AND status = 'enrolled')
+        ORDER BY s.student_id LIMIT %s
+    """, tuple(hot_ids) + (args.students,))
+    admins = execute_query("SELECT username FROM users WHERE role = 'admin' AND is_active = TRUE ORDER BY user_id LIMIT 1")
+    free_seats = sum(row['max_capacity'] - row['enrolled'] for row in hot)
+    print(f"{len(students)} students and {args.admins if admins else 0} admins competing for {free_seats} free seats in sections {hot_ids}")
+
+    before = lock_metrics(args.base_url, args.metrics_token)
+    stats = Stats()
+    threading.stack_size(512 * 1024)
+    actors = len(students) + (args.admins if admins else 0)
+    barrier = threading.Barrier(actors + 1)
+    threads = []
+    for user in students:
+        threads.append(threading.Thread(target=virtual_student, args=(args, stats, user, hot_ids, term, barrier, random.Random(rng.random())), daemon=True))
+    if admins:
+        student_ids = [s['student_id'] for s in students]
+        for _ in range(args.admins):
+            threads.append(threading.Thread(target=virtual_admin, args=(args, stats, admins[0], student_ids, hot_ids, barrier, random.Random(rng.random())), daemon=True))
+    for t in threads:
+        t.start()
+    print("Registration opens now...")
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    after = lock_metrics(args.base_url, args.metrics_token)
+
+    total = sum(len(v) for v in stats.latencies.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+    print(f"{'endpoint':<26} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for name, values in sorted(stats.latencies.items()):
+        statuses = ', '.join(f"{k}:{v}" for k, v in sorted(stats.statuses[name].items(), key=lambda kv: str(kv[0])))
+        print(f"{name:<26} {len(values):>7} {percentile(values, 50):>9.1f} {percentile(values, 95):>9.1f} {percentile(values, 99):>9.1f}  {statuses}")
+    print(f"\nSuccessful enrollments: {stats.enrolled}, drops: {stats.dropped}")
+    if before is not None and after is not None:
+        for kind in ('deadlock', 'lock_wait_timeout'):
+            print(f"{kind}: {after.get(kind, 0) - before.get(kind, 0):.0f} (server metrics)")
+    else:
+        for kind, count in stats.lock_errors.items():
+            print(f"{kind}: {count} (from responses; /metrics not reachable)")
+
+    print("\nSeat counts:")
+    for row in seat_report(hot_ids):
+        flag = '  OVERBOOKED' if row['enrolled'] > row['max_capacity'] else ''
+        print(f"  section {row['section_id']}: {row['enrolled']}/{row['max_capacity']}{flag}")
+    violations = overbooked_sections()
+    if violations:
+        print(f"\n❌ {len(violations)} sections exceed max_capacity: {[v['section_id'] for v in violations]}")
+        return 1
+    print("\n✅ No section exceeds max_capacity")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the master imports this module once, so create_app(), the
+imports and the schema check happen before the workers are forked. Each
+worker then opens its own pooled connections (see ConnectionPool).
+"""
+import os
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BASE_DIR, 'app', '.env'))
+
+from app.website import create_app
+from app.database.connection import init_db, POOL
+
+app = create_app()
+
+if os.getenv('MIGRATE_ON_START', '1') == '1':
+    with app.app_context():
+        init_db()
+
+# Nothing opened in the master should leak into the workers
+POOL.clear()